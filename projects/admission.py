@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de controle de admissão para as rotas que executam código.
+
+Define a classe `AdmissionController`, que limita quantas execuções acontecem
+ao mesmo tempo e mantém uma fila limitada para as demais. A fila é justa entre
+clientes (ex: endereços IP): quando uma vaga é liberada, os clientes com
+requisições aguardando são atendidos em rodízio (round-robin), de modo que um
+aluno que clica "Executar" várias vezes não atrasa a turma inteira.
+
+Quando a fila atinge a profundidade máxima, novas requisições são recusadas
+imediatamente com `AdmissionRejected`, que a aplicação converte em uma resposta
+503 com `Retry-After`.
+"""
+import math
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from .metrics import executor_queue_seconds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE_DEPTH = 64
+DEFAULT_MAX_WAIT = 10.0 # Segundos que uma requisição pode aguardar na fila
+
+class AdmissionRejected(Exception):
+    """
+    Levantada quando uma requisição não pode ser admitida (fila cheia ou espera longa demais).
+
+    Attributes:
+        retry_after (int): Sugestão, em segundos, de quando tentar novamente.
+    """
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class _Ticket:
+    """Uma requisição aguardando vaga na fila de um cliente."""
+
+    def __init__(self, client_id):
+        self.client_id = client_id
+        self.event = threading.Event()
+        self.granted = False
+        self.enqueued_at = time.perf_counter()
+
+class AdmissionSlot:
+    """Vaga de execução concedida por `AdmissionController.acquire`; libere-a com `release`."""
+
+    def __init__(self, controller, wait_time):
+        self._controller = controller
+        self._released = False
+        self.wait_time = wait_time
+        self.started_at = time.perf_counter()
+
+    def release(self):
+        """Devolve a vaga ao controlador. Chamadas repetidas são ignoradas."""
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+class AdmissionController:
+    """
+    Fila de admissão limitada, com escalonamento justo entre clientes.
+
+    Attributes:
+        max_concurrency (int): Número de execuções simultâneas admitidas.
+        max_queue_depth (int): Número máximo de requisições aguardando vaga.
+        max_wait (float): Tempo máximo de espera na fila, em segundos.
+    """
+
+    def __init__(self, max_concurrency, max_queue_depth=DEFAULT_MAX_QUEUE_DEPTH, max_wait=DEFAULT_MAX_WAIT):
+        """
+        Inicializa o controlador.
+
+        Args:
+            max_concurrency (int): Execuções simultâneas (normalmente o tamanho do pool de executores).
+            max_queue_depth (int): Requisições em espera antes de recusar novas. 0 recusa
+                                   tudo o que não puder ser executado de imediato.
+            max_wait (float): Tempo máximo de espera na fila, em segundos.
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue_depth = max(0, int(max_queue_depth))
+        self.max_wait = float(max_wait)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self._queues = OrderedDict() # client_id -> deque[_Ticket], na ordem do rodízio
+        # Métricas
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._service_total = 0.0
+        self._service_count = 0
+
+    def _retry_after(self):
+        """Estima em quantos segundos a fila atual terá sido atendida. Requer `self._lock`."""
+        average_service = self._service_total / self._service_count if self._service_count else 1.0
+        return max(1, math.ceil(average_service * (self._queued + 1) / self.max_concurrency))
+
+    def acquire(self, client_id):
+        """
+        Obtém uma vaga de execução, aguardando na fila do cliente se necessário.
+
+        Args:
+            client_id (str): Identificador do cliente (ex: endereço IP) usado no rodízio.
+
+        Returns:
+            AdmissionSlot: A vaga concedida; deve ser liberada com `release()`.
+
+        Raises:
+            AdmissionRejected: Se a fila estiver cheia ou a espera exceder `max_wait`.
+        """
+        with self._lock:
+            if self._active < self.max_concurrency and not self._queued:
+                self._active += 1
+                return self._grant(0.0)
+            if self._queued >= self.max_queue_depth:
+                self._rejected += 1
+                retry_after = self._retry_after()
+                logger.warning(f"Admissão recusada para '{client_id}': fila cheia ({self._queued} aguardando).")
+                raise AdmissionRejected("Servidor ocupado: fila de execução cheia.", retry_after)
+            ticket = _Ticket(client_id)
+            self._queues.setdefault(client_id, deque()).append(ticket)
+            self._queued += 1
+
+        ticket.event.wait(self.max_wait)
+        with self._lock:
+            if ticket.granted:
+                # A vaga já foi contabilizada em `_release` ao ser repassada.
+                return self._grant(time.perf_counter() - ticket.enqueued_at)
+            # Tempo esgotado: retira o pedido da fila do cliente.
+            client_queue = self._queues.get(client_id)
+            if client_queue is not None:
+                client_queue.remove(ticket)
+                if not client_queue:
+                    del self._queues[client_id]
+            self._queued -= 1
+            self._timed_out += 1
+            self._rejected += 1
+            retry_after = self._retry_after()
+        logger.warning(f"Admissão recusada para '{client_id}': espera excedeu {self.max_wait:g}s.")
+        raise AdmissionRejected("Servidor ocupado: tempo de espera na fila excedido.", retry_after)
+
+    def _grant(self, wait_time):
+        """Registra uma execução admitida e cria sua vaga. Requer `self._lock`."""
+        self._admitted += 1
+        self._wait_total += wait_time
+        self._wait_max = max(self._wait_max, wait_time)
+        executor_queue_seconds.observe(wait_time, "admission")
+        return AdmissionSlot(self, wait_time)
+
+    def _release(self, slot):
+        """Libera uma vaga e a repassa ao próximo cliente do rodízio."""
+        with self._lock:
+            self._service_total += time.perf_counter() - slot.started_at
+            self._service_count += 1
+            self._active -= 1
+            if not self._queues:
+                return
+            # Rodízio: atende o primeiro cliente e o move para o fim da ordem.
+            client_id, client_queue = next(iter(self._queues.items()))
+            ticket = client_queue.popleft()
+            if client_queue:
+                self._queues.move_to_end(client_id)
+            else:
+                del self._queues[client_id]
+            self._queued -= 1
+            self._active += 1
+            ticket.granted = True
+            ticket.event.set()
+
+    @contextmanager
+    def admit(self, client_id):
+        """
+        Context manager que mantém uma vaga de execução durante o bloco.
+
+        Args:
+            client_id (str): Identificador do cliente.
+
+        Raises:
+            AdmissionRejected: Ver `acquire`.
+        """
+        slot = self.acquire(client_id)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def stats(self):
+        """
+        Retorna as métricas do controlador.
+
+        Returns:
+            dict: "active", "queued", "clients_waiting", "max_concurrency",
+                  "max_queue_depth", "admitted", "rejected", "timed_out",
+                  "wait_time_avg", "wait_time_max" e "service_time_avg" (segundos).
+        """
+        with self._lock:
+            return {
+                "active": self._active,
+                "queued": self._queued,
+                "clients_waiting": len(self._queues),
+                "max_concurrency": self.max_concurrency,
+                "max_queue_depth": self.max_queue_depth,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_time_avg": round(self._wait_total / self._admitted, 6) if self._admitted else 0.0,
+                "wait_time_max": round(self._wait_max, 6),
+                "service_time_avg": round(self._service_total / self._service_count, 6) if self._service_count else 0.0,
+            }
@@ -9,15 +9,37 @@ e o executor de código (code_executor).
 # ... imports ...
 # ... inicialização do app Flask ...
 
+import os
+import json
+import time
+import hashlib
+import multiprocessing
 import logging
-from flask import Flask, jsonify, request, render_template, abort
+from contextlib import nullcontext
+from datetime import datetime, timezone
+import click
+from flask import Flask, jsonify, request, render_template, abort, Response, stream_with_context, url_for, make_response, g
+from flask import before_render_template, template_rendered
+from werkzeug.http import is_resource_modified
 from flask_cors import CORS
 # Assume que estes módulos estão no mesmo diretório (projects/)
 # Corrigido para import relativo consistente
 from .course_manager import CourseManager
+from .storage import SQLiteStorage, create_storage, DEFAULT_DB_PATH
+from .content_bundle import BundleValidationError, build_bundle, benchmark, DEFAULT_BUNDLE_PATH
+from .static_export import export_site
 from .lesson_manager import LessonManager
-from .exercise_manager import ExerciseManager
+from .exercise_manager import ExerciseManager, get_compiled_test_code, compiled_test_code_cache, EXERCISE_SOLUTION_FIELDS
 from . import code_executor
+from .submission_cache import SubmissionCache, DEFAULT_SUBMISSION_CACHE_SIZE
+from .static_checker import StaticChecker, format_issue, DEFAULT_MAX_NESTING_DEPTH
+from .admission import AdmissionController, AdmissionRejected, DEFAULT_MAX_QUEUE_DEPTH
+from .content_cache import content_cache, file_signature, project_fields, without_fields, DEFAULT_MAX_ENTRIES as DEFAULT_CONTENT_CACHE_ENTRIES, DEFAULT_MAX_BYTES as DEFAULT_CONTENT_CACHE_BYTES
+from .metrics import registry as metrics_registry, http_requests_total, http_request_duration_seconds, template_render_seconds, CONTENT_TYPE as METRICS_CONTENT_TYPE, DEFAULT_FLUSH_INTERVAL as DEFAULT_METRICS_FLUSH_INTERVAL
+from .page_cache import PageCache, DEFAULT_MAX_ENTRIES as DEFAULT_PAGE_CACHE_ENTRIES, DEFAULT_MAX_BYTES as DEFAULT_PAGE_CACHE_BYTES
+from .response_cache import ResponseCache, negotiate_encoding, DEFAULT_RESPONSE_CACHE_SIZE
+from .content_watcher import ContentWatcher, DEFAULT_POLL_INTERVAL as DEFAULT_CONTENT_WATCH_INTERVAL
+from .grading_queue import GradingQueue, JobFailed, QueueFullError, STATUS_QUEUED, STATUS_DONE, STATUS_ERROR, DEFAULT_GRADING_WORKERS
 
 # Configuração básica de logging
 # Idealmente, esta configuração pode ser mais elaborada e centralizada
@@ -27,14 +49,279 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app) # Habilita CORS para todas as rotas
 
+# Armazenamento do conteúdo: "json" (arquivos da pasta data/, padrão), "sqlite" (banco em
+# CURSO_CONTENT_DB, preenchido com `flask --app projects.app import-content`) ou "bundle"
+# (arquivo binário somente leitura em CURSO_CONTENT_BUNDLE, gerado com `build-bundle`).
+app.config.setdefault('CONTENT_BACKEND', os.environ.get('CURSO_CONTENT_BACKEND', 'json'))
+app.config.setdefault('CONTENT_DB_PATH', os.environ.get('CURSO_CONTENT_DB', str(DEFAULT_DB_PATH)))
+app.config.setdefault('CONTENT_BUNDLE_PATH', os.environ.get('CURSO_CONTENT_BUNDLE', str(DEFAULT_BUNDLE_PATH)))
+content_storage = create_storage(app.config['CONTENT_BACKEND'], app.config['CONTENT_DB_PATH'],
+                                 app.config['CONTENT_BUNDLE_PATH'])
+
+# Atraso (segundos) para agrupar alterações de cursos em uma única gravação de courses.json (0 grava na hora).
+app.config.setdefault('COURSES_WRITE_BEHIND', float(os.environ.get('CURSO_COURSES_WRITE_BEHIND', 0)))
+
 # Instancia os managers
 # Os managers agora carregam dados sob demanda ou na inicialização, conforme suas implementações.
-course_mgr = CourseManager()
-lesson_mgr = LessonManager()
-exercise_mgr = ExerciseManager()
+course_mgr = CourseManager(storage=content_storage, write_behind_delay=app.config['COURSES_WRITE_BEHIND'])
+lesson_mgr = LessonManager(storage=content_storage)
+exercise_mgr = ExerciseManager(storage=content_storage)
+
+# Cache dos arquivos de lições/exercícios já interpretados, revalidado por stat a cada acesso.
+app.config.setdefault('CONTENT_CACHE_MAX_ENTRIES', int(os.environ.get('CURSO_CONTENT_CACHE_MAX_ENTRIES', DEFAULT_CONTENT_CACHE_ENTRIES)))
+app.config.setdefault('CONTENT_CACHE_MAX_BYTES', int(os.environ.get('CURSO_CONTENT_CACHE_MAX_BYTES', DEFAULT_CONTENT_CACHE_BYTES)))
+content_cache.configure(max_entries=app.config['CONTENT_CACHE_MAX_ENTRIES'],
+                        max_bytes=app.config['CONTENT_CACHE_MAX_BYTES'])
+
+# Corpos das APIs de conteúdo, serializados e comprimidos uma única vez por versão do conteúdo (0 desabilita).
+app.config.setdefault('RESPONSE_CACHE_SIZE', int(os.environ.get('CURSO_RESPONSE_CACHE_SIZE', DEFAULT_RESPONSE_CACHE_SIZE)))
+response_cache = ResponseCache(maxsize=app.config['RESPONSE_CACHE_SIZE'] or 1)
+
+# Páginas HTML de curso e de lição já renderizadas, por versão do conteúdo (ver page_cache.py).
+app.config.setdefault('PAGE_CACHE_MAX_ENTRIES', int(os.environ.get('CURSO_PAGE_CACHE_MAX_ENTRIES', DEFAULT_PAGE_CACHE_ENTRIES)))
+app.config.setdefault('PAGE_CACHE_MAX_BYTES', int(os.environ.get('CURSO_PAGE_CACHE_MAX_BYTES', DEFAULT_PAGE_CACHE_BYTES)))
+page_cache = PageCache(max_entries=app.config['PAGE_CACHE_MAX_ENTRIES'], max_bytes=app.config['PAGE_CACHE_MAX_BYTES'])
+
+def _reload_changed_content(paths):
+    """Aplica as edições feitas no diretório de dados: recarrega `courses.json` e os arquivos em cache."""
+    courses_file = os.fspath(course_mgr.courses_file)
+    for path in paths:
+        if path == courses_file:
+            course_mgr.reload()
+        elif content_cache.refresh(path):
+            logger.info(f"Conteúdo recarregado: {path}")
+
+# Watcher do diretório de dados: com ele ativo, edições nos JSON são aplicadas em segundo
+# plano e as requisições deixam de revalidar os arquivos (CURSO_CONTENT_WATCH=0 desabilita).
+app.config.setdefault('CONTENT_WATCH_ENABLED', os.environ.get('CURSO_CONTENT_WATCH', '1') != '0')
+app.config.setdefault('CONTENT_WATCH_INTERVAL', float(os.environ.get('CURSO_CONTENT_WATCH_INTERVAL', DEFAULT_CONTENT_WATCH_INTERVAL)))
+content_watcher = None
+if app.config['CONTENT_WATCH_ENABLED'] and content_storage is None:
+    content_watcher = ContentWatcher(course_mgr.data_dir, _reload_changed_content,
+                                     poll_interval=app.config['CONTENT_WATCH_INTERVAL']).start()
+    content_cache.watch(course_mgr.data_dir)
+
+# Configura o pool de processos que executa o código dos usuários.
+# CURSO_EXECUTOR_POOL_SIZE=0 executa o código no próprio processo do servidor.
+app.config.setdefault('EXECUTOR_POOL_SIZE', int(os.environ.get('CURSO_EXECUTOR_POOL_SIZE', code_executor.DEFAULT_POOL_SIZE)))
+app.config.setdefault('EXECUTOR_TIMEOUT', float(os.environ.get('CURSO_EXECUTOR_TIMEOUT', code_executor.DEFAULT_TIMEOUT)))
+# Limites por execução: segundos de CPU, MB de memória adicional e caracteres de saída (0 desabilita).
+app.config.setdefault('EXECUTOR_CPU_TIME_LIMIT', int(os.environ.get('CURSO_EXECUTOR_CPU_LIMIT', code_executor.DEFAULT_CPU_TIME_LIMIT)))
+app.config.setdefault('EXECUTOR_MEMORY_LIMIT_MB', int(os.environ.get('CURSO_EXECUTOR_MEMORY_LIMIT_MB', code_executor.DEFAULT_MEMORY_LIMIT_MB)))
+app.config.setdefault('EXECUTOR_MAX_OUTPUT_CHARS', int(os.environ.get('CURSO_EXECUTOR_MAX_OUTPUT', code_executor.DEFAULT_MAX_OUTPUT_CHARS)))
+# Total de bytes de saída enviados por /api/execute-code/stream (0 desabilita o limite).
+app.config.setdefault('EXECUTOR_MAX_STREAM_BYTES', int(os.environ.get('CURSO_EXECUTOR_MAX_STREAM_BYTES', code_executor.DEFAULT_MAX_STREAM_BYTES)))
+# Processos executores derivados de um "zygote" (forkserver) que importa uma única vez as
+# bibliotecas dos exercícios avançados (lista separada por vírgulas em CURSO_EXECUTOR_PRELOAD).
+app.config.setdefault('EXECUTOR_START_METHOD', os.environ.get(
+    'CURSO_EXECUTOR_START_METHOD', 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else ''))
+app.config.setdefault('EXECUTOR_PRELOAD_MODULES', [name.strip() for name in os.environ.get(
+    'CURSO_EXECUTOR_PRELOAD', ','.join(code_executor.DEFAULT_PRELOAD_MODULES)).split(',') if name.strip()])
+# Modo de captura da saída quando o pool está desabilitado: "thread" (seguro com várias threads) ou "redirect".
+app.config.setdefault('EXECUTOR_CAPTURE_MODE', os.environ.get('CURSO_EXECUTOR_CAPTURE_MODE', 'thread'))
+code_executor.configure_executor(pool_size=app.config['EXECUTOR_POOL_SIZE'],
+                                 timeout=app.config['EXECUTOR_TIMEOUT'],
+                                 start_method=app.config['EXECUTOR_START_METHOD'] or None,
+                                 preload_modules=app.config['EXECUTOR_PRELOAD_MODULES'],
+                                 cpu_time_limit=app.config['EXECUTOR_CPU_TIME_LIMIT'],
+                                 memory_limit_mb=app.config['EXECUTOR_MEMORY_LIMIT_MB'],
+                                 max_output_chars=app.config['EXECUTOR_MAX_OUTPUT_CHARS'] or None,
+                                 max_stream_bytes=app.config['EXECUTOR_MAX_STREAM_BYTES'] or None,
+                                 capture_mode=app.config['EXECUTOR_CAPTURE_MODE'])
+
+# Cache de vereditos para submissões determinísticas repetidas (0 desabilita).
+app.config.setdefault('SUBMISSION_CACHE_SIZE', int(os.environ.get('CURSO_SUBMISSION_CACHE_SIZE', DEFAULT_SUBMISSION_CACHE_SIZE)))
+submission_cache = SubmissionCache(maxsize=app.config['SUBMISSION_CACHE_SIZE'] or 1)
+
+# Verificação estática (sintaxe, importações, aninhamento, laços infinitos) antes da execução.
+app.config.setdefault('STATIC_CHECK_ENABLED', os.environ.get('CURSO_STATIC_CHECK', '1') != '0')
+app.config.setdefault('STATIC_CHECK_MAX_NESTING', int(os.environ.get('CURSO_STATIC_CHECK_MAX_NESTING', DEFAULT_MAX_NESTING_DEPTH)))
+static_checker = StaticChecker(max_nesting_depth=app.config['STATIC_CHECK_MAX_NESTING'])
+
+# Controle de admissão das rotas síncronas de execução: no máximo ADMISSION_MAX_CONCURRENCY
+# execuções simultâneas e uma fila de até ADMISSION_MAX_QUEUE requisições, atendidas em
+# rodízio por cliente; o excedente recebe 503 com Retry-After.
+app.config.setdefault('ADMISSION_MAX_CONCURRENCY', int(os.environ.get('CURSO_ADMISSION_MAX_CONCURRENCY', app.config['EXECUTOR_POOL_SIZE'] or code_executor.DEFAULT_POOL_SIZE)))
+app.config.setdefault('ADMISSION_MAX_QUEUE', int(os.environ.get('CURSO_ADMISSION_MAX_QUEUE', DEFAULT_MAX_QUEUE_DEPTH)))
+app.config.setdefault('ADMISSION_MAX_WAIT', float(os.environ.get('CURSO_ADMISSION_MAX_WAIT', app.config['EXECUTOR_TIMEOUT'])))
+admission = AdmissionController(max_concurrency=app.config['ADMISSION_MAX_CONCURRENCY'],
+                                max_queue_depth=app.config['ADMISSION_MAX_QUEUE'],
+                                max_wait=app.config['ADMISSION_MAX_WAIT'])
+
+# Fila de correção assíncrona (/api/check-exercise/async), atendida por threads deste processo.
+app.config.setdefault('GRADING_WORKERS', int(os.environ.get('CURSO_GRADING_WORKERS', DEFAULT_GRADING_WORKERS)))
+grading_queue = GradingQueue(workers=app.config['GRADING_WORKERS'])
+# Tempo máximo (em segundos) que um stream de /api/jobs/<id>/events ocupa uma thread do servidor;
+# depois disso o stream é encerrado e o editor segue por polling.
+app.config.setdefault('GRADING_EVENTS_MAX_SECONDS', float(os.environ.get('CURSO_GRADING_EVENTS_MAX_SECONDS', 30)))
+
+# Métricas no formato do Prometheus (/metrics). Com vários processos, CURSO_METRICS_DIR aponta
+# para um diretório compartilhado onde cada processo grava seus valores (ver metrics.py).
+app.config.setdefault('METRICS_DIR', os.environ.get('CURSO_METRICS_DIR', ''))
+app.config.setdefault('METRICS_FLUSH_INTERVAL', float(os.environ.get('CURSO_METRICS_FLUSH_INTERVAL', DEFAULT_METRICS_FLUSH_INTERVAL)))
+metrics_registry.configure(directory=app.config['METRICS_DIR'] or None, flush_interval=app.config['METRICS_FLUSH_INTERVAL'])
+for cache_name, cache in (("content", content_cache), ("page", page_cache), ("response", response_cache),
+                          ("submission", submission_cache), ("test_code", compiled_test_code_cache)):
+    metrics_registry.caches.register(cache_name, cache)
+
+@app.before_request
+def _start_request_timer():
+    """Marca o início da requisição, para a métrica de latência."""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    """Registra a latência e o status da requisição (respostas em streaming: até o início do envio)."""
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        http_request_duration_seconds.observe(time.perf_counter() - started, endpoint)
+        http_requests_total.inc(endpoint, request.method, str(response.status_code))
+        metrics_registry.maybe_flush()
+    return response
+
+def _start_render_timer(sender, template, context, **extra):
+    """Marca o início da renderização de um template."""
+    g.render_started = time.perf_counter()
+
+def _record_render_metrics(sender, template, context, **extra):
+    """Registra a duração da renderização de um template."""
+    started = g.pop('render_started', None)
+    if started is not None:
+        template_render_seconds.observe(time.perf_counter() - started, template.name or 'string')
+
+before_render_template.connect(_start_render_timer, app)
+template_rendered.connect(_record_render_metrics, app)
+SSE_KEEPALIVE_SECONDS = 15
+SSE_RETRY_MS = 1000 # Intervalo de reconexão sugerido ao encerrar um stream de eventos
 
 # --- Rotas de Apresentação (HTML) ---
 
+# --- Validadores HTTP (ETag/Last-Modified) das páginas e APIs de conteúdo ---
+
+def _templates_signature():
+    """Assinatura dos arquivos de template, calculada na partida; faz parte do ETag das páginas HTML."""
+    templates_dir = os.path.join(app.root_path, app.template_folder)
+    signatures = []
+    for dirpath, _, filenames in os.walk(templates_dir):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            signatures.append((os.path.relpath(path, templates_dir), file_signature(path)))
+    return hashlib.sha256(repr(sorted(signatures)).encode('utf-8')).hexdigest()
+
+TEMPLATES_SIGNATURE = _templates_signature()
+
+def _content_validators(parts, signatures):
+    """
+    Calcula o ETag (forte) e o Last-Modified de uma resposta de conteúdo, sem carregá-lo.
+
+    Args:
+        parts (tuple): Valores que determinam a resposta além dos arquivos (ex: o curso).
+                       O caminho e a query string da requisição são sempre incluídos.
+        signatures (list): As assinaturas dos arquivos de origem (ver `LessonManager.content_signature`).
+
+    Returns:
+        tuple: `(etag, last_modified)`; `last_modified` é None se nenhuma assinatura tiver mtime
+               (backends SQLite e bundle).
+    """
+    key = json.dumps([request.full_path, parts, signatures], sort_keys=True, default=str)
+    etag = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+    mtimes = [signature[0] for signature in signatures if signature and signature[0] is not None]
+    last_modified = datetime.fromtimestamp(max(mtimes) / 1e9, tz=timezone.utc) if mtimes else None
+    return etag, last_modified
+
+def _with_validators(response, etag, last_modified):
+    """Adiciona ETag, Last-Modified e `Cache-Control: no-cache` (sempre revalidar) a uma resposta."""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def _not_modified(etag, last_modified):
+    """
+    Retorna uma resposta 304 se o cliente já tiver a versão atual (If-None-Match/If-Modified-Since).
+
+    Returns:
+        Response | None: A resposta 304, ou None se o conteúdo deve ser enviado.
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return _with_validators(Response(status=304), etag, last_modified)
+
+def _cached_page(etag, last_modified):
+    """
+    Retorna a página da requisição já renderizada em `page_cache`, se houver.
+
+    Returns:
+        Response | None: A resposta com o HTML armazenado, ou None se a página deve ser renderizada.
+    """
+    page = page_cache.get((request.endpoint, etag))
+    if page is None:
+        return None
+    return _with_validators(make_response(page), etag, last_modified)
+
+def _page_response(html, etag, last_modified, signatures, rendered_signatures):
+    """
+    Responde com a página renderizada e a armazena em `page_cache`.
+
+    A página não é armazenada se usar dados do usuário (ver `PageCache.put`) ou se os arquivos
+    de origem tiverem mudado durante a renderização: ela seria guardada sob o ETag antigo.
+
+    Args:
+        html (str): A página.
+        etag (str): O ETag calculado antes da renderização.
+        last_modified (datetime | None): O Last-Modified correspondente.
+        signatures (callable): Função sem argumentos que retorna as assinaturas atuais dos arquivos.
+        rendered_signatures (list): As assinaturas usadas no cálculo de `etag`.
+
+    Returns:
+        Response: A resposta 200.
+    """
+    if signatures() == rendered_signatures:
+        page = page_cache.put((request.endpoint, etag), html)
+    else:
+        page = html.encode('utf-8')
+    return _with_validators(make_response(page), etag, last_modified)
+
+def _cached_content_response(signatures, build, parts=()):
+    """
+    Responde a uma API de conteúdo com validadores HTTP e o corpo servido de `response_cache`.
+
+    A codificação (br, gzip ou nenhuma) é negociada pelo `Accept-Encoding` e entra no ETag
+    da representação (ex: `"<etag>-gzip"`). Se o cliente já tiver a versão atual, responde
+    304 sem chamar `build`; senão, o corpo é serializado e comprimido apenas na primeira
+    requisição de cada versão do conteúdo. Se os arquivos mudarem enquanto `build` carrega
+    o conteúdo, o corpo é enviado mas não fica no cache sob o ETag antigo.
+
+    Args:
+        signatures (callable): Função sem argumentos que retorna as assinaturas dos arquivos
+                               de origem (ver `_content_validators`); chamada antes e depois de `build`.
+        build (callable): Função sem argumentos que carrega o conteúdo e retorna a resposta
+                          sem compressão (ex: `jsonify(...)`).
+        parts (tuple, optional): Valores que determinam a resposta além dos arquivos (ex: o curso).
+
+    Returns:
+        Response: A resposta 200 ou 304.
+    """
+    current_signatures = signatures()
+    etag, last_modified = _content_validators(parts, current_signatures)
+    encoding = negotiate_encoding(request.accept_encodings) if app.config['RESPONSE_CACHE_SIZE'] else "identity"
+    representation_etag = etag if encoding == "identity" else f"{etag}-{encoding}"
+    response = _not_modified(representation_etag, last_modified)
+    if response is None:
+        if app.config['RESPONSE_CACHE_SIZE']:
+            cached = response_cache.get_or_build((request.endpoint, etag), build,
+                                                 is_current=lambda: signatures() == current_signatures)
+            response = Response(cached.body(encoding), mimetype=cached.mimetype, headers=cached.headers)
+            if encoding != "identity":
+                response.headers['Content-Encoding'] = encoding
+        else:
+            response = build()
+        _with_validators(response, representation_etag, last_modified)
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def home():
     """Renderiza a página inicial da aplicação.
@@ -69,6 +356,8 @@ def course_detail_page(course_id): # Renomeado para clareza
 
     Exibe informações sobre o curso e uma lista de suas lições.
     Se o curso não for encontrado, retorna um erro 404.
+    A resposta leva `ETag` e `Last-Modified`; se o cliente já tiver a versão atual,
+    responde 304 sem carregar as lições. O HTML renderizado fica em `page_cache`.
 
     Args:
         course_id (str): O ID do curso a ser exibido.
@@ -86,13 +375,25 @@ def course_detail_page(course_id): # Renomeado para clareza
     # As lições são carregadas aqui para serem passadas ao template
     # O frontend não precisará fazer uma chamada API separada para as lições nesta página.
     lessons_file_relative_path = course.get("lessons_file")
+    def signatures():
+        return [lesson_mgr.content_signature(lessons_file_relative_path)]
+
+    current_signatures = signatures()
+    etag, last_modified = _content_validators((TEMPLATES_SIGNATURE, course), current_signatures)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    cached_page = _cached_page(etag, last_modified)
+    if cached_page is not None:
+        return cached_page
     lessons_for_course = []
     if lessons_file_relative_path:
         lessons_for_course = lesson_mgr.load_lessons_from_file(lessons_file_relative_path)
     else:
         logger.warning(f"Curso '{course_id}' não possui 'lessons_file' definido.")
 
-    return render_template('course_detail.html', course=course, lessons=lessons_for_course, title=course.get('name', 'Detalhes do Curso'))
+    html = render_template('course_detail.html', course=course, lessons=lessons_for_course, title=course.get('name', 'Detalhes do Curso'))
+    return _page_response(html, etag, last_modified, signatures, current_signatures)
 
 @app.route('/courses/<string:course_id>/lessons/<string:lesson_id_str>', methods=['GET'])
 def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
@@ -102,6 +403,8 @@ def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
     (filtrados pelo nível do curso) e um link para a próxima lição, se houver.
     Retorna erro 404 se o curso ou a lição não forem encontrados, ou 500
     se houver problemas de configuração.
+    A resposta leva `ETag` e `Last-Modified`; se o cliente já tiver a versão atual,
+    responde 304 sem carregar as lições e exercícios. O HTML renderizado fica em `page_cache`.
 
     Args:
         course_id (str): O ID do curso ao qual a lição pertence.
@@ -121,41 +424,32 @@ def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
         logger.error(f"'lessons_file' não definido para o curso '{course_id}'.")
         abort(500, description="Configuração de lições ausente para este curso.")
 
-    all_lessons_for_course = lesson_mgr.load_lessons_from_file(lessons_file_relative_path)
-    
-    current_lesson = None
-    current_lesson_index = -1
-    for i, lesson_item_loop in enumerate(all_lessons_for_course):
-        if isinstance(lesson_item_loop, dict) and str(lesson_item_loop.get('id')) == lesson_id_str:
-            current_lesson = lesson_item_loop
-            current_lesson_index = i
-            break
+    exercises_file_relative_path = current_course.get("exercises_file")
+    def signatures():
+        return [lesson_mgr.content_signature(lessons_file_relative_path),
+                exercise_mgr.content_signature(exercises_file_relative_path)]
+
+    current_signatures = signatures()
+    etag, last_modified = _content_validators((TEMPLATES_SIGNATURE, current_course), current_signatures)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    cached_page = _cached_page(etag, last_modified)
+    if cached_page is not None:
+        return cached_page
+
+    current_lesson, current_lesson_index, all_lessons_for_course = lesson_mgr.get_lesson_by_id(lessons_file_relative_path, lesson_id_str)
 
     if not current_lesson:
         logger.warning(f"Lição com ID '{lesson_id_str}' não encontrada no curso '{course_id}'.")
         abort(404)
     
-    course_level_from_course_json = current_course.get('level')
-    expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
-        
     exercises_for_lesson = []
-    exercises_file_relative_path = current_course.get("exercises_file")
     if exercises_file_relative_path:
-        all_exercises_for_course = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-        lesson_actual_id = current_lesson.get('id') # ID da lição atual
-        if lesson_actual_id and all_exercises_for_course:
-            for ex_item in all_exercises_for_course:
-                # Log para depuração
-                logger.debug(f"Verificando exercício: ID='{ex_item.get('id')}', "
-                             f"LessonID_Ex='{ex_item.get('lesson_id')}', LessonID_Atual='{lesson_actual_id}', "
-                             f"Level_Ex='{ex_item.get('level', '').lower()}', Level_Esperado='{expected_exercise_level}'")
-                
-                # Verifica se o exercício pertence à lição atual E ao nível esperado do curso
-                if isinstance(ex_item, dict) and \
-                   str(ex_item.get('lesson_id')) == str(lesson_actual_id) and \
-                   (not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level):
-                    exercises_for_lesson.append(ex_item)
-        logger.debug(f"Encontrados {len(exercises_for_lesson)} exercícios para a lição '{lesson_actual_id}'.")
+        # Índice pré-calculado por (lição, nível), já ordenado por `order`.
+        exercises_for_lesson = exercise_mgr.get_exercises_for_lesson(exercises_file_relative_path, current_lesson.get('id'),
+                                                                     level=current_course.get('level'))
+        logger.debug(f"Encontrados {len(exercises_for_lesson)} exercícios para a lição '{current_lesson.get('id')}'.")
     else:
         logger.warning(f"Nenhum 'exercises_file' definido para o curso '{course_id}'.")
 
@@ -163,12 +457,13 @@ def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
     if current_lesson_index != -1 and current_lesson_index < len(all_lessons_for_course) - 1:
         next_lesson_obj = all_lessons_for_course[current_lesson_index + 1]
 
-    return render_template('lesson_detail.html', # Assumindo que o template se chama lesson_detail.html
+    html = render_template('lesson_detail.html', # Assumindo que o template se chama lesson_detail.html
                            course=current_course,
                            lesson=current_lesson,
                            exercises=exercises_for_lesson,
                            next_lesson=next_lesson_obj,
                            title=current_lesson.get('title', 'Lição'))
+    return _page_response(html, etag, last_modified, signatures, current_signatures)
 
 @app.route('/courses/<string:course_id>/exercise/<string:exercise_id_str>/editor', methods=['GET'])
 def exercise_code_editor_page(course_id, exercise_id_str): # Renomeado para clareza
@@ -200,15 +495,10 @@ def exercise_code_editor_page(course_id, exercise_id_str): # Renomeado para clar
     course_level_from_course_json = current_course.get('level')
     expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
 
-    all_exercises_for_course = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-    current_exercise = None
-    for ex_item in all_exercises_for_course:
-        if isinstance(ex_item, dict) and str(ex_item.get('id')) == exercise_id_str:
-            if not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level:
-                current_exercise = ex_item
-                break
-            else:
-                logger.warning(f"Editor: Exercício '{exercise_id_str}' encontrado, mas seu nível '{ex_item.get('level')}' não corresponde ao nível esperado do curso '{expected_exercise_level}'.")
+    current_exercise = exercise_mgr.get_exercise(exercises_file_relative_path, exercise_id_str)
+    if current_exercise and expected_exercise_level and current_exercise.get('level', '').lower() != expected_exercise_level:
+        logger.warning(f"Editor: Exercício '{exercise_id_str}' encontrado, mas seu nível '{current_exercise.get('level')}' não corresponde ao nível esperado do curso '{expected_exercise_level}'.")
+        current_exercise = None
 
     if not current_exercise:
         logger.warning(f"Editor: Exercício ID '{exercise_id_str}' não encontrado no curso '{course_id}' ou nível incompatível.")
@@ -233,17 +523,64 @@ def generic_code_editor_page():
 
 # --- Rotas de API (JSON) ---
 
+def _fields_param(name):
+    """Lê uma lista de campos separados por vírgula da query string (None se o parâmetro não foi informado)."""
+    fields = request.args.get(name)
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+def _list_query_params():
+    """
+    Lê os parâmetros de listagem da query string: `fields` (campos separados por vírgula),
+    `offset` e `limit`.
+
+    Returns:
+        tuple: `(campos, offset, limit)`; `campos` é None se `fields` não foi informado
+               e `limit` é None se não houver limite.
+
+    Raises:
+        ValueError: Se `offset` ou `limit` não forem inteiros não negativos.
+    """
+    fields = _fields_param('fields')
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = request.args.get('limit')
+        limit = None if limit is None else int(limit)
+    except ValueError:
+        raise ValueError("'offset' e 'limit' devem ser números inteiros.")
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("'offset' e 'limit' não podem ser negativos.")
+    return fields, offset, limit
+
+def _paginated_response(items, offset, limit):
+    """Responde com a página `items[offset:offset + limit]` e o total de itens no cabeçalho `X-Total-Count`."""
+    page = items[offset:] if limit is None else items[offset:offset + limit]
+    response = jsonify(page)
+    response.headers['X-Total-Count'] = str(len(items))
+    return response
+
 @app.route('/api/courses/<string:course_id>/lessons', methods=['GET'])
 def api_get_lessons_for_course(course_id):
     """API endpoint para obter as lições de um curso específico.
 
+    Parâmetros de Query (opcionais):
+        fields (str): Campos de cada lição, separados por vírgula (ex: `fields=id,title,order`).
+            Sem campos volumosos (`content`, `examples`, ...), as lições vêm dos resumos.
+        offset (int): Posição da primeira lição retornada (padrão 0).
+        limit (int): Número máximo de lições retornadas (padrão: todas).
+
     Args:
         course_id (str): O ID do curso.
 
     Returns:
         Response: Um objeto JSON contendo uma lista de lições.
-            Em caso de sucesso (200 OK):
+            Em caso de sucesso (200 OK, total de lições no cabeçalho `X-Total-Count`, com `ETag` e `Last-Modified`):
                 `[{"id": "1", "title": "Lição 1", ...}, ...]`
+            Em caso de parâmetros inválidos (400 Bad Request):
+                `{"error": "'offset' e 'limit' devem ser números inteiros."}`
+            Se `If-None-Match`/`If-Modified-Since` indicarem que o cliente já tem a versão
+            atual (304 Not Modified): sem corpo, antes de carregar o conteúdo.
             Em caso de curso não encontrado (404 Not Found):
                 `{"error": "Curso não encontrado"}`
             Em caso de arquivo de lições não definido (500 Internal Server Error):
@@ -261,20 +598,35 @@ def api_get_lessons_for_course(course_id):
         logger.error(f"API GET /courses/{course_id}/lessons - 'lessons_file' não definido para este curso.")
         return jsonify({"error": "Arquivo de lições não definido para este curso"}), 500
 
-    lessons = lesson_mgr.load_lessons_from_file(lessons_file_relative_path)
-    return jsonify(lessons)
+    try:
+        fields, offset, limit = _list_query_params()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _cached_content_response(
+        lambda: [lesson_mgr.content_signature(lessons_file_relative_path)],
+        lambda: _paginated_response(lesson_mgr.load_lessons_from_file(lessons_file_relative_path, fields=fields), offset, limit))
 
 @app.route('/api/courses/<string:course_id>/exercises', methods=['GET'])
 def api_get_exercises_for_course(course_id):
     """API endpoint para obter os exercícios de um curso específico.
 
+    Parâmetros de Query (opcionais):
+        fields (str): Campos de cada exercício, separados por vírgula (ex: `fields=id,title,lesson_id`).
+            Sem campos volumosos (`solution_code`, `test_code`, ...), os exercícios vêm dos resumos.
+        offset (int): Posição do primeiro exercício retornado (padrão 0).
+        limit (int): Número máximo de exercícios retornados (padrão: todos).
+
     Args:
         course_id (str): O ID do curso.
 
     Returns:
         Response: Um objeto JSON contendo uma lista de exercícios.
-            Em caso de sucesso (200 OK):
+            Em caso de sucesso (200 OK, total de exercícios no cabeçalho `X-Total-Count`, com `ETag` e `Last-Modified`):
                 `[{"id": "ex1", "title": "Exercício 1", ...}, ...]`
+            Em caso de parâmetros inválidos (400 Bad Request):
+                `{"error": "'offset' e 'limit' devem ser números inteiros."}`
+            Se `If-None-Match`/`If-Modified-Since` indicarem que o cliente já tem a versão
+            atual (304 Not Modified): sem corpo, antes de carregar o conteúdo.
             Em caso de curso não encontrado (404 Not Found):
                 `{"error": "Curso não encontrado"}`
             Em caso de arquivo de exercícios não definido (500 Internal Server Error):
@@ -292,8 +644,79 @@ def api_get_exercises_for_course(course_id):
         logger.error(f"API GET /courses/{course_id}/exercises - 'exercises_file' não definido para o curso.")
         return jsonify({"error": "Arquivo de exercícios não definido para este curso"}), 500
 
-    exercises = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-    return jsonify(exercises)
+    try:
+        fields, offset, limit = _list_query_params()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _cached_content_response(
+        lambda: [exercise_mgr.content_signature(exercises_file_relative_path)],
+        lambda: _paginated_response(exercise_mgr.load_exercises_from_file(exercises_file_relative_path, fields=fields), offset, limit))
+
+@app.route('/api/courses/<string:course_id>/bundle', methods=['GET'])
+def api_get_course_bundle(course_id):
+    """API endpoint com tudo o que a página de um curso precisa, em uma única requisição.
+
+    Reúne os metadados do curso, o sumário das lições (sem o conteúdo) e os esboços dos
+    exercícios (sem solução nem testes). O corpo é montado e comprimido uma vez por versão
+    do conteúdo (ver `_cached_content_response`).
+
+    Parâmetros de Query (opcionais):
+        fields (str): Campos do curso, separados por vírgula (padrão: todos).
+        lesson_fields (str): Campos de cada lição (padrão: os do resumo, sem `content`, `examples`, ...).
+        exercise_fields (str): Campos de cada exercício (padrão: os do resumo); `solution_code`
+            e `test_code` nunca são enviados.
+
+    Args:
+        course_id (str): O ID do curso.
+
+    Returns:
+        Response: Um objeto JSON com o curso, as lições e os exercícios.
+            Em caso de sucesso (200 OK, com `ETag` e `Last-Modified`):
+                `{"course": {"id": "python-basico", ...}, "lessons": [{"id": "1", "title": "Lição 1", ...}],
+                  "exercises": [{"id": "ex1", "lesson_id": "1", "title": "Exercício 1", ...}]}`
+            Se `If-None-Match`/`If-Modified-Since` indicarem que o cliente já tem a versão
+            atual (304 Not Modified): sem corpo, antes de carregar o conteúdo.
+            Em caso de curso não encontrado (404 Not Found):
+                `{"error": "Curso não encontrado"}`
+    """
+    logger.info(f"API GET /courses/{course_id}/bundle - Solicitando o pacote do curso ID: {course_id}")
+    course = course_mgr.get_course_by_id(course_id)
+    if not course:
+        logger.warning(f"API GET /courses/{course_id}/bundle - Curso não encontrado.")
+        return jsonify({"error": "Curso não encontrado"}), 404
+
+    lessons_file_relative_path = course.get("lessons_file")
+    exercises_file_relative_path = course.get("exercises_file")
+    course_fields = _fields_param('fields')
+    lesson_fields = _fields_param('lesson_fields')
+    exercise_fields = _fields_param('exercise_fields')
+    if exercise_fields is not None:
+        exercise_fields = [field for field in exercise_fields if field not in EXERCISE_SOLUTION_FIELDS]
+
+    def build():
+        lessons = []
+        if lessons_file_relative_path:
+            lessons = (lesson_mgr.load_lesson_summaries(lessons_file_relative_path) if lesson_fields is None
+                       else lesson_mgr.load_lessons_from_file(lessons_file_relative_path, fields=lesson_fields))
+        exercises = []
+        if exercises_file_relative_path:
+            exercises = (exercise_mgr.load_exercise_summaries(exercises_file_relative_path) if exercise_fields is None
+                         else exercise_mgr.load_exercises_from_file(exercises_file_relative_path, fields=exercise_fields))
+        return jsonify({
+            "course": course if course_fields is None else project_fields([course], course_fields)[0],
+            "lessons": lessons,
+            "exercises": without_fields(exercises, EXERCISE_SOLUTION_FIELDS),
+        })
+
+    def signatures():
+        current = []
+        if lessons_file_relative_path:
+            current.append(lesson_mgr.content_signature(lessons_file_relative_path))
+        if exercises_file_relative_path:
+            current.append(exercise_mgr.content_signature(exercises_file_relative_path))
+        return current
+
+    return _cached_content_response(signatures, build, parts=(course,))
 
 @app.route('/api/execute-code', methods=['POST'])
 def api_execute_code():
@@ -309,9 +732,13 @@ def api_execute_code():
 
     JSON de Resposta:
         Sucesso na execução (200 OK):
-            `{"success": true, "output": "str (stdout)", "details": "str (stderr, pode ser vazio)"}`
+            `{"success": true, "output": "str (stdout)", "details": "str (stderr, pode ser vazio)",
+              "output_truncated": false, "usage": {"wall_time": 0.01, "cpu_time": 0.01, "peak_rss_kb": 20480}}`
         Falha na execução (200 OK, mas success: false):
             `{"success": false, "output": "str (stdout até o erro)", "details": "str (stderr com a mensagem de erro)"}`
+        Rejeitado na verificação estática, sem execução (200 OK, success: false):
+            `{"success": false, "output": "", "details": "Verificação prévia: ...",
+              "static_check": {"error_type": "SyntaxError", "message": "...", "line": 1, "col": 6}}`
         Payload inválido (400 Bad Request):
             `{"success": false, "output": "", "details": "Payload inválido ou campo 'code' ausente."}`
         Erro interno do servidor (500 Internal Server Error):
@@ -324,8 +751,12 @@ def api_execute_code():
         return jsonify({"success": False, "output": "", "details": "Payload inválido ou campo 'code' ausente."}), 400
 
     user_code = data['code']
+    issue = _static_check(user_code, "POST /api/execute-code")
+    if issue:
+        return jsonify(_static_check_response(issue))
     try:
-        exec_result = code_executor.execute_code(user_code)
+        with admission.admit(_client_id()):
+            exec_result = code_executor.execute_code(user_code)
         success = exec_result["returncode"] == 0
         output = exec_result["stdout"]
         details = exec_result["stderr"]
@@ -334,12 +765,322 @@ def api_execute_code():
         elif not success and not details:
             details = "Erro durante a execução do código."
 
-        logger.info(f"POST /api/execute-code - Execução: success={success}")
-        return jsonify({"success": success, "output": output, "details": details})
+        logger.info(f"POST /api/execute-code - Execução: success={success}, usage={exec_result.get('usage')}")
+        return jsonify({"success": success, "output": output, "details": details,
+                        "output_truncated": exec_result.get("output_truncated", False),
+                        "usage": exec_result.get("usage")})
+    except AdmissionRejected as e:
+        return _admission_rejected_response(e, "POST /api/execute-code")
     except Exception as e:
         logger.error(f"POST /api/execute-code - Erro inesperado: {e}", exc_info=True)
         return jsonify({"success": False, "output": "", "details": f"Erro interno do servidor: {str(e)}"}), 500
 
+@app.route('/api/execute-code/stream', methods=['POST'])
+def api_execute_code_stream():
+    """API endpoint que executa código Python enviando a saída à medida que é produzida.
+
+    Recebe o mesmo JSON de `/api/execute-code` e responde com um stream
+    `text/event-stream` (server-sent events) lido pelo editor via `fetch`:
+    eventos `stdout`/`stderr` (`{"text": "..."}`) para cada pedaço de saída e um
+    evento final `result` com `success`, `details`, `output_truncated` e `usage`.
+    O total de saída enviado é limitado por `EXECUTOR_MAX_STREAM_BYTES`.
+
+    Returns:
+        Response: O stream de eventos, ou 400 se o payload for inválido.
+    """
+    logger.info("POST /api/execute-code/stream - Recebida requisição para executar código em streaming.")
+    data = request.get_json()
+    if not data or 'code' not in data:
+        logger.warning("POST /api/execute-code/stream - Payload inválido ou 'code' ausente.")
+        return jsonify({"success": False, "output": "", "details": "Payload inválido ou campo 'code' ausente."}), 400
+
+    user_code = data['code']
+    issue = _static_check(user_code, "POST /api/execute-code/stream")
+    slot = None
+    if not issue:
+        try:
+            # A vaga é mantida enquanto o stream estiver aberto; é liberada ao fim do stream
+            # ou, se ele nem chegar a ser consumido, ao fechar a resposta.
+            slot = admission.acquire(_client_id())
+        except AdmissionRejected as e:
+            return _admission_rejected_response(e, "POST /api/execute-code/stream")
+
+    def generate():
+        if issue:
+            yield _sse_event("result", _static_check_response(issue))
+            return
+        try:
+            for event, payload in code_executor.stream_code(user_code):
+                if event != "result":
+                    yield _sse_event(event, {"text": payload})
+                    continue
+                success = payload["returncode"] == 0
+                details = payload["stderr"]
+                if not success and not details:
+                    details = "Erro durante a execução do código."
+                logger.info(f"POST /api/execute-code/stream - Execução: success={success}, usage={payload.get('usage')}")
+                yield _sse_event("result", {"success": success, "details": details,
+                                            "output_truncated": payload.get("output_truncated", False),
+                                            "usage": payload.get("usage")})
+        except Exception as e:
+            logger.error(f"POST /api/execute-code/stream - Erro inesperado: {e}", exc_info=True)
+            yield _sse_event("result", {"success": False, "details": f"Erro interno do servidor: {str(e)}"})
+        finally:
+            if slot is not None:
+                slot.release()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    if slot is not None:
+        response.call_on_close(slot.release)
+    return response
+
+@app.route('/api/admission/stats', methods=['GET'])
+def api_admission_stats():
+    """API endpoint com as métricas do controle de admissão das rotas de execução.
+
+    JSON de Resposta (200 OK):
+        `{"active": 2, "queued": 5, "clients_waiting": 3, "max_concurrency": 4, "max_queue_depth": 64,
+          "admitted": 120, "rejected": 4, "timed_out": 1, "wait_time_avg": 0.31, "wait_time_max": 2.5,
+          "service_time_avg": 0.12}`
+    """
+    return jsonify(admission.stats())
+
+@app.route('/api/content-cache/stats', methods=['GET'])
+def api_content_cache_stats():
+    """API endpoint com as métricas do cache de arquivos de lições e exercícios.
+
+    JSON de Resposta (200 OK):
+        `{"entries": 12, "bytes": 183402, "max_entries": 256, "max_bytes": 67108864,
+          "hits": 5310, "misses": 14, "invalidations": 2, "evictions": 0}`
+    """
+    return jsonify(content_cache.stats())
+
+@app.route('/api/page-cache/stats', methods=['GET'])
+def api_page_cache_stats():
+    """API endpoint com as métricas do cache de páginas HTML renderizadas.
+
+    JSON de Resposta (200 OK):
+        `{"entries": 40, "bytes": 812345, "max_entries": 512, "max_bytes": 33554432,
+          "hits": 1200, "misses": 40, "bypasses": 0, "evictions": 0}`
+    """
+    return jsonify(page_cache.stats())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Métricas da aplicação no formato texto do Prometheus, somadas entre os processos.
+
+    Inclui latência e contagem das requisições por rota e status, renderização de templates,
+    leitura de arquivos de conteúdo, espera e duração das execuções de código e a taxa de
+    acertos dos caches (ver metrics.py).
+    """
+    return Response(metrics_registry.render(), mimetype=METRICS_CONTENT_TYPE)
+
+@app.route('/api/response-cache/stats', methods=['GET'])
+def api_response_cache_stats():
+    """API endpoint com as métricas do cache de respostas serializadas e comprimidas.
+
+    JSON de Resposta (200 OK):
+        `{"size": 6, "maxsize": 256, "hits": 940, "misses": 6, "evictions": 0, "encodings": ["gzip"]}`
+    """
+    return jsonify(response_cache.stats())
+
+def _client_id():
+    """Identifica o cliente da requisição atual para o rodízio do controle de admissão."""
+    return request.remote_addr or "desconhecido"
+
+def _admitted(client_id):
+    """Retorna o context manager de admissão para `client_id`, ou um nulo se for None."""
+    return admission.admit(client_id) if client_id is not None else nullcontext()
+
+def _admission_rejected_response(error, log_prefix):
+    """Monta a resposta 503 (com Retry-After) para uma requisição recusada pelo controle de admissão."""
+    logger.warning(f"{log_prefix} - {error}")
+    response = jsonify({"success": False, "output": "", "details": str(error)})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+def _static_check(user_code, log_prefix):
+    """Aplica a verificação estática ao código do usuário, se habilitada.
+
+    Args:
+        user_code (str): O código enviado pelo usuário.
+        log_prefix (str): Prefixo das mensagens de log.
+
+    Returns:
+        dict | None: O problema encontrado (ver `StaticChecker.check`), ou None.
+    """
+    if not app.config['STATIC_CHECK_ENABLED'] or not isinstance(user_code, str):
+        return None
+    issue = static_checker.check(user_code)
+    if issue:
+        logger.info(f"{log_prefix} - Código rejeitado na verificação estática: {issue['message']}")
+    return issue
+
+def _static_check_response(issue):
+    """Monta o corpo da resposta para código rejeitado na verificação estática, sem execução."""
+    return {"success": False, "output": "", "details": format_issue(issue),
+            "output_truncated": False, "usage": None, "static_check": issue}
+
+def _find_exercise_to_check(course_id, exercise_id_str, log_prefix="POST /api/check-exercise"):
+    """Localiza o exercício a ser verificado, validando o curso e o nível.
+
+    Args:
+        course_id (str): O ID do curso.
+        exercise_id_str (str): O ID do exercício.
+        log_prefix (str): Prefixo das mensagens de log.
+
+    Returns:
+        tuple: `(exercise, exercises_file, None)` se encontrado, ou `(None, None, (body, status_code))`
+               com a resposta de erro (404 para curso/exercício, 500 para configuração ausente).
+    """
+    course = course_mgr.get_course_by_id(course_id)
+    if not course:
+        logger.warning(f"{log_prefix} - Curso '{course_id}' não encontrado.")
+        return None, None, ({"success": False, "output": "", "details": f"Curso '{course_id}' não encontrado."}, 404)
+
+    exercises_file_relative_path = course.get("exercises_file")
+    if not exercises_file_relative_path:
+        logger.error(f"{log_prefix} - 'exercises_file' não definido para o curso '{course_id}'.")
+        return None, None, ({"success": False, "output": "", "details": "Arquivo de exercícios não definido para este curso."}, 500)
+
+    course_level_from_course_json = course.get('level')
+    expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
+
+    ex_item = exercise_mgr.get_exercise(exercises_file_relative_path, exercise_id_str)
+    if ex_item and (not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level):
+        return ex_item, exercises_file_relative_path, None
+
+    logger.warning(f"{log_prefix} - Exercício '{exercise_id_str}' não encontrado no curso '{course_id}' ou nível incompatível.")
+    return None, None, ({"success": False, "output": "", "details": f"Exercício '{exercise_id_str}' não encontrado no curso '{course_id}'."}, 404)
+
+def _check_exercise_submission(exercises_file, exercise_details_to_check, user_code, client_id=None):
+    """Executa o código do usuário e o `test_code` do exercício, produzindo o veredito.
+
+    Não depende do contexto da requisição, podendo ser chamada tanto pela rota
+    síncrona `/api/check-exercise` quanto pelas threads da fila de correção.
+
+    Args:
+        exercises_file (str): O arquivo de exercícios do curso, obtido por `_find_exercise_to_check`
+                              (usado na chave do cache de `test_code`).
+        exercise_details_to_check (dict): O exercício, obtido por `_find_exercise_to_check`.
+        user_code (str): O código enviado pelo usuário.
+        client_id (str, optional): Cliente da requisição; se fornecido, as execuções passam
+                                   pelo controle de admissão (`AdmissionRejected` se recusadas).
+
+    Returns:
+        dict: O corpo da resposta JSON: "success", "output", "details",
+              "output_truncated", "usage" e "cached".
+    """
+    issue = _static_check(user_code, "Verificação de exercício")
+    if issue:
+        verdict = _static_check_response(issue)
+        verdict["cached"] = False
+        return verdict
+
+    test_code = exercise_details_to_check.get("test_code", "")
+    # full_code_to_execute = user_code.rstrip() + "\n\n" + test_code # Lógica antiga
+    # O test_code é obtido já compilado do cache, evitando recompilá-lo a cada submissão.
+    compiled_test_code = get_compiled_test_code(exercise_details_to_check, exercises_file)
+
+    # Submissões determinísticas já verificadas (mesma AST normalizada e mesmo test_code)
+    # recebem o veredito armazenado, sem nova execução.
+    fingerprint = submission_cache.fingerprint(user_code, test_code) if app.config['SUBMISSION_CACHE_SIZE'] else None
+    cached_verdict = submission_cache.get(fingerprint)
+    if cached_verdict is not None:
+        logger.info(f"Verificação de exercício - Veredito reaproveitado do cache: success={cached_verdict['success']}")
+        cached_verdict["cached"] = True
+        return cached_verdict
+
+    # 1. Executar o código do usuário e capturar sua saída; 2. se ele não falhar, executar o
+    # test_code com essa saída disponível. As duas execuções ocupam uma única vaga de admissão,
+    # para que uma submissão já admitida não seja recusada no meio da correção.
+    test_exec_result = None
+    with _admitted(client_id):
+        user_exec_result = code_executor.execute_code(user_code)
+        if user_exec_result["returncode"] == 0 and test_code:
+            test_globals = {'output': user_exec_result["stdout"]} # Disponibiliza a saída do user_code para o test_code
+            test_exec_result = code_executor.execute_code(compiled_test_code, execution_globals=test_globals)
+    error_types = [user_exec_result.get("error_type")]
+    user_stdout = user_exec_result["stdout"]
+    user_stderr = user_exec_result["stderr"]
+    user_success = user_exec_result["returncode"] == 0
+    output_truncated = user_exec_result.get("output_truncated", False)
+    usage = user_exec_result.get("usage")
+
+    # Inicializa 'output' com a saída do código do usuário.
+    # Será sobrescrito pela saída do test_code se este for executado.
+    api_output_response = user_stdout
+    details = user_stderr # Detalhes podem vir do erro do usuário ou do teste
+    success = False # Assume que falha até que o test_code passe ou não haja test_code
+
+    if not user_success:
+        # Se o código do usuário já falhou (ex: SyntaxError), não precisamos rodar o test_code
+        details = user_stderr if user_stderr else "Erro de sintaxe ou execução no seu código."
+        logger.info(f"Verificação de exercício - Código do usuário falhou. Details: {details}")
+    elif not test_code:
+        # Se não há test_code, o sucesso depende apenas da execução do user_code
+        success = user_success
+        # 'api_output_response' já é user_stdout
+        details = "Código executado (sem testes automáticos)." if success else (details or "Erro na execução do código do usuário.")
+    else:
+        # 2. Avaliar o resultado do test_code, executado acima com a saída do user_code disponível
+        success = test_exec_result["returncode"] == 0
+        error_types.append(test_exec_result.get("error_type"))
+        output_truncated = output_truncated or test_exec_result.get("output_truncated", False)
+        usage = code_executor.merge_usage(usage, test_exec_result.get("usage"))
+
+        # O 'output' da API deve combinar o stdout do user_code e do test_code
+        # Se o test_code produziu output (ex: "SUCCESS"), anexe-o.
+        # Se o user_code produziu output, ele já está em api_output_response.
+        if test_exec_result["stdout"]:
+            api_output_response = (api_output_response or "") + test_exec_result["stdout"]
+
+        # Os 'details' devem incluir o tipo de erro se houver
+        details_from_test_code = test_exec_result["stderr"]
+        error_type_from_test = test_exec_result.get("error_type")
+
+        if error_type_from_test:
+            details = f"{error_type_from_test}: {details_from_test_code}"
+        else:
+            details = details_from_test_code if details_from_test_code else ("Teste falhou sem stderr específico." if not success else "Teste passou.")
+        # Se o user_code teve stderr, mas o test_code passou, podemos querer limpar os detalhes ou priorizar os do teste.
+
+    if not test_code and success:
+        details = "Código executado com sucesso (nenhum teste automático para este exercício)."
+    elif not test_code and not success:
+        details = f"Erro ao executar o código: {details if details else 'Erro desconhecido'}"
+
+    logger.info(f"Verificação de exercício - success={success}, usage={usage}")
+    verdict = {"success": success, "output": api_output_response, "details": details,
+               "output_truncated": output_truncated, "usage": usage}
+    submission_cache.put(fingerprint, verdict, error_types)
+    verdict["cached"] = False
+    return verdict
+
+def _check_exercise_job(exercises_file, exercise_details_to_check, user_code, client_id):
+    """Job da fila de correção: `_check_exercise_submission` sob o controle de admissão de `client_id`.
+
+    As execuções passam pelo rodízio entre clientes, como na rota síncrona; se a
+    admissão for recusada, o job termina com erro (`JobFailed`) e a mensagem de recusa.
+    """
+    try:
+        return _check_exercise_submission(exercises_file, exercise_details_to_check, user_code, client_id=client_id)
+    except AdmissionRejected as e:
+        raise JobFailed(f"{e} Tente novamente em {e.retry_after}s.") from e
+
+def _parse_check_exercise_payload(log_prefix):
+    """Valida o JSON de `/api/check-exercise` (síncrono ou assíncrono).
+
+    Returns:
+        tuple: `((course_id, exercise_id_str, user_code), None)` ou `(None, resposta_400)`.
+    """
+    data = request.get_json()
+    if not data or not all(k in data for k in ['course_id', 'exercise_id', 'code']):
+        logger.warning(f"{log_prefix} - Payload inválido ou campos ausentes.")
+        return None, (jsonify({"success": False, "output": "", "details": "Payload inválido. 'course_id', 'exercise_id', e 'code' são obrigatórios."}), 400)
+    return (data['course_id'], str(data['exercise_id']), data['code']), None
+
 @app.route('/api/check-exercise', methods=['POST'])
 def api_check_exercise():
     """API endpoint para verificar a solução de um exercício submetida pelo usuário.
@@ -349,6 +1090,13 @@ def api_check_exercise():
     exercício, executa-o também. A saída do código do usuário é disponibilizada
     para o `test_code` através de uma variável global `output` no escopo do teste.
 
+    Submissões determinísticas (sem `input`, aleatoriedade, tempo ou E/S) cuja
+    AST normalizada já foi verificada para o mesmo `test_code` recebem o veredito
+    armazenado em `submission_cache`, com `"cached": true`, sem nova execução.
+
+    Esta rota mantém a thread HTTP ocupada durante toda a correção; para não
+    bloqueá-la, use `/api/check-exercise/async`.
+
     JSON de Requisição:
         {
             "course_id": "str",
@@ -358,7 +1106,9 @@ def api_check_exercise():
 
     JSON de Resposta (200 OK, mesmo em caso de falha na lógica do exercício):
         Sucesso (código do usuário executou e testes passaram, ou não há testes):
-            `{"success": true, "output": "str (saída combinada)", "details": "str (mensagens do teste, ex: 'SUCCESS')"}`
+            `{"success": true, "output": "str (saída combinada)", "details": "str (mensagens do teste, ex: 'SUCCESS')",
+              "output_truncated": false, "usage": {"wall_time": ..., "cpu_time": ..., "peak_rss_kb": ...}}`
+            (`usage` combina as execuções do código do usuário e do `test_code`.)
         Falha (código do usuário com erro, ou testes falharam):
             `{"success": false, "output": "str (saída até o erro)", "details": "str (mensagem de erro)"}`
         Payload inválido (400 Bad Request):
@@ -374,97 +1124,141 @@ def api_check_exercise():
         Response: Uma resposta JSON contendo o resultado da verificação.
     """
     logger.info("POST /api/check-exercise - Recebida requisição para verificar exercício.")
-    data = request.get_json()
-    if not data or not all(k in data for k in ['course_id', 'exercise_id', 'code']):
-        logger.warning("POST /api/check-exercise - Payload inválido ou campos ausentes.")
-        return jsonify({"success": False, "output": "", "details": "Payload inválido. 'course_id', 'exercise_id', e 'code' são obrigatórios."}), 400
+    payload, error_response = _parse_check_exercise_payload("POST /api/check-exercise")
+    if error_response:
+        return error_response
+    course_id, exercise_id_str, user_code = payload
 
-    course_id = data['course_id']
-    exercise_id_str = str(data['exercise_id'])
-    user_code = data['code']
+    exercise_details_to_check, exercises_file, error = _find_exercise_to_check(course_id, exercise_id_str)
+    if error:
+        body, status_code = error
+        return jsonify(body), status_code
 
-    course = course_mgr.get_course_by_id(course_id)
-    if not course:
-        logger.warning(f"POST /api/check-exercise - Curso '{course_id}' não encontrado.")
-        return jsonify({"success": False, "output": "", "details": f"Curso '{course_id}' não encontrado."}), 404
+    try:
+        return jsonify(_check_exercise_submission(exercises_file, exercise_details_to_check, user_code,
+                                                  client_id=_client_id()))
+    except AdmissionRejected as e:
+        return _admission_rejected_response(e, "POST /api/check-exercise")
+    except Exception as e:
+        logger.error(f"POST /api/check-exercise - Erro inesperado: {e}", exc_info=True)
+        return jsonify({"success": False, "output": "", "details": f"Erro interno do servidor ao verificar: {str(e)}"}), 500 # No Linter: Adicionar espaço antes do #
 
-    exercises_file_relative_path = course.get("exercises_file")
-    if not exercises_file_relative_path:
-        logger.error(f"POST /api/check-exercise - 'exercises_file' não definido para o curso '{course_id}'.")
-        return jsonify({"success": False, "output": "", "details": "Arquivo de exercícios não definido para este curso."}), 500
+@app.route('/api/check-exercise/async', methods=['POST'])
+def api_check_exercise_async():
+    """API endpoint para verificar uma solução de forma assíncrona.
 
-    course_level_from_course_json = course.get('level')
-    expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
+    Valida o payload e localiza o exercício (erros 400/404/500 são retornados de
+    imediato, como em `/api/check-exercise`), enfileira a correção em
+    `grading_queue` e responde sem aguardar a execução do código. Na thread de
+    correção, as execuções passam pelo controle de admissão com o cliente da
+    requisição (rodízio entre clientes); se recusadas, o job termina com status "error".
 
-    exercises = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-    exercise_details_to_check = None
-    for ex_item in exercises:
-        if isinstance(ex_item, dict) and str(ex_item.get('id')) == exercise_id_str:
-            if not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level:
-                exercise_details_to_check = ex_item
-                break
+    JSON de Requisição: o mesmo de `/api/check-exercise`.
 
-    if not exercise_details_to_check:
-        logger.warning(f"POST /api/check-exercise - Exercício '{exercise_id_str}' não encontrado no curso '{course_id}' ou nível incompatível.") # No Linter: Adicionar espaço antes do #
-        return jsonify({"success": False, "output": "", "details": f"Exercício '{exercise_id_str}' não encontrado no curso '{course_id}'."}), 404
+    JSON de Resposta:
+        Job enfileirado (202 Accepted, com cabeçalho `Location`):
+            `{"job_id": "str", "status": "queued", "status_url": "/api/jobs/<id>", "events_url": "/api/jobs/<id>/events"}`
+        Fila cheia (503 Service Unavailable, com cabeçalho `Retry-After`):
+            `{"success": false, "output": "", "details": "Fila de correção cheia..."}`
 
-    test_code = exercise_details_to_check.get("test_code", "")
-    # full_code_to_execute = user_code.rstrip() + "\n\n" + test_code # Lógica antiga
+    Returns:
+        Response: Uma resposta JSON com o identificador do job.
+    """
+    logger.info("POST /api/check-exercise/async - Recebida requisição de verificação assíncrona.")
+    payload, error_response = _parse_check_exercise_payload("POST /api/check-exercise/async")
+    if error_response:
+        return error_response
+    course_id, exercise_id_str, user_code = payload
+
+    exercise_details_to_check, exercises_file, error = _find_exercise_to_check(course_id, exercise_id_str, "POST /api/check-exercise/async")
+    if error:
+        body, status_code = error
+        return jsonify(body), status_code
 
     try:
-        # 1. Executar o código do usuário e capturar sua saída
-        user_exec_result = code_executor.execute_code(user_code)
-        user_stdout = user_exec_result["stdout"]
-        user_stderr = user_exec_result["stderr"]
-        user_success = user_exec_result["returncode"] == 0
-        
-        # Inicializa 'output' com a saída do código do usuário.
-        # Será sobrescrito pela saída do test_code se este for executado.
-        api_output_response = user_stdout 
-        details = user_stderr # Detalhes podem vir do erro do usuário ou do teste
-        success = False # Assume que falha até que o test_code passe ou não haja test_code
-
-        if not user_success:
-            # Se o código do usuário já falhou (ex: SyntaxError), não precisamos rodar o test_code
-            details = user_stderr if user_stderr else "Erro de sintaxe ou execução no seu código."
-            logger.info(f"POST /api/check-exercise - Código do usuário falhou. Details: {details}")
-        elif not test_code:
-            # Se não há test_code, o sucesso depende apenas da execução do user_code
-            success = user_success
-            # 'api_output_response' já é user_stdout
-            details = "Código executado (sem testes automáticos)." if success else (details or "Erro na execução do código do usuário.")
-        else:
-            # 2. Preparar e executar o test_code com a saída do user_code disponível
-            test_globals = {'output': user_stdout} # Disponibiliza a saída do user_code para o test_code
-            test_exec_result = code_executor.execute_code(test_code, execution_globals=test_globals)
-            success = test_exec_result["returncode"] == 0
-            
-            # O 'output' da API deve combinar o stdout do user_code e do test_code
-            # Se o test_code produziu output (ex: "SUCCESS"), anexe-o.
-            # Se o user_code produziu output, ele já está em api_output_response.
-            if test_exec_result["stdout"]:
-                api_output_response = (api_output_response or "") + test_exec_result["stdout"]
-
-            # Os 'details' devem incluir o tipo de erro se houver
-            details_from_test_code = test_exec_result["stderr"]
-            error_type_from_test = test_exec_result.get("error_type")
-
-            if error_type_from_test:
-                details = f"{error_type_from_test}: {details_from_test_code}"
-            else:
-                details = details_from_test_code if details_from_test_code else ("Teste falhou sem stderr específico." if not success else "Teste passou.")
-            # Se o user_code teve stderr, mas o test_code passou, podemos querer limpar os detalhes ou priorizar os do teste.
+        job_id = grading_queue.submit(_check_exercise_job, exercises_file, exercise_details_to_check, user_code, _client_id())
+    except QueueFullError as e:
+        logger.warning(f"POST /api/check-exercise/async - {e}")
+        response = jsonify({"success": False, "output": "", "details": str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+    status_url = url_for('api_get_grading_job', job_id=job_id)
+    response = jsonify({"job_id": job_id, "status": STATUS_QUEUED, "status_url": status_url,
+                        "events_url": url_for('api_grading_job_events', job_id=job_id)})
+    response.headers['Location'] = status_url
+    return response, 202
+
+@app.route('/api/jobs/<string:job_id>', methods=['GET'])
+def api_get_grading_job(job_id):
+    """API endpoint para consultar (polling) o estado de um job de correção.
 
-        if not test_code and success:
-            details = "Código executado com sucesso (nenhum teste automático para este exercício)."
-        elif not test_code and not success:
-            details = f"Erro ao executar o código: {details if details else 'Erro desconhecido'}"
-        
-        logger.info(f"POST /api/check-exercise - Verificação: success={success}")
-        return jsonify({"success": success, "output": api_output_response, "details": details})
-    except Exception as e:
-        logger.error(f"POST /api/check-exercise - Erro inesperado: {e}", exc_info=True)
-        return jsonify({"success": False, "output": "", "details": f"Erro interno do servidor ao verificar: {str(e)}"}), 500 # No Linter: Adicionar espaço antes do #
+    Args:
+        job_id (str): O identificador retornado por `/api/check-exercise/async`.
+
+    Returns:
+        Response: JSON com "job_id", "status" ("queued", "running", "done" ou "error"),
+                  "result" (o mesmo corpo de `/api/check-exercise`, quando "done") e
+                  "error". 404 se o job não existir ou tiver expirado.
+    """
+    job = grading_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado ou expirado."}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<string:job_id>/events', methods=['GET'])
+def api_grading_job_events(job_id):
+    """API endpoint que acompanha um job de correção via server-sent events (SSE).
+
+    Emite um evento `status` a cada mudança de estado e um evento final `result`
+    (ou `error`) com o mesmo JSON de `/api/jobs/<job_id>`, encerrando o stream em
+    seguida. Comentários de keep-alive são enviados enquanto o job não muda.
+
+    Cada stream ocupa uma thread do servidor enquanto espera. Para que conexões
+    abertas não substituam as threads que a rota síncrona prendia, o stream é
+    encerrado após `GRADING_EVENTS_MAX_SECONDS` com um campo `retry:`; o editor
+    então continua acompanhando o job por polling em `/api/jobs/<job_id>`.
+
+    Args:
+        job_id (str): O identificador retornado por `/api/check-exercise/async`.
+
+    Returns:
+        Response: Um stream `text/event-stream`, ou 404 se o job não existir.
+    """
+    if grading_queue.get(job_id) is None:
+        return jsonify({"error": "Job não encontrado ou expirado."}), 404
+
+    deadline = time.monotonic() + app.config['GRADING_EVENTS_MAX_SECONDS']
+
+    def generate():
+        version = -1
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                yield f"retry: {SSE_RETRY_MS}\n\n"
+                return
+            job, new_version = grading_queue.wait(job_id, version, timeout=min(SSE_KEEPALIVE_SECONDS, remaining))
+            if job is None:
+                yield _sse_event("error", {"error": "Job não encontrado ou expirado."})
+                return
+            if new_version == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = new_version
+            if job["status"] == STATUS_DONE:
+                yield _sse_event("result", job)
+                return
+            if job["status"] == STATUS_ERROR:
+                yield _sse_event("error", job)
+                return
+            yield _sse_event("status", job)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _sse_event(event, data):
+    """Formata um evento server-sent events com `data` serializado em JSON."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 # --- Rota Legada (Manter por compatibilidade ou remover se não for mais usada) ---
 @app.route('/submit_exercise/<string:course_id>/<string:exercise_id_str>', methods=['POST'])
@@ -530,21 +1324,23 @@ def submit_exercise_solution_legacy(course_id, exercise_id_str):
     course_level_from_course_json = course.get('level')
     expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
 
-    exercises = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-    exercise_details_to_check = None
-    for ex_item in exercises:
-        if isinstance(ex_item, dict) and str(ex_item.get('id')) == exercise_id_str:
-            if not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level:
-                exercise_details_to_check = ex_item
-                break
+    exercise_details_to_check = exercise_mgr.get_exercise(exercises_file_relative_path, exercise_id_str)
+    if exercise_details_to_check and expected_exercise_level and \
+       exercise_details_to_check.get('level', '').lower() != expected_exercise_level:
+        exercise_details_to_check = None
     
     if not exercise_details_to_check:
         return jsonify({"success": False, "output": "", "details": f"Exercício '{exercise_id_str}' não encontrado."}), 404
 
     test_code = exercise_details_to_check.get("test_code", "")
-    full_code_to_execute = user_code.rstrip() + "\n\n" + test_code
+    # O código do usuário e o test_code (compilado, do cache) rodam em sequência no mesmo escopo,
+    # equivalente à antiga concatenação `user_code + "\n\n" + test_code`.
+    code_units = [user_code]
+    if test_code:
+        code_units.append(get_compiled_test_code(exercise_details_to_check, exercises_file_relative_path))
     try:
-        exec_result = code_executor.execute_code(full_code_to_execute)
+        with admission.admit(_client_id()):
+            exec_result = code_executor.execute_code(code_units)
         success = exec_result["returncode"] == 0
         output = exec_result["stdout"]
         details = exec_result["stderr"]
@@ -560,7 +1356,11 @@ def submit_exercise_solution_legacy(course_id, exercise_id_str):
         elif not test_code and not success:
             details = f"Erro ao executar o código: {details if details else 'Erro desconhecido'}"
 
-        return jsonify({"success": success, "output": output, "details": details})
+        return jsonify({"success": success, "output": output, "details": details,
+                        "output_truncated": exec_result.get("output_truncated", False),
+                        "usage": exec_result.get("usage")})
+    except AdmissionRejected as e:
+        return _admission_rejected_response(e, "POST /submit_exercise (legacy)")
     except Exception as e:
         logger.error(f"POST /submit_exercise (legacy) - Erro inesperado: {e}", exc_info=True)
         return jsonify({"success": False, "output": "", "details": f"Erro interno: {str(e)}"}), 500
@@ -604,6 +1404,55 @@ def internal_server_error(e):
         return jsonify(error=str(e.description or "Erro interno do servidor")), 500
     return render_template('500.html', title="Erro Interno", error_message=e.description or "Ocorreu um erro inesperado."), 500
 
+# --- Comandos de linha de comando (flask --app projects.app <comando>) ---
+
+@app.cli.command('import-content')
+@click.option('--data-dir', default=None, help="Diretório com courses.json (padrão: a pasta data/ do projeto).")
+@click.option('--db', 'db_path', default=None, help="Arquivo do banco SQLite (padrão: CURSO_CONTENT_DB).")
+def import_content_command(data_dir, db_path):
+    """Importa a árvore JSON de cursos, lições e exercícios para o banco SQLite."""
+    storage = SQLiteStorage(db_path or app.config['CONTENT_DB_PATH'])
+    counts = storage.import_data_dir(data_dir or course_mgr.data_dir)
+    click.echo(f"{counts['courses']} cursos, {counts['lessons']} lições e {counts['exercises']} exercícios "
+               f"importados para {storage.db_path}")
+
+@app.cli.command('build-bundle')
+@click.option('--data-dir', default=None, help="Diretório com courses.json (padrão: a pasta data/ do projeto).")
+@click.option('--output', default=None, help="Arquivo do bundle (padrão: CURSO_CONTENT_BUNDLE).")
+def build_bundle_command(data_dir, output):
+    """Valida o conteúdo e gera o bundle binário usado pelo backend "bundle"."""
+    output = output or app.config['CONTENT_BUNDLE_PATH']
+    try:
+        counts = build_bundle(data_dir or course_mgr.data_dir, output)
+    except BundleValidationError as e:
+        raise click.ClickException(str(e))
+    for warning in counts['warnings']:
+        click.echo(f"Aviso: {warning}", err=True)
+    click.echo(f"{counts['courses']} cursos, {counts['lessons']} lições e {counts['exercises']} exercícios "
+               f"gravados em {output} ({counts['bytes']} bytes)")
+
+@app.cli.command('bench-content')
+@click.option('--data-dir', default=None, help="Diretório com courses.json (padrão: a pasta data/ do projeto).")
+@click.option('--bundle', 'bundle_path', default=None, help="Arquivo do bundle (padrão: CURSO_CONTENT_BUNDLE).")
+@click.option('--repeat', default=5, show_default=True, help="Execuções para a medição de tempo.")
+def bench_content_command(data_dir, bundle_path, repeat):
+    """Compara a partida a frio e a memória dos arquivos JSON com as do bundle."""
+    results = benchmark(data_dir or course_mgr.data_dir, bundle_path or app.config['CONTENT_BUNDLE_PATH'], repeat=repeat)
+    for name, result in results.items():
+        click.echo(f"{name:>6}: {result['cold_start_ms']:.2f} ms, pico de {result['peak_bytes'] / 1024:.0f} KiB, "
+                   f"{result['retained_bytes'] / 1024:.0f} KiB retidos")
+
+@app.cli.command('export-static')
+@click.option('--output', required=True, help="Diretório de saída do site estático.")
+@click.option('--full', is_flag=True, help="Renderiza todas as páginas, ignorando o manifesto da exportação anterior.")
+def export_static_command(output, full):
+    """Exporta as páginas de conteúdo e as APIs de lições/exercícios como arquivos estáticos."""
+    counts = export_site(app, output, course_mgr, lesson_mgr, exercise_mgr,
+                         templates_signature=TEMPLATES_SIGNATURE, full=full)
+    click.echo(f"{counts['written']} arquivos gravados, {counts['unchanged']} inalterados e "
+               f"{counts['removed']} removidos em {output}")
+    if counts['failed']:
+        raise click.ClickException(f"{counts['failed']} páginas não puderam ser exportadas (ver o log).")
 
 if __name__ == '__main__':
     # Para desenvolvimento, debug=True é útil. Para produção, defina como False.
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com estruturas de cache em memória usadas pela aplicação.
+
+Define a classe `LRUCache`, um cache limitado e seguro para uso com várias
+threads, que descarta as entradas menos usadas recentemente quando atinge
+sua capacidade máxima e mantém contadores de acertos e falhas.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class LRUCache:
+    """
+    Cache LRU (Least Recently Used) limitado e seguro para várias threads.
+
+    Attributes:
+        maxsize (int): Número máximo de entradas mantidas.
+        hits (int): Número de buscas que encontraram a chave.
+        misses (int): Número de buscas que não encontraram a chave.
+        evictions (int): Número de entradas descartadas por falta de espaço.
+    """
+
+    def __init__(self, maxsize=128):
+        """
+        Inicializa o cache.
+
+        Args:
+            maxsize (int): Número máximo de entradas (mínimo 1).
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Retorna o valor associado a `key`, marcando-o como usado recentemente.
+
+        Args:
+            key (hashable): A chave procurada.
+            default: Valor retornado se a chave não estiver no cache.
+
+        Returns:
+            O valor armazenado, ou `default`.
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Armazena `value` em `key`, descartando as entradas mais antigas se necessário.
+
+        Args:
+            key (hashable): A chave.
+            value: O valor a ser armazenado.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, factory):
+        """
+        Retorna o valor de `key`, calculando-o com `factory()` se estiver ausente.
+
+        `factory` é chamada fora do lock; se duas threads calcularem o mesmo valor
+        ao mesmo tempo, a última escrita prevalece.
+
+        Args:
+            key (hashable): A chave.
+            factory (callable): Função sem argumentos que produz o valor.
+
+        Returns:
+            O valor armazenado ou recém-calculado.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        """Remove `key` do cache e retorna seu valor, ou `default` se ausente."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """Remove todas as entradas e zera os contadores."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            dict: "size", "maxsize", "hits", "misses" e "evictions".
+        """
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
@@ -9,15 +9,449 @@ bem como informações sobre exceções que possam ocorrer durante a execução.
 É projetado para ser usado em ambientes onde código fornecido pelo usuário
 precisa ser executado de forma segura, como em plataformas de aprendizado
 interativo de programação ou sistemas de avaliação automática de código.
+
+Por padrão, o código é executado em um pool de processos executores pré-criados
+(`WorkerPool`), com tempo limite por execução; um processo que excede o limite
+é encerrado e substituído. O pool pode ser configurado ou desabilitado com
+`configure_executor`.
+
+Cada execução é limitada em tempo de CPU e memória (RLIMIT_CPU e RLIMIT_AS,
+aplicados dentro do processo executor) e no tamanho da saída capturada. O
+resultado informa o tempo de parede, o tempo de CPU e o pico de memória
+residente medidos. Sem pool (`pool_size=0`), só o limite de saída é aplicado:
+não há tempo limite nem limites de CPU e memória, já que eles valeriam para o
+próprio servidor; esse modo serve apenas para desenvolvimento e testes.
+
+Quando o código roda no próprio processo do servidor (sem pool), a saída é
+capturada por thread (`capture_mode="thread"`): `sys.stdout`/`sys.stderr` são
+substituídos uma única vez por encaminhadores que enviam cada escrita ao buffer
+da thread que está executando, de modo que requisições concorrentes em um
+servidor WSGI com várias threads não misturam suas saídas.
+
+`stream_code` executa o código entregando stdout/stderr em pedaços à medida que
+são produzidos, com um limite total de bytes, sem acumular a saída completa.
 """
 import sys
 import io
+import os
+import time
+import types
+import atexit
+import pickle
+import marshal
+import queue
+import signal
 import logging
-from contextlib import redirect_stdout, redirect_stderr
+import threading
+import multiprocessing
+from contextlib import redirect_stdout, redirect_stderr, contextmanager, ExitStack
+
+try:
+    import resource # Disponível apenas em sistemas POSIX
+except ImportError: # pragma: no cover - Windows
+    resource = None
+
+from .metrics import executor_queue_seconds, executor_run_seconds
 
 logger = logging.getLogger(__name__)
 
-def execute_code(code_string, execution_globals=None):
+# Configuração padrão do pool de processos executores.
+DEFAULT_POOL_SIZE = min(4, os.cpu_count() or 1)
+DEFAULT_TIMEOUT = 10.0 # Tempo máximo (em segundos, relógio de parede) por execução
+DEFAULT_MAX_TASKS_PER_WORKER = 200 # Recicla o processo após N execuções
+DEFAULT_CPU_TIME_LIMIT = 5 # Segundos de CPU por execução (RLIMIT_CPU)
+DEFAULT_MEMORY_LIMIT_MB = 256 # Memória adicional por processo executor (RLIMIT_AS)
+DEFAULT_MAX_OUTPUT_CHARS = 100_000 # Tamanho máximo de stdout/stderr capturados
+DEFAULT_MAX_STREAM_BYTES = 1_000_000 # Total de bytes enviados por uma execução em streaming
+# Espera entre tentativas de criar um processo executor substituto (dobra a cada falha, até o máximo).
+SPAWN_RETRY_DELAY = 0.1
+SPAWN_RETRY_MAX_DELAY = 5.0
+SPAWN_FALLBACK_AFTER = 3 # Falhas com o zygote (forkserver) antes de criar processos sem ele
+# Bibliotecas usadas pelos exercícios do curso avançado, importadas uma única vez
+# antes de os processos executores atenderem execuções (ver `preload_modules`).
+DEFAULT_PRELOAD_MODULES = ("numpy", "pandas", "matplotlib", "sqlalchemy", "sqlalchemy.orm", "flask")
+
+_executor = None
+_executor_config = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "timeout": DEFAULT_TIMEOUT,
+    "max_tasks_per_worker": DEFAULT_MAX_TASKS_PER_WORKER,
+    "start_method": None,
+    "preload_modules": (),
+    "cpu_time_limit": DEFAULT_CPU_TIME_LIMIT,
+    "memory_limit_mb": DEFAULT_MEMORY_LIMIT_MB,
+    "max_output_chars": DEFAULT_MAX_OUTPUT_CHARS,
+    "max_stream_bytes": DEFAULT_MAX_STREAM_BYTES,
+    "capture_mode": "thread", # Usado apenas no modo sem pool
+}
+_executor_lock = threading.Lock()
+_streams_lock = threading.Lock()
+
+class ExecutionLimitExceeded(BaseException):
+    """
+    Levantada dentro do processo executor quando o limite de tempo de CPU é atingido.
+
+    Deriva de `BaseException` para que um `except Exception` no código do usuário
+    não consiga suprimir a interrupção.
+    """
+
+class _CappedStringIO(io.StringIO):
+    """
+    Buffer de texto que descarta o que exceder `max_chars` caracteres.
+
+    Attributes:
+        max_chars (int | None): Tamanho máximo do conteúdo; None para ilimitado.
+        truncated (bool): True se alguma escrita foi descartada (total ou parcialmente).
+    """
+
+    def __init__(self, max_chars=None):
+        super().__init__()
+        self.max_chars = max_chars
+        self.truncated = False
+        self._size = 0
+
+    def write(self, s):
+        if self.max_chars is None:
+            return super().write(s)
+        remaining = self.max_chars - self._size
+        if len(s) > remaining:
+            self.truncated = True
+            if remaining <= 0:
+                return len(s)
+            self._size += super().write(s[:remaining])
+            return len(s)
+        self._size += super().write(s)
+        return len(s)
+
+    def getvalue(self):
+        value = super().getvalue()
+        if self.truncated:
+            value += f"\n... [saída truncada: limite de {self.max_chars} caracteres excedido]\n"
+        return value
+
+class _StreamBudget:
+    """Limite de bytes compartilhado entre o stdout e o stderr de uma execução em streaming."""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.truncated = False
+
+class _StreamingOutput(io.TextIOBase):
+    """
+    Stream de texto que repassa a saída em pedaços ("chunks"), sem acumulá-la.
+
+    O texto escrito é agrupado por linha (ou a cada `CHUNK_CHARS` caracteres) e
+    entregue a `emit(name, text)`. Ao atingir o limite de bytes do `budget`, a
+    saída restante é descartada e um aviso de truncamento é emitido uma única vez.
+
+    Attributes:
+        name (str): Nome do stream ("stdout" ou "stderr"), repassado a `emit`.
+        truncated (bool): True se o limite de bytes foi atingido.
+    """
+
+    CHUNK_CHARS = 4096
+
+    def __init__(self, name, emit, budget):
+        super().__init__()
+        self.name = name
+        self._emit = emit
+        self._budget = budget
+        self._pending = []
+        self._pending_chars = 0
+
+    @property
+    def truncated(self):
+        return self._budget.truncated
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        budget = self._budget
+        if budget.truncated:
+            return len(s)
+        text = s
+        if budget.max_bytes is not None:
+            data = s.encode("utf-8", "replace")
+            remaining = budget.max_bytes - budget.used
+            if len(data) > remaining:
+                # Corta no limite de bytes sem partir um caractere multibyte.
+                text = data[:max(0, remaining)].decode("utf-8", "ignore")
+                budget.truncated = True
+            budget.used += len(text.encode("utf-8", "replace"))
+        if text:
+            self._pending.append(text)
+            self._pending_chars += len(text)
+        if budget.truncated:
+            self._pending.append(f"\n... [saída truncada: limite de {budget.max_bytes} bytes excedido]\n")
+            self.flush()
+        elif "\n" in text or self._pending_chars >= self.CHUNK_CHARS:
+            self.flush()
+        return len(s)
+
+    def flush(self):
+        if self._pending:
+            chunk = "".join(self._pending)
+            self._pending = []
+            self._pending_chars = 0
+            self._emit(self.name, chunk)
+
+    def getvalue(self):
+        """Envia o texto pendente; nada é retido, então o valor acumulado é sempre vazio."""
+        self.flush()
+        return ""
+
+def _make_output_buffers(max_output=None, emit=None):
+    """
+    Cria os buffers de stdout e stderr de uma execução.
+
+    Args:
+        max_output (int, optional): Limite de caracteres (buffers comuns) ou de bytes
+                                    compartilhado (streaming). None para ilimitado.
+        emit (callable, optional): Se fornecido, a saída é repassada em pedaços a
+                                   `emit(name, text)` em vez de acumulada.
+
+    Returns:
+        tuple: Os buffers de stdout e stderr.
+    """
+    if emit is None:
+        return _CappedStringIO(max_output), _CappedStringIO(max_output)
+    budget = _StreamBudget(max_output)
+    return _StreamingOutput("stdout", emit, budget), _StreamingOutput("stderr", emit, budget)
+
+class _ThreadLocalStream:
+    """
+    Substituto de `sys.stdout`/`sys.stderr` que encaminha escritas por thread.
+
+    Uma thread que registrou um buffer (via `_capture_thread_output`) escreve nele;
+    as demais threads escrevem no stream original (`fallback`). Atributos não
+    definidos aqui (encoding, isatty, fileno, ...) são delegados ao destino atual.
+
+    Note:
+        Threads criadas pelo próprio código do usuário não herdam o buffer e
+        escrevem no stream original. Para capturá-las, use o pool de processos
+        ou `capture_mode="redirect"`.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    @property
+    def buffer_for_current_thread(self):
+        """O buffer registrado pela thread atual, ou None."""
+        return getattr(self._local, "target", None)
+
+    @buffer_for_current_thread.setter
+    def buffer_for_current_thread(self, target):
+        self._local.target = target
+
+    def _target(self):
+        target = getattr(self._local, "target", None)
+        return target if target is not None else self._fallback
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def writelines(self, lines):
+        return self._target().writelines(lines)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+def _install_thread_local_streams():
+    """
+    Garante que `sys.stdout` e `sys.stderr` sejam encaminhadores `_ThreadLocalStream`.
+
+    A substituição só acontece se outro componente (ex: o próprio servidor ou o
+    pytest) tiver trocado o stream; nas demais chamadas nada é alterado.
+
+    Returns:
+        tuple[_ThreadLocalStream, _ThreadLocalStream]: Os encaminhadores de stdout e stderr.
+    """
+    with _streams_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStream):
+            sys.stdout = _ThreadLocalStream(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadLocalStream):
+            sys.stderr = _ThreadLocalStream(sys.stderr)
+        return sys.stdout, sys.stderr
+
+@contextmanager
+def _capture_thread_output(stdout_buffer, stderr_buffer):
+    """
+    Direciona stdout/stderr apenas da thread atual para os buffers fornecidos.
+
+    Args:
+        stdout_buffer (io.StringIO): Destino das escritas em stdout.
+        stderr_buffer (io.StringIO): Destino das escritas em stderr.
+    """
+    out_stream, err_stream = _install_thread_local_streams()
+    previous = (out_stream.buffer_for_current_thread, err_stream.buffer_for_current_thread)
+    out_stream.buffer_for_current_thread = stdout_buffer
+    err_stream.buffer_for_current_thread = stderr_buffer
+    try:
+        yield
+    finally:
+        out_stream.buffer_for_current_thread, err_stream.buffer_for_current_thread = previous
+
+def _capture_output(stdout_buffer, stderr_buffer, capture="redirect"):
+    """
+    Retorna o context manager de captura de saída correspondente a `capture`.
+
+    Args:
+        stdout_buffer (io.StringIO): Destino de stdout.
+        stderr_buffer (io.StringIO): Destino de stderr.
+        capture (str): "redirect" troca `sys.stdout`/`sys.stderr` do processo
+                       (adequado a processos que executam uma tarefa por vez);
+                       "thread" captura apenas a thread atual, sem estado global por execução.
+    """
+    if capture == "thread":
+        return _capture_thread_output(stdout_buffer, stderr_buffer)
+    stack = ExitStack()
+    stack.enter_context(redirect_stdout(stdout_buffer))
+    stack.enter_context(redirect_stderr(stderr_buffer))
+    return stack
+
+class _MarshalledCode:
+    """Code object serializado com `marshal`, para envio aos processos executores."""
+
+    def __init__(self, code_object):
+        self.data = marshal.dumps(code_object)
+
+    def load(self):
+        """Reconstrói o code object original."""
+        return marshal.loads(self.data)
+
+def _encode_code(code):
+    """Prepara `code` (str, code object ou lista destes) para envio por pickle."""
+    if isinstance(code, (list, tuple)):
+        return [_encode_code(unit) for unit in code]
+    if isinstance(code, types.CodeType):
+        return _MarshalledCode(code)
+    return code
+
+def _decode_code(code):
+    """Operação inversa de `_encode_code`, executada no processo executor."""
+    if isinstance(code, list):
+        return [_decode_code(unit) for unit in code]
+    if isinstance(code, _MarshalledCode):
+        return code.load()
+    return code
+
+def _exec_units(code, namespace):
+    """Executa `code` (str, code object ou sequência destes) em `namespace`, em ordem."""
+    units = code if isinstance(code, (list, tuple)) else (code,)
+    for unit in units:
+        exec(unit, namespace)
+
+def execute_code(code_string, execution_globals=None, timeout=None):
+    """
+    Executa uma string de código Python e captura sua saída.
+
+    Se o pool de processos estiver habilitado (padrão), a execução acontece em um
+    processo executor pré-criado, isolado do processo do servidor, e é interrompida
+    após `timeout` segundos. Com `pool_size=0` (ver `configure_executor`), o código
+    é executado no próprio processo, como em `_execute_code_inline`.
+
+    Args:
+        code_string (str | types.CodeType | list): O código Python a ser executado: uma
+                                                   string, um code object já compilado
+                                                   (ex: de `compile()`), ou uma lista
+                                                   destes, executados em ordem no mesmo escopo.
+        execution_globals (dict, optional): Escopo global para a execução. No modo pool,
+                                            o dicionário precisa ser serializável (pickle)
+                                            e alterações feitas pelo código não são
+                                            refletidas de volta no dicionário do chamador.
+        timeout (float, optional): Tempo limite da execução em segundos. Defaults to None,
+                                   que usa o timeout configurado para o executor.
+
+    Returns:
+        dict: O mesmo formato retornado por `_execute_code_inline`, acrescido de
+              "usage" (ver `_run_job`).
+    """
+    executor = get_executor()
+    if executor is None:
+        return _run_inline_job("code", code_string, execution_globals,
+                               max_output=_executor_config["max_output_chars"], cpu_clock=time.thread_time,
+                               capture=_executor_config["capture_mode"])
+    return executor.run("code", code_string, execution_globals, timeout=timeout)
+
+def execute_test(test_code, namespace=None, timeout=None):
+    """
+    Executa um bloco de código de teste Python e captura sua saída.
+
+    Assim como `execute_code`, delega a execução ao pool de processos quando
+    habilitado, ou executa no próprio processo com `_execute_test_inline`.
+
+    Args:
+        test_code (str | types.CodeType): O código de teste a ser executado, como string
+                                          ou code object já compilado.
+        namespace (dict, optional): Escopo global para a execução do teste.
+        timeout (float, optional): Tempo limite da execução em segundos.
+
+    Returns:
+        dict: O mesmo formato retornado por `_execute_test_inline`, acrescido de
+              "usage" (ver `_run_job`).
+    """
+    executor = get_executor()
+    if executor is None:
+        return _run_inline_job("test", test_code, namespace,
+                               max_output=_executor_config["max_output_chars"], cpu_clock=time.thread_time,
+                               capture=_executor_config["capture_mode"])
+    return executor.run("test", test_code, namespace, timeout=timeout)
+
+def stream_code(code_string, execution_globals=None, timeout=None):
+    """
+    Executa código Python entregando stdout/stderr à medida que são produzidos.
+
+    Útil para programas longos que imprimem progressivamente (ex: exercícios de
+    threading/asyncio): o chamador recebe cada pedaço de saída sem esperar o fim
+    da execução, e a saída completa nunca é acumulada em memória. O total enviado
+    é limitado a `max_stream_bytes` (ver `configure_executor`).
+
+    Com o pool habilitado, delega a `WorkerPool.stream`. Com `pool_size=0`, o
+    código roda em uma thread auxiliar do próprio processo, com captura por thread.
+
+    Args:
+        code_string (str | types.CodeType | list): O código a ser executado (ver `execute_code`).
+        execution_globals (dict, optional): Escopo global para a execução.
+        timeout (float, optional): Tempo limite da execução em segundos (apenas no modo pool).
+
+    Yields:
+        tuple: `("stdout", text)`/`("stderr", text)` para cada pedaço de saída e,
+               por último, `("result", result)` com "returncode", "stderr" (mensagem
+               de erro, se houver), "error_type", "output_truncated" e "usage".
+    """
+    executor = get_executor()
+    if executor is not None:
+        yield from executor.stream("code", code_string, execution_globals, timeout=timeout)
+        return
+
+    events = queue.Queue()
+
+    def run():
+        try:
+            result = _run_inline_job("code", code_string, execution_globals,
+                                     max_output=_executor_config["max_stream_bytes"], cpu_clock=time.thread_time,
+                                     capture="thread", emit=lambda name, text: events.put((name, text)))
+        except Exception as e: # Falha do próprio executor, não do código do usuário
+            logger.error(f"Erro inesperado na execução em streaming: {e}", exc_info=True)
+            result = _worker_failure_result(str(e))
+        events.put(("result", result))
+
+    threading.Thread(target=run, name="code-stream", daemon=True).start()
+    while True:
+        event = events.get()
+        yield event
+        if event[0] == "result":
+            return
+
+def _execute_code_inline(code_string, execution_globals=None, max_output=None, capture="redirect",
+                         emit=None):
     """
     Executa uma string de código Python em um ambiente controlado e captura sua saída.
 
@@ -28,10 +462,18 @@ def execute_code(code_string, execution_globals=None):
     se não for fornecido de outra forma.
 
     Args:
-        code_string (str): O código Python a ser executado.
+        code_string (str | types.CodeType | list): O código Python a ser executado
+                                                   (ver `execute_code`).
         execution_globals (dict, optional): Um dicionário para usar como o escopo global
                                             para a execução. Defaults to None, que cria
                                             um novo dicionário vazio.
+        max_output (int, optional): Número máximo de caracteres capturados em
+                                    stdout/stderr. Defaults to None (ilimitado).
+        capture (str): Modo de captura da saída, "redirect" ou "thread"
+                       (ver `_capture_output`). Defaults to "redirect".
+        emit (callable, optional): Se fornecido, a saída é repassada em pedaços a
+                                   `emit(name, text)` durante a execução (ver
+                                   `_StreamingOutput`) e não é incluída no resultado.
 
     Returns:
         dict: Um dicionário contendo os resultados da execução:
@@ -41,29 +483,33 @@ def execute_code(code_string, execution_globals=None):
             - "stderr" (str): Saída capturada do stderr (mensagens de erro).
             - "error_type" (str | None): O nome da classe da exceção (ex: "SyntaxError",
                                          "ValueError"), ou None se não houve erro.
+            - "output_truncated" (bool): True se a saída excedeu `max_output`.
     """
     if execution_globals is None:
         execution_globals = {}
     # Garante que __name__ está presente, se não for passado
     execution_globals.setdefault('__name__', '__executor__')
 
+    stdout_buffer, stderr_buffer = _make_output_buffers(max_output, emit)
     try:
-        stdout_buffer = io.StringIO()
-        stderr_buffer = io.StringIO()
-        with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
-            exec(code_string, execution_globals)
+        with _capture_output(stdout_buffer, stderr_buffer, capture):
+            _exec_units(code_string, execution_globals)
         stdout = stdout_buffer.getvalue()
         stderr = stderr_buffer.getvalue()
-        return {"returncode": 0, "stdout": stdout, "stderr": stderr, "error_type": None}
-    except Exception as e:
+        truncated = stdout_buffer.truncated or stderr_buffer.truncated
+        return {"returncode": 0, "stdout": stdout, "stderr": stderr, "error_type": None, "output_truncated": truncated}
+    except (Exception, ExecutionLimitExceeded) as e:
         error_type_name = type(e).__name__
-        return {"returncode": 1, "stdout": "", "stderr": f"{error_type_name}: {str(e)}", "error_type": error_type_name}
+        stdout_buffer.flush() # No modo streaming, envia o que foi escrito antes do erro
+        stderr_buffer.flush()
+        return {"returncode": 1, "stdout": "", "stderr": f"{error_type_name}: {str(e)}", "error_type": error_type_name,
+                "output_truncated": stdout_buffer.truncated or stderr_buffer.truncated}
 
-def execute_test(test_code, namespace=None):
+def _execute_test_inline(test_code, namespace=None, max_output=None, capture="redirect", emit=None):
     """
     Executa um bloco de código de teste Python em um ambiente controlado.
 
-    Similar a `execute_code`, mas projetado especificamente para executar
+    Similar a `_execute_code_inline`, mas projetado especificamente para executar
     código de teste. O `namespace` fornecido é atualizado com `__builtins__`,
     `__name__` (definido como `__main__`), `__doc__`, e `__package__` para
     simular um ambiente de execução de script mais comum.
@@ -75,6 +521,13 @@ def execute_test(test_code, namespace=None):
         namespace (dict, optional): Um dicionário para ser usado como o escopo global
                                     durante a execução do código de teste.
                                     Defaults to None, que cria um novo dicionário vazio.
+        max_output (int, optional): Número máximo de caracteres capturados em
+                                    stdout/stderr. Defaults to None (ilimitado).
+        capture (str): Modo de captura da saída, "redirect" ou "thread"
+                       (ver `_capture_output`). Defaults to "redirect".
+        emit (callable, optional): Se fornecido, a saída é repassada em pedaços a
+                                   `emit(name, text)` durante a execução (ver
+                                   `_StreamingOutput`) e não é incluída no resultado.
 
     Returns:
         dict: Um dicionário contendo os resultados da execução do teste:
@@ -82,9 +535,9 @@ def execute_test(test_code, namespace=None):
             - "stdout" (str): Saída capturada do stdout.
             - "stderr" (str): Saída capturada do stderr. Em caso de AssertionError,
                               contém uma mensagem formatada "Teste falhou: <mensagem da asserção>".
+            - "output_truncated" (bool): True se a saída excedeu `max_output`.
     """
-    stdout_buffer = io.StringIO()
-    stderr_buffer = io.StringIO()
+    stdout_buffer, stderr_buffer = _make_output_buffers(max_output, emit)
     
     if namespace is None:
         namespace = {}
@@ -98,26 +551,639 @@ def execute_test(test_code, namespace=None):
     })
     
     try:
-        with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
-            exec(test_code, namespace)
+        with _capture_output(stdout_buffer, stderr_buffer, capture):
+            _exec_units(test_code, namespace)
 
         return {
             "returncode": 0,
             "stdout": stdout_buffer.getvalue(),
-            "stderr": ""
+            "stderr": "",
+            "output_truncated": stdout_buffer.truncated or stderr_buffer.truncated
         }
 
     except AssertionError as e:
         return {
             "returncode": 1, # Indica falha
             "stdout": stdout_buffer.getvalue(),
-            "stderr": f"Teste falhou: {str(e)}"
+            "stderr": f"Teste falhou: {str(e)}",
+            "output_truncated": stdout_buffer.truncated or stderr_buffer.truncated
         }
 
-    except Exception as e:
+    except (Exception, ExecutionLimitExceeded) as e:
         logger.error(f"Erro ao executar teste: {e}")
         return {
             "returncode": 1, # Indica falha
             "stdout": stdout_buffer.getvalue(),
-            "stderr": f"Erro ao executar teste: {str(e)}"
-        }
\ No newline at end of file
+            "stderr": f"Erro ao executar teste: {str(e)}",
+            "output_truncated": stdout_buffer.truncated or stderr_buffer.truncated
+        }
+
+
+def _peak_rss_kb():
+    """
+    Retorna o pico de memória residente do processo atual, em KB.
+
+    Returns:
+        int | None: O pico de RSS, ou None se o módulo `resource` não estiver disponível.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é reportado em bytes no macOS e em KB no Linux.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def _run_job(kind, code, execution_globals=None, max_output=None, cpu_clock=time.process_time,
+             capture="redirect", emit=None):
+    """
+    Executa uma tarefa ("code" ou "test") e mede os recursos consumidos.
+
+    Args:
+        kind (str): "code" para `_execute_code_inline` ou "test" para `_execute_test_inline`.
+        code (str): O código a ser executado.
+        execution_globals (dict, optional): Escopo global da execução.
+        max_output (int, optional): Número máximo de caracteres capturados.
+        cpu_clock (callable): Relógio de CPU usado na medição. Nos processos executores
+                              é `time.process_time`; no modo sem pool, `time.thread_time`,
+                              para não contabilizar outras requisições do servidor.
+        capture (str): Modo de captura da saída, "redirect" ou "thread".
+        emit (callable, optional): Destino da saída em streaming (ver `_StreamingOutput`);
+                                   neste caso `max_output` é um limite em bytes.
+
+    Returns:
+        dict: O resultado da execução acrescido de "usage", um dicionário com
+              "wall_time" (s), "cpu_time" (s) e "peak_rss_kb" (pico de memória
+              residente do processo que executou o código).
+    """
+    wall_start = time.perf_counter()
+    cpu_start = cpu_clock()
+    if kind == "test":
+        result = _execute_test_inline(code, execution_globals, max_output=max_output, capture=capture, emit=emit)
+    else:
+        result = _execute_code_inline(code, execution_globals, max_output=max_output, capture=capture, emit=emit)
+    result["usage"] = {
+        "wall_time": round(time.perf_counter() - wall_start, 6),
+        "cpu_time": round(cpu_clock() - cpu_start, 6),
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+    return result
+
+def _run_inline_job(kind, code, execution_globals=None, **kwargs):
+    """Executa `_run_job` no próprio processo (pool desabilitado), registrando a duração em `executor_run_seconds`."""
+    started = time.perf_counter()
+    try:
+        return _run_job(kind, code, execution_globals, **kwargs)
+    finally:
+        executor_run_seconds.observe(time.perf_counter() - started, kind)
+
+def merge_usage(*usages):
+    """
+    Combina as medições de várias execuções (ex: código do usuário + código de teste).
+
+    Tempos são somados e o pico de memória é o maior entre as execuções.
+
+    Args:
+        *usages (dict | None): Dicionários "usage" retornados pelas execuções.
+
+    Returns:
+        dict: Um dicionário "usage" combinado.
+    """
+    usages = [u for u in usages if u]
+    peaks = [u["peak_rss_kb"] for u in usages if u.get("peak_rss_kb") is not None]
+    return {
+        "wall_time": round(sum(u.get("wall_time") or 0 for u in usages), 6),
+        "cpu_time": round(sum(u.get("cpu_time") or 0 for u in usages), 6),
+        "peak_rss_kb": max(peaks) if peaks else None,
+    }
+
+def _raise_cpu_limit(signum, frame):
+    """Tratador de SIGXCPU: interrompe o código do usuário que excedeu o tempo de CPU."""
+    raise ExecutionLimitExceeded("Limite de tempo de CPU excedido.")
+
+def _apply_memory_limit(memory_limit_mb):
+    """
+    Limita o espaço de endereçamento (RLIMIT_AS) do processo executor atual.
+
+    O limite é relativo ao tamanho atual do processo: `memory_limit_mb` é a memória
+    adicional que o código do usuário pode alocar antes de receber um `MemoryError`.
+    """
+    if resource is None or not memory_limit_mb:
+        return
+    current_vm = 0
+    try:
+        with open("/proc/self/statm") as f:
+            current_vm = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    soft_limit = current_vm + int(memory_limit_mb) * 1024 * 1024
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if hard_limit != resource.RLIM_INFINITY:
+        soft_limit = min(soft_limit, hard_limit)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (soft_limit, hard_limit))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Não foi possível aplicar RLIMIT_AS no processo executor: {e}")
+
+def _arm_cpu_limit(cpu_time_limit):
+    """
+    Ajusta RLIMIT_CPU para permitir `cpu_time_limit` segundos a partir do consumo atual.
+
+    RLIMIT_CPU é cumulativo ao longo da vida do processo; como os executores são
+    reaproveitados, o limite flexível é recalculado antes de cada execução. Ao ser
+    atingido, o kernel envia SIGXCPU, convertido em `ExecutionLimitExceeded`.
+    """
+    if resource is None or not cpu_time_limit:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_CPU)
+    soft_limit = used + int(cpu_time_limit) + 1
+    if hard_limit != resource.RLIM_INFINITY:
+        soft_limit = min(soft_limit, hard_limit)
+    try:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft_limit, hard_limit))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Não foi possível aplicar RLIMIT_CPU no processo executor: {e}")
+
+def _timeout_result(timeout, elapsed=None):
+    """Monta o resultado retornado quando uma execução excede o tempo limite."""
+    return {
+        "returncode": 1,
+        "stdout": "",
+        "stderr": f"TimeoutError: Tempo limite de execução excedido ({timeout:g}s).",
+        "error_type": "TimeoutError",
+        "output_truncated": False,
+        "usage": {"wall_time": round(elapsed if elapsed is not None else timeout, 6),
+                  "cpu_time": None, "peak_rss_kb": None},
+    }
+
+def _worker_failure_result(message, error_type="WorkerError"):
+    """Monta o resultado retornado quando o processo executor falha inesperadamente."""
+    return {
+        "returncode": 1,
+        "stdout": "",
+        "stderr": f"{error_type}: {message}",
+        "error_type": error_type,
+        "output_truncated": False,
+        "usage": {"wall_time": None, "cpu_time": None, "peak_rss_kb": None},
+    }
+
+def _preload_modules(module_names):
+    """
+    Importa os módulos de `module_names`, ignorando os que não estiverem instalados.
+
+    Args:
+        module_names (iterable[str]): Nomes de módulos (ex: "numpy", "sqlalchemy.orm").
+    """
+    for module_name in module_names or ():
+        try:
+            __import__(module_name)
+        except Exception as e: # ImportError ou falha na inicialização do próprio módulo
+            logger.warning(f"Não foi possível pré-carregar o módulo '{module_name}': {e}")
+
+def _worker_main(conn, limits=None, preload_modules=()):
+    """
+    Laço principal de um processo executor do pool.
+
+    Recebe tarefas `(kind, code, globals, stream)` pela conexão, executa-as com
+    `_run_job` sob os limites configurados e devolve o dicionário de resultado.
+    Em tarefas com `stream` verdadeiro, a saída é enviada durante a execução como
+    mensagens `("chunk", name, text)`, antes do resultado. Termina ao receber
+    `None` ou quando a conexão é fechada pelo processo pai.
+
+    Args:
+        conn (multiprocessing.connection.Connection): Extremidade do pipe do executor.
+        limits (dict, optional): "cpu_time_limit" (s), "memory_limit_mb",
+                                 "max_output_chars" e "max_stream_bytes"
+                                 aplicados a cada execução.
+        preload_modules (iterable[str]): Módulos importados antes da primeira tarefa.
+                                         No método 'forkserver' eles já foram importados
+                                         pelo processo "zygote" e a importação é imediata.
+    """
+    limits = limits or {}
+    _preload_modules(preload_modules)
+    # Ctrl+C é tratado pelo processo pai, que encerra o pool.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    _apply_memory_limit(limits.get("memory_limit_mb"))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        kind, code, execution_globals, stream = job
+        code = _decode_code(code)
+        _arm_cpu_limit(limits.get("cpu_time_limit"))
+        if stream:
+            emit = lambda name, text: conn.send(("chunk", name, text))
+            result = _run_job(kind, code, execution_globals, max_output=limits.get("max_stream_bytes"), emit=emit)
+        else:
+            result = _run_job(kind, code, execution_globals, max_output=limits.get("max_output_chars"))
+        try:
+            conn.send(result)
+        except (OSError, pickle.PicklingError):
+            break
+
+class _Worker:
+    """Referência a um processo executor e à extremidade do pipe usada pelo pai."""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks_done = 0
+
+    def stop(self, kill=False):
+        """Encerra o processo executor, à força se `kill` for True."""
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+class WorkerPool:
+    """
+    Pool de processos executores pré-criados ("warm") para rodar código do usuário.
+
+    Cada processo atende uma execução por vez. Uma execução que ultrapassa o tempo
+    limite tem seu processo morto e substituído por um novo, de modo que um laço
+    infinito nunca prende uma thread do servidor nem um executor indefinidamente.
+
+    Com `start_method="forkserver"`, os processos são criados por um processo
+    "zygote" do multiprocessing que importa `preload_modules` uma única vez; cada
+    processo executor é uma cópia (copy-on-write) dele, já com as bibliotecas
+    carregadas, e atende uma única execução antes de ser substituído. Assim, o
+    custo de importar bibliotecas pesadas (numpy, pandas, ...) sai do caminho da
+    requisição sem que uma execução herde o estado deixado pela anterior.
+
+    Attributes:
+        size (int): Número de processos executores mantidos pelo pool.
+        timeout (float): Tempo limite padrão (em segundos) por execução.
+        max_tasks_per_worker (int): Número de execuções após o qual um processo é
+                                    reciclado, limitando efeitos colaterais acumulados.
+        limits (dict): Limites de CPU, memória e saída aplicados em cada processo.
+        preload_modules (tuple[str]): Módulos pré-carregados nos processos executores.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 max_tasks_per_worker=DEFAULT_MAX_TASKS_PER_WORKER, start_method=None,
+                 cpu_time_limit=DEFAULT_CPU_TIME_LIMIT, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+                 max_output_chars=DEFAULT_MAX_OUTPUT_CHARS, max_stream_bytes=DEFAULT_MAX_STREAM_BYTES,
+                 preload_modules=()):
+        """
+        Inicializa o pool e cria todos os processos executores.
+
+        Args:
+            size (int): Número de processos executores (mínimo 1).
+            timeout (float): Tempo limite padrão por execução, em segundos.
+            max_tasks_per_worker (int): Execuções por processo antes de reciclá-lo.
+            start_method (str, optional): Método de início do multiprocessing
+                                          ('fork', 'spawn', ...). Defaults to None,
+                                          que usa 'fork' quando disponível.
+            cpu_time_limit (int): Segundos de CPU por execução (RLIMIT_CPU). 0 desabilita.
+            memory_limit_mb (int): Memória adicional por processo (RLIMIT_AS). 0 desabilita.
+            max_output_chars (int): Tamanho máximo de stdout/stderr capturados.
+            max_stream_bytes (int): Total de bytes de saída enviados por uma execução
+                                    em streaming (ver `stream`).
+            preload_modules (iterable[str]): Módulos importados uma única vez e
+                                             compartilhados pelos processos executores.
+        """
+        default_start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        if start_method is None:
+            start_method = default_start_method
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self.preload_modules = tuple(preload_modules or ())
+        # Processos derivados do zygote são descartáveis: um por execução.
+        self.max_tasks_per_worker = 1 if start_method == "forkserver" else max_tasks_per_worker
+        self.limits = {
+            "cpu_time_limit": cpu_time_limit,
+            "memory_limit_mb": memory_limit_mb,
+            "max_output_chars": max_output_chars,
+            "max_stream_bytes": max_stream_bytes,
+        }
+        self._ctx = multiprocessing.get_context(start_method)
+        # Usado para criar substitutos se o zygote do forkserver deixar de responder.
+        self._fallback_ctx = multiprocessing.get_context(default_start_method)
+        if start_method == "forkserver":
+            # Só tem efeito antes de o forkserver (único por processo) ser iniciado.
+            self._ctx.set_forkserver_preload(["__main__", __name__, *self.preload_modules])
+        self._idle = queue.Queue()
+        self._closed = False
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+        logger.info(f"WorkerPool iniciado com {self.size} processos (timeout={self.timeout:g}s, método='{start_method}').")
+
+    def _spawn(self, ctx=None):
+        """Cria um novo processo executor (com o contexto `ctx`, por padrão o do pool) e retorna sua referência."""
+        ctx = ctx or self._ctx
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_worker_main, args=(child_conn, self.limits, self.preload_modules),
+                                    name="code-executor", daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _spawn_with_retry(self):
+        """
+        Cria um processo executor, tentando novamente (com espera crescente) até conseguir.
+
+        Se o pool usa o forkserver e o zygote falha `SPAWN_FALLBACK_AFTER` vezes seguidas,
+        os processos passam a ser criados com o método padrão ('fork' ou 'spawn'), que
+        importa os módulos de `preload_modules` em cada processo.
+
+        Returns:
+            _Worker | None: O processo criado, ou None se o pool for encerrado antes.
+        """
+        ctx = self._ctx
+        delay = SPAWN_RETRY_DELAY
+        failures = 0
+        while not self._closed:
+            try:
+                return self._spawn(ctx)
+            except Exception as e:
+                failures += 1
+                logger.error(f"Falha ao criar processo executor (tentativa {failures}, método='{ctx.get_start_method()}'): {e}")
+            if ctx is not self._fallback_ctx and failures >= SPAWN_FALLBACK_AFTER:
+                logger.warning(f"Criando processos executores com o método '{self._fallback_ctx.get_start_method()}', sem o zygote.")
+                ctx = self._fallback_ctx
+            time.sleep(delay)
+            delay = min(delay * 2, SPAWN_RETRY_MAX_DELAY)
+        return None
+
+    def _replace(self, worker, kill=False):
+        """
+        Encerra `worker` e retorna um processo novo para ocupar seu lugar.
+
+        Se a criação falhar, o substituto é criado em segundo plano (ver `_recycle`),
+        para que o pool mantenha o seu tamanho sem prender a requisição atual.
+
+        Returns:
+            _Worker | None: O processo novo, ou None se ele estiver sendo criado em segundo plano.
+        """
+        worker.stop(kill=kill)
+        try:
+            return self._spawn()
+        except Exception as e:
+            logger.error(f"Falha ao criar o substituto do processo executor: {e}. Nova tentativa em segundo plano.")
+            self._start_recycle(None)
+            return None
+
+    def run(self, kind, code, execution_globals=None, timeout=None):
+        """
+        Executa uma tarefa em um processo livre do pool, aguardando um se necessário.
+
+        Args:
+            kind (str): "code" para `_execute_code_inline` ou "test" para `_execute_test_inline`.
+            code (str | types.CodeType | list): O código a ser executado. Code objects são
+                                                transmitidos com `marshal`, evitando uma nova
+                                                compilação no processo executor.
+            execution_globals (dict, optional): Escopo global da execução (serializável).
+            timeout (float, optional): Tempo limite em segundos. Defaults to None,
+                                       que usa `self.timeout`.
+
+        Returns:
+            dict: O resultado da execução, ou um resultado de erro com
+                  `error_type` "TimeoutError" / "WorkerError".
+        """
+        if self._closed:
+            raise RuntimeError("WorkerPool já foi encerrado.")
+        timeout = self.timeout if timeout is None else float(timeout)
+        queued_at = time.perf_counter()
+        worker = self._idle.get()
+        started = time.perf_counter()
+        executor_queue_seconds.observe(started - queued_at, "pool")
+        try:
+            try:
+                worker.conn.send((kind, _encode_code(code), execution_globals, False))
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                # Falha de serialização ocorre antes de qualquer escrita no pipe.
+                logger.error(f"Escopo de execução não serializável: {e}")
+                return _worker_failure_result(f"Escopo de execução não serializável: {e}", type(e).__name__)
+
+            if not worker.conn.poll(timeout):
+                logger.warning(f"Execução excedeu o tempo limite de {timeout:g}s. Reiniciando processo executor (pid={worker.process.pid}).")
+                worker = self._replace(worker, kill=True)
+                return _timeout_result(timeout, time.perf_counter() - started)
+
+            result = worker.conn.recv()
+            worker = self._after_job(worker, result)
+            return result
+        except (EOFError, OSError) as e:
+            logger.error(f"Processo executor (pid={worker.process.pid}) terminou inesperadamente: {e}")
+            worker = self._replace(worker, kill=True)
+            return _worker_failure_result("O processo executor terminou inesperadamente.")
+        finally:
+            executor_run_seconds.observe(time.perf_counter() - started, kind)
+            self._release(worker)
+
+    def stream(self, kind, code, execution_globals=None, timeout=None):
+        """
+        Executa uma tarefa como `run`, entregando a saída à medida que é produzida.
+
+        A saída não é acumulada nem no processo executor nem no processo do servidor:
+        cada pedaço é repassado assim que chega, até o limite `max_stream_bytes`.
+        Se o consumidor abandonar o gerador antes do fim (ex: o cliente HTTP
+        desconectou), o processo executor é encerrado e substituído.
+
+        Args:
+            kind (str): "code" ou "test" (ver `run`).
+            code (str | types.CodeType | list): O código a ser executado.
+            execution_globals (dict, optional): Escopo global da execução (serializável).
+            timeout (float, optional): Tempo limite total em segundos. Defaults to None,
+                                       que usa `self.timeout`.
+
+        Yields:
+            tuple: `("stdout", text)` ou `("stderr", text)` para cada pedaço de saída e,
+                   por último, `("result", result)`, com o mesmo formato de `run`
+                   (mas com "stdout" vazio, já que a saída foi enviada em pedaços).
+        """
+        if self._closed:
+            raise RuntimeError("WorkerPool já foi encerrado.")
+        timeout = self.timeout if timeout is None else float(timeout)
+        queued_at = time.perf_counter()
+        worker = self._idle.get()
+        started = time.perf_counter()
+        executor_queue_seconds.observe(started - queued_at, "pool")
+        deadline = started + timeout
+        finished = False
+        try:
+            try:
+                worker.conn.send((kind, _encode_code(code), execution_globals, True))
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                logger.error(f"Escopo de execução não serializável: {e}")
+                finished = True
+                yield "result", _worker_failure_result(f"Escopo de execução não serializável: {e}", type(e).__name__)
+                return
+
+            while True:
+                if not worker.conn.poll(max(0.0, deadline - time.perf_counter())):
+                    logger.warning(f"Execução em streaming excedeu o tempo limite de {timeout:g}s. Reiniciando processo executor (pid={worker.process.pid}).")
+                    worker = self._replace(worker, kill=True)
+                    finished = True
+                    yield "result", _timeout_result(timeout, time.perf_counter() - started)
+                    return
+                message = worker.conn.recv()
+                if isinstance(message, tuple):
+                    _, name, text = message
+                    yield name, text
+                    continue
+                worker = self._after_job(worker, message)
+                finished = True
+                yield "result", message
+                return
+        except (EOFError, OSError) as e:
+            logger.error(f"Processo executor (pid={worker.process.pid}) terminou inesperadamente: {e}")
+            worker = self._replace(worker, kill=True)
+            finished = True
+            yield "result", _worker_failure_result("O processo executor terminou inesperadamente.")
+        finally:
+            if not finished:
+                # O consumidor abandonou o stream no meio da execução.
+                worker = self._replace(worker, kill=True)
+            executor_run_seconds.observe(time.perf_counter() - started, kind)
+            self._release(worker)
+
+    def _after_job(self, worker, result):
+        """
+        Contabiliza uma execução concluída e recicla o processo se necessário.
+
+        A substituição acontece em segundo plano, para que o resultado seja devolvido
+        sem esperar o encerramento do processo antigo e a criação do novo.
+
+        Returns:
+            _Worker | None: O próprio `worker`, ou None se ele estiver sendo substituído.
+        """
+        worker.tasks_done += 1
+        exhausted = self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker
+        # Um processo que atingiu um limite de recurso é reciclado por precaução.
+        if exhausted or result.get("error_type") in ("ExecutionLimitExceeded", "MemoryError"):
+            self._start_recycle(worker)
+            return None
+        return worker
+
+    def _start_recycle(self, worker):
+        """Executa `_recycle(worker)` em uma thread em segundo plano."""
+        threading.Thread(target=self._recycle, args=(worker,), name="code-executor-recycle", daemon=True).start()
+
+    def _recycle(self, worker):
+        """
+        Cria o substituto de `worker`, devolve-o ao pool e encerra o processo antigo.
+
+        A criação é repetida até dar certo (ver `_spawn_with_retry`): se o substituto
+        fosse perdido, o pool encolheria até `run` ficar bloqueado para sempre.
+
+        Args:
+            worker (_Worker | None): O processo a encerrar, ou None se ele já foi encerrado.
+        """
+        try:
+            self._release(self._spawn_with_retry())
+        finally:
+            if worker is not None:
+                worker.stop()
+
+    def _release(self, worker):
+        """Devolve `worker` ao conjunto de processos livres (ou o encerra, se o pool foi fechado)."""
+        if worker is None:
+            return
+        if self._closed:
+            worker.stop()
+        else:
+            self._idle.put(worker)
+
+    def shutdown(self):
+        """Encerra todos os processos executores ociosos do pool."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+        logger.info("WorkerPool encerrado.")
+
+def configure_executor(pool_size=None, timeout=None, max_tasks_per_worker=None, start_method=None,
+                       cpu_time_limit=None, memory_limit_mb=None, max_output_chars=None,
+                       capture_mode=None, max_stream_bytes=None, preload_modules=None):
+    """
+    Ajusta a configuração do executor global usado por `execute_code`/`execute_test`.
+
+    Um pool existente é encerrado; o novo é criado sob demanda na próxima execução.
+
+    Args:
+        pool_size (int, optional): Número de processos executores. 0 desabilita o pool
+                                   e executa o código no próprio processo, sem tempo
+                                   limite nem limites de CPU e memória (um aviso é registrado).
+        timeout (float, optional): Tempo limite padrão por execução, em segundos.
+        max_tasks_per_worker (int, optional): Execuções por processo antes de reciclá-lo.
+        start_method (str, optional): Método de início do multiprocessing. "forkserver"
+                                      cria um processo novo, derivado de um zygote com
+                                      `preload_modules` já importados, por execução.
+        cpu_time_limit (int, optional): Segundos de CPU por execução.
+        memory_limit_mb (int, optional): Memória adicional por processo executor, em MB.
+        max_output_chars (int, optional): Tamanho máximo de stdout/stderr capturados.
+        capture_mode (str, optional): Modo de captura da saída no modo sem pool:
+                                      "thread" (padrão, seguro com várias threads)
+                                      ou "redirect".
+        max_stream_bytes (int, optional): Total de bytes de saída enviados por uma
+                                          execução em streaming (`stream_code`).
+        preload_modules (iterable[str], optional): Módulos pré-carregados nos processos
+                                                   executores (ex: `DEFAULT_PRELOAD_MODULES`).
+    """
+    global _executor
+    with _executor_lock:
+        for key, value in (("pool_size", pool_size), ("timeout", timeout),
+                           ("max_tasks_per_worker", max_tasks_per_worker),
+                           ("start_method", start_method), ("cpu_time_limit", cpu_time_limit),
+                           ("memory_limit_mb", memory_limit_mb), ("max_output_chars", max_output_chars),
+                           ("capture_mode", capture_mode), ("max_stream_bytes", max_stream_bytes),
+                           ("preload_modules", preload_modules)):
+            if value is not None:
+                _executor_config[key] = value
+        if not _executor_config["pool_size"]:
+            logger.warning("Executor sem pool (pool_size=0): o código do usuário roda no próprio processo do servidor, "
+                           "sem tempo limite nem limites de CPU e memória.")
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+def get_executor():
+    """
+    Retorna o pool de executores global, criando-o na primeira chamada.
+
+    Returns:
+        WorkerPool | None: O pool configurado, ou None se `pool_size` for 0.
+    """
+    global _executor
+    if _executor is not None or not _executor_config["pool_size"]:
+        return _executor
+    with _executor_lock:
+        if _executor is None and _executor_config["pool_size"]:
+            _executor = WorkerPool(size=_executor_config["pool_size"],
+                                   timeout=_executor_config["timeout"],
+                                   max_tasks_per_worker=_executor_config["max_tasks_per_worker"],
+                                   start_method=_executor_config["start_method"],
+                                   cpu_time_limit=_executor_config["cpu_time_limit"],
+                                   memory_limit_mb=_executor_config["memory_limit_mb"],
+                                   max_output_chars=_executor_config["max_output_chars"],
+                                   max_stream_bytes=_executor_config["max_stream_bytes"],
+                                   preload_modules=_executor_config["preload_modules"])
+    return _executor
+
+def shutdown_executor():
+    """Encerra o pool de executores global, se existir."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+atexit.register(shutdown_executor)
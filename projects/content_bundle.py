@@ -0,0 +1,543 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o bundle binário pré-compilado de cursos, lições e exercícios.
+
+Os arquivos JSON da pasta `data/` são indentados e, na partida, precisam ser
+lidos e interpretados por inteiro antes do primeiro acesso. O comando
+`flask --app projects.app build-bundle` valida `courses.json` e todos os
+`lessons_file`/`exercises_file` referenciados contra um esquema mínimo
+(`SCHEMAS`) e grava um único arquivo compacto:
+
+    cabeçalho | registros | tabela de offsets | índice
+
+- cabeçalho (`HEADER`): assinatura `MAGIC`, versão do formato, número de
+  registros e os offsets da tabela e do índice;
+- registros: cada curso, lição e exercício em JSON compacto (UTF-8);
+- tabela de offsets: `(offset, tamanho)` de cada registro (`TABLE_ENTRY`);
+- índice: JSON compacto com, para cada arquivo de origem, o intervalo de
+  registros, os IDs e o agrupamento dos exercícios por (lição, nível).
+
+Cada lição e exercício tem também um registro de resumo, sem os campos
+volumosos (`LESSON_HEAVY_FIELDS`/`EXERCISE_HEAVY_FIELDS`), usado pelas
+listagens que não precisam deles.
+
+Com `CURSO_CONTENT_BACKEND=bundle`, os managers usam a classe `BundleStorage`,
+que abre o arquivo com `mmap`, interpreta apenas o índice e deserializa cada
+lição ou exercício somente quando ele é acessado. O bundle é somente leitura.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import tracemalloc
+from collections.abc import Sequence
+from pathlib import Path
+
+from .cache import LRUCache
+from .exercise_manager import index_by_lesson, summarize_exercises
+from .file_utils import atomic_write_bytes
+from .lesson_manager import summarize_lessons
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CURSOBDL"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sHHIQQ") # assinatura, versão, reservado, nº de registros, offset da tabela, offset do índice
+TABLE_ENTRY = struct.Struct("<QI") # offset e tamanho de um registro
+DEFAULT_BUNDLE_PATH = Path(__file__).resolve().parent / 'data' / 'content.bundle'
+MEMO_SIZE = 512 # Registros já deserializados mantidos em memória
+
+# Campos obrigatórios e opcionais (com seus tipos) de cada tipo de registro.
+SCHEMAS = {
+    "course": {
+        "required": {"id": str, "name": str, "lessons_file": str, "exercises_file": str},
+        "optional": {"description": str, "short_description": str, "level": str, "duration": str,
+                     "prerequisites": (str, list), "objectives": list, "learning_path": dict, "projects": dict},
+    },
+    "lesson": {
+        "required": {"id": str, "title": str},
+        "optional": {"course_id": str, "order": (int, float), "description": str, "content": str, "summary": str,
+                     "learning_objectives": list, "key_concepts": list, "examples": list,
+                     "estimated_time_minutes": (int, float)},
+    },
+    "exercise": {
+        "required": {"id": str, "lesson_id": str, "title": str},
+        "optional": {"description": str, "instructions": str, "difficulty": str, "level": str, "order": (int, float),
+                     "initial_code": str, "solution_code": str, "test_code": str},
+    },
+}
+
+class BundleValidationError(ValueError):
+    """
+    Erro de validação do conteúdo ao montar o bundle.
+
+    Attributes:
+        errors (list): As mensagens de erro, no formato "arquivo[posição].campo: problema".
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} erro(s) de validação no conteúdo:\n" + "\n".join(errors))
+
+def _type_name(expected):
+    """Nome legível de um tipo (ou tupla de tipos) esperado."""
+    types = expected if isinstance(expected, tuple) else (expected,)
+    return " ou ".join(t.__name__ for t in types)
+
+def validate_item(item, kind, where):
+    """
+    Valida um curso, lição ou exercício contra `SCHEMAS`.
+
+    Campos desconhecidos são aceitos; campos conhecidos precisam ter o tipo esperado.
+
+    Args:
+        item: O item lido do JSON.
+        kind (str): "course", "lesson" ou "exercise".
+        where (str): A localização do item, usada nas mensagens (ex: "basic/lessons.json[3]").
+
+    Returns:
+        list: As mensagens de erro (vazia se o item for válido).
+    """
+    if not isinstance(item, dict):
+        return [f"{where}: esperava um objeto, obteve {type(item).__name__}"]
+    schema = SCHEMAS[kind]
+    errors = []
+    for field, expected in schema["required"].items():
+        if field not in item:
+            errors.append(f"{where}.{field}: campo obrigatório ausente")
+    for field, expected in {**schema["optional"], **schema["required"]}.items():
+        value = item.get(field)
+        if field in item and (not isinstance(value, expected) or isinstance(value, bool)):
+            errors.append(f"{where}.{field}: esperava {_type_name(expected)}, obteve {type(value).__name__}")
+    return errors
+
+def _read_json_list(path, where, errors):
+    """Lê um arquivo JSON que deve conter uma lista; registra o problema em `errors` e retorna None se não puder."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        errors.append(f"{where}: arquivo não encontrado")
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        errors.append(f"{where}: {e}")
+        return None
+    if not isinstance(data, list):
+        errors.append(f"{where}: esperava uma lista, obteve {type(data).__name__}")
+        return None
+    return data
+
+def _check_duplicate_ids(items, where, warnings):
+    """Registra em `warnings` os IDs repetidos de uma lista de itens (a primeira ocorrência prevalece)."""
+    seen = set()
+    for position, item in enumerate(items):
+        if isinstance(item, dict) and "id" in item:
+            item_id = str(item["id"])
+            if item_id in seen:
+                warnings.append(f"{where}[{position}].id: ID '{item_id}' repetido; vale a primeira ocorrência")
+            seen.add(item_id)
+
+def load_and_validate(data_dir, warnings=None):
+    """
+    Lê e valida `courses.json` e os arquivos de lições e exercícios referenciados.
+
+    Arquivos ausentes ou mal formatados e campos com tipo inválido são erros. IDs
+    repetidos em um arquivo e exercícios cujo `lesson_id` não existe no arquivo de
+    lições do curso são apenas avisos, pois a aplicação já os tolera.
+
+    Args:
+        data_dir (str | Path): O diretório com `courses.json`.
+        warnings (list, optional): Recebe as mensagens de aviso, que também são registradas no log.
+
+    Returns:
+        tuple: `(cursos, arquivos)`, onde `arquivos` é `{caminho relativo: (tipo, itens)}`
+               na ordem em que os cursos os referenciam.
+
+    Raises:
+        BundleValidationError: Se o conteúdo tiver algum erro.
+    """
+    data_dir = Path(data_dir)
+    errors = []
+    warnings = [] if warnings is None else warnings
+    courses = _read_json_list(data_dir / 'courses.json', 'courses.json', errors)
+    if courses is None:
+        raise BundleValidationError(errors)
+    _check_duplicate_ids(courses, 'courses.json', warnings)
+
+    sources = {}
+    for position, course in enumerate(courses):
+        course_errors = validate_item(course, "course", f"courses.json[{position}]")
+        errors.extend(course_errors)
+        if course_errors:
+            continue
+        lesson_ids = None
+        for key, kind in (("lessons_file", "lesson"), ("exercises_file", "exercise")):
+            source = course[key]
+            if source in sources:
+                if kind == "lesson":
+                    lesson_ids = {str(item["id"]) for item in sources[source][1] if isinstance(item, dict) and "id" in item}
+                continue
+            items = _read_json_list(data_dir / source, source, errors)
+            if items is None:
+                continue
+            for item_position, item in enumerate(items):
+                errors.extend(validate_item(item, kind, f"{source}[{item_position}]"))
+            _check_duplicate_ids(items, source, warnings)
+            if kind == "lesson":
+                lesson_ids = {str(item["id"]) for item in items if isinstance(item, dict) and "id" in item}
+            elif lesson_ids is not None:
+                for item_position, item in enumerate(items):
+                    if isinstance(item, dict) and "lesson_id" in item and str(item["lesson_id"]) not in lesson_ids:
+                        warnings.append(f"{source}[{item_position}].lesson_id: lição '{item['lesson_id']}' "
+                                      f"não existe em {course['lessons_file']}")
+            sources[source] = (kind, items)
+    for warning in warnings:
+        logger.warning(f"Validação do conteúdo: {warning}")
+    if errors:
+        raise BundleValidationError(errors)
+    return courses, sources
+
+def build_bundle(data_dir, output_path=DEFAULT_BUNDLE_PATH):
+    """
+    Valida a árvore `data/` e grava o bundle binário (de forma atômica).
+
+    Args:
+        data_dir (str | Path): O diretório com `courses.json`.
+        output_path (str | Path): O arquivo do bundle.
+
+    Returns:
+        dict: Contagens gravadas ("courses", "lessons", "exercises"), o tamanho em bytes
+              ("bytes") e os avisos da validação ("warnings", ver `load_and_validate`).
+
+    Raises:
+        BundleValidationError: Se o conteúdo tiver algum erro (nada é gravado).
+    """
+    warnings = []
+    courses, sources = load_and_validate(data_dir, warnings)
+    records = []
+    index = {"courses": [0, len(courses)], "sources": {}}
+    records.extend(courses)
+    counts = {"courses": len(courses), "lessons": 0, "exercises": 0}
+    for source, (kind, items) in sources.items():
+        entry = {"kind": kind, "first": len(records), "count": len(items),
+                 "ids": [str(item["id"]) for item in items]}
+        if kind == "exercise":
+            positions = {id(item): position for position, item in enumerate(items)}
+            entry["groups"] = [[lesson_id, level, [positions[id(item)] for item in bucket]]
+                               for (lesson_id, level), bucket in index_by_lesson(items).items()]
+        records.extend(items)
+        entry["summary_first"] = len(records)
+        records.extend(summarize_lessons(items) if kind == "lesson" else summarize_exercises(items))
+        index["sources"][source] = entry
+        counts[f"{kind}s"] += len(items)
+
+    payloads = [json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for record in records]
+    table = bytearray()
+    offset = HEADER.size
+    for payload in payloads:
+        table += TABLE_ENTRY.pack(offset, len(payload))
+        offset += len(payload)
+    table_offset = offset
+    index_offset = table_offset + len(table)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(payloads), table_offset, index_offset)
+    body = header + b"".join(payloads) + bytes(table) + json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    atomic_write_bytes(output_path, body)
+    counts["bytes"] = len(body)
+    logger.info(f"Bundle '{output_path}' gravado: {counts}")
+    counts["warnings"] = warnings
+    return counts
+
+class LazyItems(Sequence):
+    """
+    Sequência somente leitura das lições ou exercícios de um arquivo do bundle.
+
+    Cada item é deserializado apenas quando acessado (por índice ou iteração).
+    """
+
+    def __init__(self, bundle, first, count):
+        self._bundle = bundle
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("posição fora do intervalo")
+        return self._bundle._record(self._first + position)
+
+class BundleStorage:
+    """
+    Armazenamento somente leitura servido a partir do bundle binário, mapeado com `mmap`.
+
+    Implementa as operações de leitura de `SQLiteStorage`, de modo que os managers
+    o usam da mesma forma. Registros deserializados ficam em um cache LRU e são
+    compartilhados entre as chamadas (não devem ser modificados).
+
+    Attributes:
+        path (Path): O arquivo do bundle.
+        read_only (bool): Sempre True; o `CourseManager` recusa alterações no catálogo.
+    """
+
+    read_only = True
+
+    def __init__(self, path=DEFAULT_BUNDLE_PATH):
+        """
+        Abre o bundle e interpreta o cabeçalho e o índice.
+
+        Args:
+            path (str | Path): O arquivo do bundle.
+
+        Raises:
+            OSError: Se o arquivo não puder ser aberto.
+            ValueError: Se o arquivo não for um bundle válido.
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"'{self.path}' não é um bundle de conteúdo válido.")
+        magic, version, _, self._record_count, self._table_offset, index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"'{self.path}' não é um bundle de conteúdo válido (formato {version}, esperado {FORMAT_VERSION}).")
+        index = json.loads(self._map[index_offset:])
+        self._courses = index["courses"]
+        self._sources = index["sources"]
+        self._ids = {source: {} for source in self._sources}
+        for source, entry in self._sources.items():
+            for position, item_id in enumerate(entry["ids"]):
+                self._ids[source].setdefault(item_id, position) # A primeira ocorrência prevalece
+        self._groups = {source: {(lesson_id, level): positions for lesson_id, level, positions in entry.get("groups", [])}
+                        for source, entry in self._sources.items()}
+        self._memo = LRUCache(maxsize=MEMO_SIZE)
+        self._version = os.stat(self.path).st_mtime_ns
+        logger.info(f"Bundle '{self.path}' aberto: {self._record_count} registros.")
+
+    def __repr__(self):
+        return f"BundleStorage('{self.path}')"
+
+    def _record(self, number):
+        """Deserializa o registro de número `number` (ou o retorna do cache)."""
+        def decode():
+            offset, length = TABLE_ENTRY.unpack_from(self._map, self._table_offset + number * TABLE_ENTRY.size)
+            return json.loads(self._map[offset:offset + length])
+        return self._memo.get_or_set(number, decode)
+
+    def _item(self, source, position):
+        """Retorna o item na posição `position` do arquivo de origem."""
+        return self._record(self._sources[source]["first"] + position)
+
+    def version(self):
+        """
+        Retorna a versão do conteúdo (o mtime do bundle, fixo enquanto ele estiver aberto).
+
+        Returns:
+            int: A versão.
+        """
+        return self._version
+
+    def close(self):
+        """Libera o mapeamento do arquivo."""
+        self._map.close()
+
+    def load_courses(self):
+        """
+        Retorna todos os cursos, na ordem de `courses.json`.
+
+        Returns:
+            list: Os dicionários dos cursos (cópias; podem ser modificados).
+        """
+        first, count = self._courses
+        # Cópias: o CourseManager mantém e altera a sua própria lista de cursos.
+        return [dict(self._record(first + i)) for i in range(count)]
+
+    def save_course(self, course):
+        """O bundle é somente leitura."""
+        raise PermissionError(f"O bundle '{self.path}' é somente leitura.")
+
+    def delete_course(self, course_id):
+        """O bundle é somente leitura."""
+        raise PermissionError(f"O bundle '{self.path}' é somente leitura.")
+
+    def _items(self, source, kind, summaries=False):
+        """Retorna a sequência preguiçosa dos itens (ou dos resumos) de um arquivo de origem (vazia se ausente)."""
+        entry = self._sources.get(source)
+        if entry is None or entry["kind"] != kind:
+            return LazyItems(self, 0, 0)
+        return LazyItems(self, entry["summary_first"] if summaries else entry["first"], entry["count"])
+
+    def load_lessons(self, source):
+        """
+        Retorna as lições de um arquivo de origem.
+
+        Args:
+            source (str): O caminho relativo do arquivo de lições (ex: "basic/lessons.json").
+
+        Returns:
+            list: As lições (deserializa todas; para uma única lição, use `get_lesson`).
+        """
+        return list(self._items(source, "lesson"))
+
+    def load_lesson_summaries(self, source):
+        """
+        Retorna os resumos das lições de um arquivo de origem, sem deserializar os campos volumosos.
+
+        Args:
+            source (str): O caminho relativo do arquivo de lições.
+
+        Returns:
+            list: Os resumos.
+        """
+        return list(self._items(source, "lesson", summaries=True))
+
+    def get_lesson(self, source, lesson_id):
+        """
+        Busca uma lição pelo ID, deserializando apenas ela.
+
+        Args:
+            source (str): O caminho relativo do arquivo de lições.
+            lesson_id (str): O ID da lição.
+
+        Returns:
+            tuple: `(lição, posição, lições)`, ou `(None, -1, lições)` se não encontrada;
+                   `lições` é uma `LazyItems`, deserializada sob demanda.
+        """
+        lessons = self._items(source, "lesson")
+        position = self._ids.get(source, {}).get(str(lesson_id))
+        if position is None or self._sources[source]["kind"] != "lesson":
+            return None, -1, lessons
+        return self._item(source, position), position, lessons
+
+    def load_exercises(self, source):
+        """
+        Retorna os exercícios de um arquivo de origem.
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+
+        Returns:
+            list: Os exercícios.
+        """
+        return list(self._items(source, "exercise"))
+
+    def load_exercise_summaries(self, source):
+        """
+        Retorna os resumos dos exercícios de um arquivo de origem, sem deserializar os campos volumosos.
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+
+        Returns:
+            list: Os resumos.
+        """
+        return list(self._items(source, "exercise", summaries=True))
+
+    def get_exercise(self, source, exercise_id):
+        """
+        Busca um exercício pelo ID, deserializando apenas ele.
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+            exercise_id (str): O ID do exercício.
+
+        Returns:
+            dict | None: O exercício, ou None se não encontrado.
+        """
+        position = self._ids.get(source, {}).get(str(exercise_id))
+        if position is None or self._sources[source]["kind"] != "exercise":
+            return None
+        return self._item(source, position)
+
+    def get_exercises_for_lesson(self, source, lesson_id, level=None):
+        """
+        Retorna os exercícios de uma lição, filtrados pelo nível e ordenados por `order`.
+
+        O agrupamento é calculado na montagem do bundle (ver `index_by_lesson`).
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+            lesson_id (str): O ID da lição.
+            level (str, optional): O nível, comparado sem diferenciar maiúsculas.
+
+        Returns:
+            list: Os exercícios da lição.
+        """
+        positions = self._groups.get(source, {}).get((str(lesson_id), level.lower() if level else None), [])
+        return [self._item(source, position) for position in positions]
+
+# --- Benchmark ---
+
+def _first_access_json(data_dir):
+    """
+    Primeiro acesso a partir dos arquivos JSON: catálogo e a primeira lição e exercício de cada curso.
+
+    Os arquivos precisam ser interpretados por inteiro e as listas ficam retidas, como no `content_cache`.
+    """
+    data_dir = Path(data_dir)
+    with open(data_dir / 'courses.json', 'r', encoding='utf-8') as f:
+        courses = json.load(f)
+    loaded = []
+    for course in courses:
+        for key in ("lessons_file", "exercises_file"):
+            with open(data_dir / course[key], 'r', encoding='utf-8') as f:
+                loaded.append(json.load(f))
+    return courses, loaded
+
+def _first_access_bundle(bundle_path):
+    """Primeiro acesso a partir do bundle: o mesmo conteúdo de `_first_access_json`."""
+    storage = BundleStorage(bundle_path)
+    courses = storage.load_courses()
+    loaded = []
+    for course in courses:
+        lessons = storage._items(course["lessons_file"], "lesson")
+        exercises = storage._items(course["exercises_file"], "exercise")
+        loaded.append(lessons[0] if lessons else None)
+        loaded.append(exercises[0] if exercises else None)
+    return storage, courses, loaded
+
+def _measure(function, *args, repeat=5):
+    """Mede o menor tempo (ms) e o pico de memória alocada (bytes) de `function`."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"cold_start_ms": round(best, 3), "peak_bytes": peak, "retained_bytes": retained}
+
+def benchmark(data_dir, bundle_path=DEFAULT_BUNDLE_PATH, repeat=5):
+    """
+    Compara a partida a frio a partir dos arquivos JSON e a partir do bundle.
+
+    O cenário é o primeiro acesso da aplicação: carregar o catálogo e a primeira
+    lição e o primeiro exercício de cada curso. Mede o menor tempo entre `repeat`
+    execuções e a memória alocada (via `tracemalloc`): o pico e o que permanece
+    referenciado ao final.
+
+    Args:
+        data_dir (str | Path): O diretório com `courses.json`.
+        bundle_path (str | Path): O bundle (já montado a partir de `data_dir`).
+        repeat (int): Número de execuções para a medição de tempo.
+
+    Returns:
+        dict: `{"json": {...}, "bundle": {...}}` com "cold_start_ms", "peak_bytes" e "retained_bytes".
+    """
+    return {
+        "json": _measure(_first_access_json, data_dir, repeat=repeat),
+        "bundle": _measure(_first_access_bundle, bundle_path, repeat=repeat),
+    }
@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o cache de conteúdo dos arquivos de dados (lições, exercícios, ...).
+
+Define a classe `ContentCache`, que guarda o resultado do parse de cada arquivo
+e o revalida a cada acesso com uma única chamada `os.stat`: o arquivo só é lido
+e interpretado novamente se seu mtime, tamanho ou inode tiverem mudado. O uso de
+memória é limitado pelo número de arquivos e pela soma dos tamanhos dos arquivos
+em cache (usada como estimativa do tamanho do conteúdo interpretado).
+
+Os valores retornados são compartilhados entre todas as requisições e devem ser
+tratados como somente leitura.
+
+Diretórios acompanhados por um `ContentWatcher` (ver `content_watcher.py`) podem ser
+registrados com `watch`: os arquivos dentro deles são servidos sem a chamada `os.stat`,
+e o watcher chama `refresh` quando algum deles muda.
+"""
+import os
+import stat
+import logging
+import time
+import threading
+from collections import OrderedDict
+
+from .metrics import content_load_seconds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024 # Soma dos tamanhos dos arquivos mantidos em cache
+
+def file_signature(path):
+    """
+    Retorna a assinatura usada para detectar alterações em um arquivo.
+
+    Args:
+        path (str | Path): O caminho do arquivo.
+
+    Returns:
+        tuple | None: `(st_mtime_ns, st_size, st_ino)`, ou None se o arquivo não existir
+                      ou não for um arquivo regular.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def index_by_id(items):
+    """
+    Monta um índice `id -> (item, posição)` de uma lista de dicionários.
+
+    Os IDs são comparados como strings; em caso de IDs repetidos, prevalece a
+    primeira ocorrência (como em uma busca linear).
+
+    Args:
+        items (list): Lista de dicionários com a chave "id".
+
+    Returns:
+        dict: O índice.
+    """
+    index = {}
+    for position, item in enumerate(items):
+        if isinstance(item, dict) and item.get("id") is not None:
+            index.setdefault(str(item["id"]), (item, position))
+    return index
+
+def without_fields(items, fields):
+    """
+    Retorna cópias rasas dos itens sem os campos dados.
+
+    Args:
+        items (Iterable): Os itens (dicionários; outros valores são mantidos como estão).
+        fields (Iterable): Os campos a omitir.
+
+    Returns:
+        list: As cópias.
+    """
+    fields = frozenset(fields)
+    return [{key: value for key, value in item.items() if key not in fields} if isinstance(item, dict) else item
+            for item in items]
+
+def project_fields(items, fields):
+    """
+    Retorna cópias dos itens apenas com os campos dados, na ordem pedida.
+
+    Args:
+        items (Iterable): Os itens (dicionários; outros valores são omitidos).
+        fields (list): Os campos a manter; campos ausentes em um item não aparecem na cópia.
+
+    Returns:
+        list: As cópias.
+    """
+    return [{field: item[field] for field in fields if field in item} for item in items if isinstance(item, dict)]
+
+def _timed_parse(parser, path):
+    """Interpreta um arquivo, registrando a duração em `content_load_seconds` (rótulo: o nome do arquivo)."""
+    started = time.perf_counter()
+    value = parser(path)
+    content_load_seconds.observe(time.perf_counter() - started, os.path.basename(path))
+    return value
+
+class _Entry:
+    """Conteúdo interpretado de um arquivo, a assinatura do arquivo no momento do parse e as estruturas derivadas."""
+
+    __slots__ = ("signature", "value", "size", "derived", "on_parse")
+
+    def __init__(self, signature, value, size, on_parse=None):
+        self.signature = signature
+        self.value = value
+        self.size = size
+        self.derived = {}
+        self.on_parse = on_parse
+
+class ContentCache:
+    """
+    Cache de arquivos interpretados, revalidado por mtime, tamanho e inode.
+
+    Attributes:
+        max_entries (int): Número máximo de arquivos mantidos.
+        max_bytes (int): Soma máxima dos tamanhos dos arquivos mantidos.
+        hits (int): Acessos atendidos pelo cache.
+        misses (int): Acessos que exigiram ler e interpretar o arquivo.
+        invalidations (int): Misses causados por alteração de um arquivo já em cache.
+        evictions (int): Entradas descartadas pelos limites de memória.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries (int): Número máximo de arquivos mantidos (mínimo 1).
+            max_bytes (int): Soma máxima dos tamanhos dos arquivos mantidos.
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._watched_roots = () # Prefixos (com separador final) dos diretórios acompanhados por um watcher
+        self._lock = threading.Lock()
+
+    def load(self, path, parser, on_parse=None):
+        """
+        Retorna o conteúdo interpretado de `path`, lendo o arquivo só se ele mudou.
+
+        Args:
+            path (str | Path): O caminho do arquivo.
+            parser (callable): Função `parser(path)` que lê e interpreta o arquivo. Faz
+                               parte da chave do cache, de modo que o mesmo arquivo
+                               pode ser interpretado de formas diferentes.
+            on_parse (callable, optional): Chamada com o valor recém-interpretado, apenas
+                                           quando o arquivo é (re)lido (ex: para pré-calcular
+                                           estruturas derivadas).
+
+        Returns:
+            O valor retornado por `parser`, ou None se o arquivo não existir.
+        """
+        key = (os.fspath(path), parser)
+        if self._watched_roots and key[0].startswith(self._watched_roots):
+            # Arquivo acompanhado por um watcher: mantido atualizado por `refresh`, sem stat.
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+        signature = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and signature is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+            if entry is not None:
+                self.invalidations += 1
+                self._remove(key)
+        if signature is None:
+            return None
+
+        # O parse acontece fora do lock; acessos simultâneos ao mesmo arquivo
+        # podem interpretá-lo mais de uma vez, prevalecendo o último.
+        value = _timed_parse(parser, path)
+        if on_parse is not None:
+            on_parse(value)
+        with self._lock:
+            self._store(key, _Entry(signature, value, signature[1], on_parse))
+        return value
+
+    def load_derived(self, path, parser, builder, on_parse=None):
+        """
+        Como `load`, mas retorna também uma estrutura derivada do conteúdo (ex: um índice).
+
+        A estrutura `builder(valor)` é construída uma vez e guardada junto da entrada,
+        sendo descartada quando o arquivo muda ou a entrada sai do cache.
+
+        Args:
+            path (str | Path): O caminho do arquivo.
+            parser (callable): Ver `load`.
+            builder (callable): Função `builder(valor)` que monta a estrutura derivada.
+            on_parse (callable, optional): Ver `load`.
+
+        Returns:
+            tuple: `(valor, estrutura derivada)`, ou `(None, None)` se o arquivo não existir.
+        """
+        value = self.load(path, parser, on_parse=on_parse)
+        if value is None:
+            return None, None
+        key = (os.fspath(path), parser)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.value is value and builder in entry.derived:
+                return value, entry.derived[builder]
+        derived = builder(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.value is value:
+                entry.derived[builder] = derived
+        return value, derived
+
+    def signature(self, path):
+        """
+        Retorna a assinatura atual de um arquivo, garantindo que o conteúdo em cache corresponde a ela.
+
+        Arquivos de diretórios acompanhados por um watcher são servidos sem `os.stat` até a
+        próxima chamada a `refresh`; se o arquivo já mudou e o watcher ainda não o releu, as
+        entradas são relidas aqui. Assim, validadores HTTP calculados com esta assinatura
+        nunca acompanham um conteúdo mais antigo do que ela.
+
+        Args:
+            path (str | Path): O caminho do arquivo.
+
+        Returns:
+            tuple | None: A assinatura (ver `file_signature`).
+        """
+        path = os.fspath(path)
+        signature = file_signature(path)
+        if self._watched_roots and path.startswith(self._watched_roots):
+            with self._lock:
+                stale = any(key[0] == path and entry.signature != signature for key, entry in self._entries.items())
+            if stale:
+                self.refresh(path)
+        return signature
+
+    def _remove(self, key):
+        """Remove uma entrada. Requer `self._lock`."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _store(self, key, entry):
+        """Armazena uma entrada e aplica os limites. Requer `self._lock`."""
+        self._remove(key)
+        if entry.size > self.max_bytes:
+            logger.debug(f"Arquivo '{key[0]}' ({entry.size} bytes) maior que o limite do cache; não armazenado.")
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._enforce_limits()
+
+    def _enforce_limits(self):
+        """Descarta as entradas usadas há mais tempo até respeitar os limites. Requer `self._lock`."""
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def refresh(self, path):
+        """
+        Relê um arquivo já em cache e substitui suas entradas de uma só vez.
+
+        O novo conteúdo e suas estruturas derivadas são montados fora do lock; até a
+        troca, os leitores continuam recebendo a versão anterior, completa. Se o
+        arquivo tiver sido removido, suas entradas são descartadas.
+
+        Args:
+            path (str | Path): O caminho do arquivo.
+
+        Returns:
+            int: O número de entradas atualizadas.
+        """
+        path = os.fspath(path)
+        with self._lock:
+            entries = [(key, entry) for key, entry in self._entries.items() if key[0] == path]
+        signature = file_signature(path)
+        refreshed = 0
+        for key, old_entry in entries:
+            if signature is None:
+                with self._lock:
+                    self._remove(key)
+                continue
+            parser = key[1]
+            value = _timed_parse(parser, path)
+            if old_entry.on_parse is not None:
+                old_entry.on_parse(value)
+            new_entry = _Entry(signature, value, signature[1], old_entry.on_parse)
+            for builder in list(old_entry.derived):
+                new_entry.derived[builder] = builder(value)
+            with self._lock:
+                self.invalidations += 1
+                self._store(key, new_entry)
+            refreshed += 1
+        return refreshed
+
+    def watch(self, root):
+        """
+        Registra um diretório cujos arquivos são mantidos atualizados por um watcher.
+
+        Args:
+            root (str | Path): O diretório acompanhado.
+        """
+        prefix = os.path.join(os.fspath(root), "")
+        with self._lock:
+            if prefix not in self._watched_roots:
+                self._watched_roots = self._watched_roots + (prefix,)
+
+    def unwatch(self, root):
+        """
+        Volta a revalidar por stat os arquivos de um diretório registrado com `watch`.
+
+        Args:
+            root (str | Path): O diretório.
+        """
+        prefix = os.path.join(os.fspath(root), "")
+        with self._lock:
+            self._watched_roots = tuple(r for r in self._watched_roots if r != prefix)
+
+    def configure(self, max_entries=None, max_bytes=None):
+        """
+        Ajusta os limites de memória, descartando entradas se necessário.
+
+        Args:
+            max_entries (int, optional): Novo número máximo de arquivos.
+            max_bytes (int, optional): Nova soma máxima dos tamanhos dos arquivos.
+        """
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max(1, int(max_entries))
+            if max_bytes is not None:
+                self.max_bytes = max(0, int(max_bytes))
+            self._enforce_limits()
+
+    def invalidate(self, path=None):
+        """
+        Descarta as entradas de `path` (todas as formas de interpretá-lo), ou todas se None.
+
+        Args:
+            path (str | Path, optional): O caminho do arquivo.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            path = os.fspath(path)
+            for key in [key for key in self._entries if key[0] == path]:
+                self._remove(key)
+
+    def clear(self):
+        """Remove todas as entradas e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.invalidations = self.evictions = 0
+
+    def stats(self):
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            dict: "entries", "bytes", "max_entries", "max_bytes", "hits", "misses",
+                  "invalidations" e "evictions".
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+# Instância compartilhada pelos managers de lições e exercícios.
+content_cache = ContentCache()
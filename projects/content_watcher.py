@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o watcher do diretório de dados (`data/`).
+
+Define a classe `ContentWatcher`, que acompanha em uma thread de fundo os
+arquivos JSON de cursos, lições e exercícios e chama um callback com os
+arquivos que mudaram. Com o watcher ativo, a aplicação recarrega o conteúdo
+apenas quando um autor edita os arquivos, em vez de revalidá-los a cada
+requisição.
+
+Usa inotify (pacote opcional `inotify_simple`) onde disponível; caso contrário,
+compara periodicamente a assinatura (mtime, tamanho, inode) de cada arquivo.
+Em ambos os modos, as alterações são apuradas comparando assinaturas, de modo
+que salvamentos feitos via arquivo temporário + rename também são detectados.
+"""
+import os
+import logging
+import threading
+
+from .content_cache import file_signature
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags # Opcional; apenas Linux
+except ImportError:
+    INotify = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0 # Segundos entre verificações (ou tempo máximo de espera por eventos)
+DEBOUNCE_SECONDS = 0.05 # Espera após um evento para agrupar as escritas de um mesmo salvamento
+
+def snapshot(root, suffix=".json"):
+    """
+    Retorna a assinatura de todos os arquivos com o sufixo dado sob `root`.
+
+    Args:
+        root (str | Path): O diretório.
+        suffix (str): O sufixo dos arquivos considerados.
+
+    Returns:
+        dict: `caminho -> (st_mtime_ns, st_size, st_ino)`.
+    """
+    signatures = {}
+    for dirpath, _, filenames in os.walk(os.fspath(root)):
+        for filename in filenames:
+            if filename.endswith(suffix):
+                path = os.path.join(dirpath, filename)
+                signature = file_signature(path)
+                if signature is not None:
+                    signatures[path] = signature
+    return signatures
+
+class ContentWatcher:
+    """
+    Acompanha os arquivos JSON de um diretório e notifica as alterações.
+
+    Attributes:
+        root (str): O diretório acompanhado.
+        poll_interval (float): Intervalo entre verificações, em segundos.
+        mode (str): "inotify" ou "polling" (definido em `start`).
+    """
+
+    def __init__(self, root, on_change, poll_interval=DEFAULT_POLL_INTERVAL, use_inotify=True):
+        """
+        Inicializa o watcher.
+
+        Args:
+            root (str | Path): O diretório a acompanhar.
+            on_change (callable): Chamada com a lista ordenada de caminhos criados,
+                                  alterados ou removidos. Exceções são registradas no log.
+            poll_interval (float): Intervalo entre verificações, em segundos.
+            use_inotify (bool): Usa inotify se disponível.
+        """
+        self.root = os.fspath(root)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.mode = "inotify" if use_inotify and INotify is not None else "polling"
+        self._snapshot = snapshot(self.root)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """
+        Compara o diretório com a última verificação e notifica as alterações.
+
+        Returns:
+            list: Os caminhos criados, alterados ou removidos.
+        """
+        current = snapshot(self.root)
+        previous, self._snapshot = self._snapshot, current
+        changed = sorted(path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path))
+        if changed:
+            logger.info(f"Conteúdo alterado em '{self.root}': {len(changed)} arquivo(s).")
+            try:
+                self.on_change(changed)
+            except Exception as e:
+                logger.error(f"Erro ao recarregar o conteúdo alterado: {e}", exc_info=True)
+        return changed
+
+    def start(self):
+        """
+        Inicia a thread de fundo.
+
+        Returns:
+            ContentWatcher: O próprio watcher.
+        """
+        if self._thread is None:
+            target = self._run_inotify if self.mode == "inotify" else self._run_polling
+            self._thread = threading.Thread(target=target, name="content-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Watcher de conteúdo iniciado em '{self.root}' (modo {self.mode}).")
+        return self
+
+    def stop(self):
+        """Encerra a thread de fundo."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _run_polling(self):
+        """Laço do modo polling."""
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def _run_inotify(self):
+        """Laço do modo inotify; volta ao polling se o inotify falhar."""
+        mask = (inotify_flags.CREATE | inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE | inotify_flags.DELETE
+                | inotify_flags.MOVED_TO | inotify_flags.MOVED_FROM)
+        try:
+            with INotify() as inotify:
+                watched = set()
+                while not self._stop.is_set():
+                    # Novos subdiretórios (ex: um curso recém-criado) também passam a ser acompanhados.
+                    for dirpath, _, _ in os.walk(self.root):
+                        if dirpath not in watched:
+                            inotify.add_watch(dirpath, mask)
+                            watched.add(dirpath)
+                    if inotify.read(timeout=int(self.poll_interval * 1000)):
+                        self._stop.wait(DEBOUNCE_SECONDS)
+                        inotify.read(timeout=0)
+                        self.check()
+        except OSError as e:
+            logger.warning(f"inotify indisponível ({e}); usando polling em '{self.root}'.")
+            self.mode = "polling"
+            self._run_polling()
@@ -5,12 +5,35 @@ Módulo para gerenciamento de dados de cursos.
 Este módulo define a classe `CourseManager`, responsável por carregar,
 salvar, e manipular informações sobre os cursos disponíveis na aplicação.
 Os dados dos cursos são armazenados em formato JSON.
+
+`courses.json` é sempre gravado de forma atômica (arquivo temporário, `fsync` e
+`os.replace`), de modo que uma falha durante a escrita não trunca o catálogo.
+Sequências de alterações podem ser agrupadas em uma única gravação com
+`CourseManager.bulk()` ou com o modo write-behind (`write_behind_delay`).
+
+Vários processos (ex: workers do gunicorn) podem alterar o catálogo ao mesmo
+tempo: cada leitura-alteração-gravação acontece sob um lock de arquivo
+(`fcntl.flock` em `courses.lock`), e um contador de versão (`courses.version`)
+permite a cada processo perceber que sua cópia em memória ficou desatualizada
+e recarregá-la, reaplicando suas alterações ainda não gravadas.
 """
+import os
 import json
+import atexit
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import uuid # Para gerar IDs únicos para novos cursos
 
+from .content_cache import file_signature
+from .file_utils import atomic_write_text
+
+try:
+    import fcntl # Disponível apenas em sistemas POSIX
+except ImportError: # pragma: no cover - Windows
+    fcntl = None
+
 # Configuração de logging movida para app.py ou um módulo de configuração central.
 # Se este módulo for executado diretamente, o logging básico pode ser configurado no if __name__ == '__main__':
 logger = logging.getLogger(__name__)
@@ -28,25 +51,269 @@ class CourseManager:
         data_dir (Path): O caminho completo para o diretório 'data' dentro de 'projects'.
         courses_file (Path): O caminho completo para o arquivo 'courses.json'.
         courses (list): Uma lista de dicionários, onde cada dicionário representa um curso.
+                        Atribuir uma nova lista reconstrói o índice por ID.
+        storage (SQLiteStorage | BundleStorage | None): O backend SQLite ou o bundle (somente leitura),
+                                                        ou None para usar `courses.json`.
+        write_behind_delay (float): Segundos que as alterações aguardam antes de serem gravadas
+                                    (0 grava a cada alteração).
+        version (int): A versão do catálogo em que a cópia em memória se baseia.
     """
     # data_dir_path_str é relativo ao diretório do script (projects/)
-    def __init__(self, data_dir_path_str="data"):
+    def __init__(self, data_dir_path_str="data", storage=None, write_behind_delay=0):
         """
         Inicializa o CourseManager, configurando os caminhos e carregando os cursos.
 
         Args:
             data_dir_path_str (str): O nome do subdiretório de dados (relativo à pasta 'projects').
                                      Padrão é "data".
+            storage (SQLiteStorage, optional): Backend SQLite (ver `storage.py`). Defaults to
+                                               None, que usa os arquivos JSON de `data_dir`.
+            write_behind_delay (float): Se maior que 0, as alterações em `courses.json` são
+                                        agrupadas e gravadas uma única vez após esse número de
+                                        segundos (e ao encerrar o processo).
         """
         # base_dir é a pasta 'projects'
         self.base_dir = Path(__file__).resolve().parent
         self.data_dir = self.base_dir / data_dir_path_str
         # courses_file é projects/data/courses.json
         self.courses_file = self.data_dir / 'courses.json'
+        self.storage = storage
+        self.write_behind_delay = write_behind_delay
+        self._write_lock = threading.RLock()
+        self._pending = [] # Alterações (operação, argumentos) ainda não gravadas em courses.json
+        self._bulk_depth = 0
+        self._flush_timer = None
+        self._lock_depth = 0
+        self._lock_fd = None
+        if write_behind_delay > 0:
+            atexit.register(self.flush)
         
-        self._ensure_data_files_exist()
+        if storage is None:
+            self._ensure_data_files_exist()
+        # (lista de cursos, índice str(id) -> curso), substituídos juntos em uma única atribuição
+        self._state = ([], {})
+        self._version_signature = self._version_file_signature()
+        self.version = self._read_disk_version()
         self.courses = self._load_courses()
-        logger.info(f"CourseManager inicializado. Dados carregados de: {self.courses_file}")
+        logger.info(f"CourseManager inicializado. Dados carregados de: {storage if storage else self.courses_file}")
+
+    @property
+    def courses(self):
+        """list: Os cursos carregados."""
+        return self._state[0]
+
+    @courses.setter
+    def courses(self, courses):
+        # O índice é montado antes da troca: leitores concorrentes veem a lista e o
+        # índice antigos ou os novos, nunca uma combinação dos dois.
+        self._state = (courses, self._build_index(courses))
+
+    @property
+    def _course_index(self):
+        """dict: O índice `str(id) -> curso` da lista atual."""
+        return self._state[1]
+
+    @staticmethod
+    def _build_index(courses):
+        """Monta o índice `id -> curso`. Em IDs repetidos prevalece o primeiro, como na busca linear."""
+        index = {}
+        for course in courses if isinstance(courses, list) else []:
+            if isinstance(course, dict) and course.get('id') is not None:
+                index.setdefault(str(course['id']), course)
+        return index
+
+    def reload(self):
+        """
+        Relê `courses.json` e substitui os cursos carregados, se o arquivo for válido.
+
+        Usado pelo watcher do diretório de dados para aplicar edições sem reiniciar o
+        servidor. Se o arquivo estiver mal formatado (ex: salvo pela metade), os cursos
+        atuais são mantidos. Roda sob `self._write_lock`, como as alterações, e atualiza
+        a versão e a assinatura do arquivo de versão junto com os cursos.
+
+        Returns:
+            bool: True se os cursos foram substituídos.
+        """
+        with self._write_lock:
+            if self.storage is not None:
+                self.version = self.storage.version()
+                self.courses = self.storage.load_courses()
+                return True
+            if self._pending:
+                # Alterações pendentes (bulk/write-behind) são mais recentes que o arquivo.
+                logger.info(f"Recarga de '{self.courses_file}' ignorada: há alterações ainda não gravadas.")
+                return False
+            # A versão é lida antes dos cursos: se outro processo gravar no meio, a cópia
+            # em memória fica com uma versão antiga e é recarregada de novo, nunca o contrário.
+            version_signature = self._version_file_signature()
+            version = self._read_disk_version()
+            try:
+                with open(self.courses_file, 'r', encoding='utf-8') as f:
+                    courses_data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"Recarga de '{self.courses_file}' ignorada: {e}. Mantendo os cursos atuais.")
+                return False
+            if not isinstance(courses_data, list):
+                logger.error(f"Recarga de '{self.courses_file}' ignorada: esperava uma lista, obteve {type(courses_data)}.")
+                return False
+            self._version_signature = version_signature
+            self.version = version
+            self.courses = courses_data
+        logger.info(f"{len(courses_data)} cursos recarregados de {self.courses_file}")
+        return True
+
+    @property
+    def version_file(self):
+        """Path: O arquivo com o contador de versão do catálogo (`courses.version`)."""
+        return self.courses_file.with_name('courses.version')
+
+    @property
+    def lock_file(self):
+        """Path: O arquivo usado pelo lock entre processos (`courses.lock`)."""
+        return self.courses_file.with_name('courses.lock')
+
+    def _version_file_signature(self):
+        """Assinatura (stat) do arquivo de versão, usada para detectar alterações sem lê-lo."""
+        return None if self.storage is not None else file_signature(self.version_file)
+
+    def _read_disk_version(self):
+        """Lê a versão atual do catálogo persistido (0 se ainda não houver)."""
+        if self.storage is not None:
+            return self.storage.version()
+        try:
+            return int(self.version_file.read_text(encoding='utf-8').strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @contextmanager
+    def _catalog_lock(self):
+        """
+        Lock exclusivo do catálogo, entre threads e entre processos (reentrante).
+
+        O lock entre processos usa `fcntl.flock` e só é aplicado aos arquivos JSON;
+        no SQLite, as próprias transações garantem a consistência.
+        """
+        with self._write_lock:
+            if self._lock_depth == 0 and fcntl is not None and self.storage is None:
+                self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_fd is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                    os.close(self._lock_fd)
+                    self._lock_fd = None
+
+    def _sync(self):
+        """
+        Recarrega o catálogo se outro processo o alterou, reaplicando as alterações pendentes.
+
+        Requer `self._write_lock` (e o lock do catálogo, para uma leitura-alteração-gravação).
+
+        Returns:
+            bool: True se o catálogo foi recarregado.
+        """
+        disk_version = self._read_disk_version()
+        if disk_version == self.version:
+            return False
+        courses = self._load_courses()
+        logger.info(f"Catálogo alterado por outro processo (versão {self.version} -> {disk_version}); recarregado.")
+        pending, self._pending = self._pending, []
+        self.version = disk_version
+        self.courses = courses
+        for operation, args in pending:
+            # Alterações que deixaram de ser possíveis (ex: ID já incluído por outro processo) são descartadas.
+            if getattr(self, f"_apply_{operation}")(*args):
+                self._pending.append((operation, args))
+            else:
+                logger.warning(f"Conflito: alteração '{operation}' {args[0]!r:.80} descartada após a recarga do catálogo.")
+        return True
+
+    def _refresh_if_stale(self):
+        """
+        Recarrega a cópia em memória se a versão persistida mudou.
+
+        No backend JSON custa um `os.stat` do arquivo de versão por chamada. Não
+        bloqueia: se outra thread estiver alterando o catálogo, a verificação fica
+        para a próxima chamada.
+        """
+        signature = self._version_file_signature()
+        if self.storage is None and signature == self._version_signature:
+            return
+        if not self._write_lock.acquire(blocking=False):
+            return
+        try:
+            self._version_signature = signature
+            self._sync()
+        finally:
+            self._write_lock.release()
+
+    def _mutate(self, operation, *args):
+        """
+        Aplica uma alteração ao catálogo sob o lock, partindo da versão persistida mais recente.
+
+        Args:
+            operation (str): "add", "update" ou "delete" (ver os métodos `_apply_*`).
+            *args: Os argumentos da operação.
+
+        Returns:
+            O resultado de `_apply_<operation>`, ou None se o armazenamento for somente leitura.
+        """
+        if getattr(self.storage, "read_only", False):
+            logger.error(f"Alteração '{operation}' recusada: o catálogo é servido de um armazenamento somente leitura.")
+            return None
+        with self._catalog_lock():
+            self._sync()
+            result = getattr(self, f"_apply_{operation}")(*args)
+            if not result:
+                return result
+            if self.storage is not None:
+                if operation == "delete":
+                    self.storage.delete_course(args[0])
+                else:
+                    self.storage.save_course(result)
+                self.version = self.storage.version()
+            else:
+                self._pending.append((operation, args))
+                self._save_courses()
+            return result
+
+    def _apply_add(self, course):
+        """Inclui um curso na cópia em memória. Retorna o curso, ou None se o ID já existir."""
+        course_id = str(course['id'])
+        if course_id in self._course_index:
+            return None
+        self.courses.append(course)
+        self._course_index[course_id] = course
+        return course
+
+    def _apply_update(self, course_id, updated_data):
+        """Atualiza um curso na cópia em memória. Retorna o curso, ou None se não existir."""
+        course_to_update = self._course_index.get(course_id)
+        if not course_to_update:
+            return None
+        original_lessons_file = course_to_update.get('lessons_file')
+        original_exercises_file = course_to_update.get('exercises_file')
+
+        # O dicionário é atualizado no lugar: a lista e o índice continuam apontando para ele.
+        course_to_update.update(updated_data)
+
+        # Se os caminhos dos arquivos não foram fornecidos na atualização, mantenha os originais
+        if 'lessons_file' not in updated_data and original_lessons_file:
+             course_to_update['lessons_file'] = original_lessons_file
+        if 'exercises_file' not in updated_data and original_exercises_file:
+              course_to_update['exercises_file'] = original_exercises_file
+        return course_to_update
+
+    def _apply_delete(self, course_id):
+        """Remove um curso da cópia em memória. Retorna True se ele existia."""
+        if course_id not in self._course_index:
+            return False
+        self.courses = [c for c in self.courses if str(c.get('id')) != course_id]
+        return True
 
     def _ensure_data_files_exist(self):
         """
@@ -77,6 +344,8 @@ class CourseManager:
                   vazia se o arquivo não existir, estiver mal formatado, ou ocorrer
                   um erro de I/O.
         """
+        if self.storage is not None:
+            return self.storage.load_courses()
         if not self.courses_file.exists():
             logger.warning(f"Arquivo de cursos '{self.courses_file}' não encontrado. Retornando lista vazia.")
             return []
@@ -99,17 +368,77 @@ class CourseManager:
         """
         Salva a lista atual de cursos (atributo `self.courses`) no arquivo JSON principal.
 
-        Os dados são serializados para JSON com indentação para melhor legibilidade.
+        Dentro de `bulk()` ou no modo write-behind, apenas marca as alterações como
+        pendentes; a gravação acontece em `flush`.
         """
-        try:
-            with open(self.courses_file, 'w', encoding='utf-8') as f:
-                json.dump(self.courses, f, indent=4, ensure_ascii=False)
-            logger.info(f"Cursos salvos em {self.courses_file}")
-        except IOError as e:
-            logger.error(f"Erro de I/O ao salvar cursos em '{self.courses_file}': {e}", exc_info=True)
-        except TypeError as e:
-            logger.error(f"Erro de tipo ao serializar cursos para JSON: {e}. Verifique os dados.", exc_info=True)
+        with self._write_lock:
+            if self._bulk_depth:
+                return
+            if self.write_behind_delay <= 0:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.write_behind_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """
+        Grava as alterações pendentes em `courses.json`, de forma atômica.
+
+        Sob o lock do catálogo, verifica se outro processo gravou uma versão mais
+        nova (reaplicando as alterações pendentes sobre ela), grava os cursos e
+        incrementa o contador de versão. Os dados são serializados para JSON com
+        indentação para melhor legibilidade.
+
+        Returns:
+            bool: True se o arquivo foi gravado (ou não havia alterações pendentes).
+        """
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return True
+            try:
+                with self._catalog_lock():
+                    self._sync()
+                    # Serializa antes de abrir o arquivo: um erro de tipo não deixa gravação parcial.
+                    text = json.dumps(self.courses, indent=4, ensure_ascii=False)
+                    atomic_write_text(self.courses_file, text)
+                    atomic_write_text(self.version_file, str(self.version + 1))
+                    self.version += 1
+                    self._version_signature = self._version_file_signature()
+                self._pending = []
+                logger.info(f"Cursos salvos em {self.courses_file} (versão {self.version})")
+                return True
+            except OSError as e:
+                logger.error(f"Erro de I/O ao salvar cursos em '{self.courses_file}': {e}", exc_info=True)
+            except TypeError as e:
+                logger.error(f"Erro de tipo ao serializar cursos para JSON: {e}. Verifique os dados.", exc_info=True)
+            return False
 
+    @contextmanager
+    def bulk(self):
+        """
+        Context manager que agrupa as alterações do bloco em uma única gravação ao final.
+
+        Pode ser aninhado; a gravação acontece ao sair do bloco mais externo, mesmo
+        que ele termine com exceção (as alterações já feitas em memória são mantidas).
+        O lock do catálogo fica com este processo durante todo o bloco.
+
+        Exemplo:
+            with course_mgr.bulk():
+                for course in novos_cursos:
+                    course_mgr.add_course(course)
+        """
+        with self._catalog_lock():
+            self._bulk_depth += 1
+            try:
+                yield self
+            finally:
+                self._bulk_depth -= 1
+                if not self._bulk_depth and self._pending:
+                    self.flush()
 
     def get_courses(self):
         """
@@ -118,11 +447,12 @@ class CourseManager:
         Returns:
             list: A lista de dicionários de cursos.
         """
+        self._refresh_if_stale()
         return self.courses
 
     def get_course_by_id(self, course_id):
         """
-        Retorna um curso específico pelo seu ID.
+        Retorna um curso específico pelo seu ID, consultando o índice em O(1).
 
         Args:
             course_id (str): O ID do curso a ser procurado.
@@ -133,16 +463,10 @@ class CourseManager:
             logger.warning("get_course_by_id: Tentativa de buscar curso com ID nulo ou vazio.")
             return None
         
-        logger.debug(f"Buscando curso com ID '{course_id}'. Total de cursos: {len(self.courses)}")
-        if self.courses and isinstance(self.courses, list) and len(self.courses) > 0 and isinstance(self.courses[0], dict):
-            logger.debug(f"Primeiro curso na lista: {self.courses[0].get('id')}")
-        else:
-            logger.debug("Lista de cursos está vazia ou não é uma lista de dicionários.")
-            
-        for course in self.courses:
-            if str(course.get('id')) == str(course_id): # Garante comparação de strings
-                logger.debug(f"Curso encontrado: ID '{course.get('id')}'")
-                return course
+        self._refresh_if_stale()
+        course = self._course_index.get(str(course_id)) # Garante comparação de strings
+        if course is not None:
+            return course
         logger.warning(f"Curso com ID '{course_id}' não encontrado.")
         return None
 
@@ -184,21 +508,24 @@ class CourseManager:
         new_course_data.setdefault('lessons_file', f"{course_subdir_name}/lessons.json")
         new_course_data.setdefault('exercises_file', f"{course_subdir_name}/exercises.json")
 
-        course_dir = self.data_dir / course_subdir_name
-        try:
-            course_dir.mkdir(parents=True, exist_ok=True)
-            for key, content in [('lessons_file', []), ('exercises_file', [])]:
-                file_path = self.data_dir / new_course_data[key]
-                if not file_path.exists():
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(content, f, ensure_ascii=False, indent=4)
-                    logger.info(f"Arquivo JSON '{file_path.name}' criado para o curso '{course_id}'.")
-        except OSError as e:
-            logger.error(f"Erro ao criar diretório/arquivos para o novo curso '{course_id}': {e}", exc_info=True)
+        if self.storage is None: # No backend SQLite, lições e exercícios ficam no próprio banco
+            course_dir = self.data_dir / course_subdir_name
+            try:
+                course_dir.mkdir(parents=True, exist_ok=True)
+                for key, content in [('lessons_file', []), ('exercises_file', [])]:
+                    file_path = self.data_dir / new_course_data[key]
+                    if not file_path.exists():
+                        with open(file_path, 'w', encoding='utf-8') as f:
+                            json.dump(content, f, ensure_ascii=False, indent=4)
+                        logger.info(f"Arquivo JSON '{file_path.name}' criado para o curso '{course_id}'.")
+            except OSError as e:
+                logger.error(f"Erro ao criar diretório/arquivos para o novo curso '{course_id}': {e}", exc_info=True)
+                return None
+
+        if not self._mutate("add", new_course_data):
+            # Outro processo incluiu o mesmo ID desde a última leitura do catálogo.
+            logger.error(f"Falha ao adicionar curso: ID '{course_id}' já existe.")
             return None
-
-        self.courses.append(new_course_data)
-        self._save_courses()
         logger.info(f"Curso '{new_course_data.get('name', 'Sem Nome')}' adicionado com ID '{course_id}'.")
         return new_course_data
 
@@ -221,35 +548,14 @@ class CourseManager:
             return None
 
         course_id_str = str(course_id)
-        course_to_update = None
-        course_index = -1
-
-        for i, course in enumerate(self.courses):
-            if str(course.get('id')) == course_id_str:
-                course_to_update = course
-                course_index = i
-                break
-        
-        if course_to_update:
-            if 'id' in updated_data and str(updated_data['id']) != course_id_str:
-                logger.warning(f"Tentativa de alterar ID do curso '{course_id_str}' para '{updated_data['id']}'. IDs não podem ser alterados. Chave 'id' ignorada.")
-                updated_data.pop('id', None) 
-            
-            original_lessons_file = course_to_update.get('lessons_file')
-            original_exercises_file = course_to_update.get('exercises_file')
+        if 'id' in updated_data and str(updated_data['id']) != course_id_str:
+            logger.warning(f"Tentativa de alterar ID do curso '{course_id_str}' para '{updated_data['id']}'. IDs não podem ser alterados. Chave 'id' ignorada.")
+            updated_data.pop('id', None) 
 
-            course_to_update.update(updated_data)
-            self.courses[course_index] = course_to_update # Garante que a referência na lista seja atualizada
-
-            # Se os caminhos dos arquivos não foram fornecidos na atualização, mantenha os originais
-            if 'lessons_file' not in updated_data and original_lessons_file:
-                 self.courses[course_index]['lessons_file'] = original_lessons_file
-            if 'exercises_file' not in updated_data and original_exercises_file:
-                  self.courses[course_index]['exercises_file'] = original_exercises_file
-
-            self._save_courses()
+        course_to_update = self._mutate("update", course_id_str, updated_data)
+        if course_to_update:
             logger.info(f"Curso '{course_id_str}' atualizado com sucesso.")
-            return self.courses[course_index]
+            return course_to_update
         
         logger.warning(f"Falha ao atualizar curso: ID '{course_id_str}' não encontrado.")
         return None
@@ -273,12 +579,9 @@ class CourseManager:
         course_id_str = str(course_id)
         
         course_to_delete = self.get_course_by_id(course_id_str) 
-        if not course_to_delete:
+        if not course_to_delete or not self._mutate("delete", course_id_str):
             logger.warning(f"Falha ao deletar curso: ID '{course_id_str}' não encontrado.")
             return False
-
-        self.courses = [c for c in self.courses if str(c.get('id')) != course_id_str]
-        self._save_courses()
         
         # Opcional: deletar o diretório de dados do curso
         # course_dir_to_delete = self.data_dir / course_id_str
@@ -4,12 +4,18 @@ Módulo para gerenciamento de dados de exercícios.
 
 Este módulo define a classe `ExerciseManager`, responsável por carregar
 informações sobre os exercícios de arquivos JSON específicos associados a um curso.
-Também fornece uma função utilitária para buscar um exercício por ID dentro de um curso.
+Também fornece uma função utilitária para buscar um exercício por ID dentro de um curso,
+e um cache LRU com o `test_code` dos exercícios já compilado, preenchido sempre que um
+arquivo de exercícios é carregado.
 """
 import json
+import hashlib
 import logging
 from pathlib import Path
 
+from .cache import LRUCache
+from .content_cache import content_cache, index_by_id, project_fields, without_fields
+
 # Import CourseManager para obter o caminho do arquivo de exercícios
 # Isso cria uma dependência, mas alinha com a lógica de app.py
 # from .course_manager import CourseManager # Removido, pois get_exercise_by_id não usa mais CourseManager diretamente
@@ -19,6 +25,135 @@ logger = logging.getLogger(__name__)
 # DATA_DIR apontará para Curso-Interartivo-Python/projects/data/
 DATA_DIR = Path(__file__).resolve().parent / 'data'
 
+# Cache de code objects do `test_code`, chaveado por (curso, id do exercício, hash do conteúdo).
+# Como o hash faz parte da chave, uma alteração no JSON gera naturalmente uma nova entrada.
+COMPILED_TEST_CODE_CACHE_SIZE = 1024
+compiled_test_code_cache = LRUCache(maxsize=COMPILED_TEST_CODE_CACHE_SIZE)
+
+# Campos volumosos dos exercícios, omitidos dos resumos (ver `ExerciseManager.load_exercise_summaries`).
+EXERCISE_HEAVY_FIELDS = ("instructions", "initial_code", "solution_code", "test_code")
+
+# Campos que revelam a resposta; nunca enviados nos esboços de exercícios (ver `/api/courses/<id>/bundle`).
+EXERCISE_SOLUTION_FIELDS = ("solution_code", "test_code")
+
+def summarize_exercises(exercises):
+    """
+    Monta os resumos dos exercícios: cópias sem os campos de `EXERCISE_HEAVY_FIELDS`.
+
+    Args:
+        exercises (Iterable): Os exercícios.
+
+    Returns:
+        list: Os resumos.
+    """
+    return without_fields(exercises, EXERCISE_HEAVY_FIELDS)
+
+def _test_code_cache_key(exercises_file, exercise):
+    """Monta a chave do cache de `test_code` compilado para um exercício."""
+    test_code = exercise.get("test_code") or ""
+    digest = hashlib.sha256(test_code.encode("utf-8")).hexdigest()
+    return (str(exercises_file), str(exercise.get("id")), digest)
+
+def _compile_test_code(exercise):
+    """
+    Compila o `test_code` de um exercício.
+
+    Returns:
+        types.CodeType | str: O code object, ou o próprio código-fonte se ele tiver
+                              erro de sintaxe (o executor então reporta o erro normalmente).
+    """
+    test_code = exercise.get("test_code") or ""
+    try:
+        return compile(test_code, f"<test_code:{exercise.get('id')}>", "exec")
+    except (SyntaxError, ValueError) as e:
+        logger.error(f"test_code do exercício '{exercise.get('id')}' não compila: {e}")
+        return test_code
+
+def get_compiled_test_code(exercise, exercises_file):
+    """
+    Retorna o `test_code` compilado de um exercício, usando o cache LRU.
+
+    Args:
+        exercise (dict): O dicionário do exercício.
+        exercises_file (str): O caminho relativo do arquivo de exercícios do curso
+                              (`exercises_file` do registro do curso), o mesmo usado
+                              ao pré-compilar na leitura do arquivo.
+
+    Returns:
+        types.CodeType | str | None: O code object (ou o código-fonte, se não compilar),
+                                     ou None se o exercício não tiver `test_code`.
+    """
+    if not exercise.get("test_code"):
+        return None
+    key = _test_code_cache_key(exercises_file, exercise)
+    return compiled_test_code_cache.get_or_set(key, lambda: _compile_test_code(exercise))
+
+def _prime_compiled_test_code(exercises, exercises_file):
+    """Compila e armazena no cache o `test_code` de todos os exercícios ainda ausentes."""
+    for exercise in exercises:
+        if isinstance(exercise, dict) and exercise.get("test_code"):
+            key = _test_code_cache_key(exercises_file, exercise)
+            if key not in compiled_test_code_cache:
+                compiled_test_code_cache.put(key, _compile_test_code(exercise))
+
+def _parse_exercises_file(full_file_path):
+    """
+    Lê e interpreta um arquivo JSON de exercícios.
+
+    Args:
+        full_file_path (Path): O caminho absoluto do arquivo.
+
+    Returns:
+        list: Os exercícios, ou uma lista vazia se o conteúdo for inválido ou não puder ser lido.
+    """
+    logger.debug(f"Tentando carregar exercícios de: {full_file_path}")
+    try:
+        with open(full_file_path, 'r', encoding='utf-8') as f:
+            exercises_data = json.load(f)
+            if not isinstance(exercises_data, list):
+                logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(exercises_data)}. Retornando lista vazia.")
+                return []
+            logger.info(f"Sucesso ao carregar {len(exercises_data)} exercícios de {full_file_path}")
+            return exercises_data
+    except json.JSONDecodeError as e:
+        logger.error(f"Erro de decodificação JSON ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
+    except IOError as e: # Captura erros de I/O mais genéricos
+        logger.error(f"Erro de I/O ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
+    except Exception as e: # Captura qualquer outra exceção inesperada
+        logger.error(f"Erro inesperado ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
+    return []
+
+def _order_key(exercise):
+    """Chave de ordenação pelo campo `order`; exercícios sem `order` numérico vêm depois, na ordem do arquivo."""
+    order = exercise.get("order")
+    if isinstance(order, (int, float)) and not isinstance(order, bool):
+        return (0, order)
+    return (1, 0)
+
+def index_by_lesson(exercises):
+    """
+    Monta o índice `(id da lição, nível) -> exercícios`, ordenados por `order`.
+
+    Cada exercício aparece sob o nível informado no próprio exercício (em minúsculas)
+    e sob o nível None, que reúne os exercícios da lição independentemente do nível.
+
+    Args:
+        exercises (list): A lista de exercícios de um arquivo.
+
+    Returns:
+        dict: O índice; as listas são compartilhadas e não devem ser modificadas.
+    """
+    index = {}
+    for exercise in exercises:
+        if not isinstance(exercise, dict) or exercise.get("lesson_id") is None:
+            continue
+        lesson_id = str(exercise["lesson_id"])
+        index.setdefault((lesson_id, None), []).append(exercise)
+        index.setdefault((lesson_id, (exercise.get("level") or "").lower()), []).append(exercise)
+    for bucket in index.values():
+        bucket.sort(key=_order_key) # Ordenação estável: empates mantêm a ordem do arquivo
+    return index
+
 class ExerciseManager:
     """
     Gerencia o carregamento de dados de exercícios a partir de arquivos JSON.
@@ -26,26 +161,36 @@ class ExerciseManager:
     Os exercícios são carregados sob demanda de arquivos especificados, geralmente
     referenciados nos dados de um curso.
     """
-    def __init__(self):
+    def __init__(self, storage=None):
         """
         Inicializa o ExerciseManager.
 
         Nenhuma ação de carregamento de dados é realizada durante a inicialização.
         Os exercícios são carregados sob demanda.
+
+        Args:
+            storage (SQLiteStorage, optional): Backend SQLite (ver `storage.py`). Defaults to
+                                               None, que usa os arquivos JSON de `DATA_DIR`.
         """
-        pass # Nenhuma ação de carregamento na inicialização
+        self.storage = storage
 
-    def load_exercises_from_file(self, exercises_file_path_relative: str) -> list:
+    def load_exercises_from_file(self, exercises_file_path_relative: str, fields: list | None = None) -> list:
         """
         Carrega exercícios de um arquivo JSON específico, relativo à pasta 'data' do projeto.
 
         O caminho fornecido é combinado com o `DATA_DIR` do módulo para formar
-        o caminho absoluto para o arquivo de exercícios.
+        o caminho absoluto para o arquivo de exercícios. O conteúdo interpretado fica
+        em `content_cache` e só é relido quando o arquivo muda (a lista retornada é
+        compartilhada e não deve ser modificada); a cada leitura, o `test_code` dos
+        exercícios é compilado e armazenado em `compiled_test_code_cache`.
 
         Args:
             exercises_file_path_relative (str): O caminho relativo para o arquivo JSON
                 de exercícios, a partir do diretório 'data'.
                 Exemplo: "nome_do_curso/exercises.json".
+            fields (list, optional): Os campos a retornar de cada exercício (projeção). Se nenhum
+                deles estiver em `EXERCISE_HEAVY_FIELDS`, os exercícios são montados a partir dos
+                resumos (`load_exercise_summaries`). Defaults to None, que retorna os exercícios completos.
 
         Returns:
             list: Uma lista de dicionários, onde cada dicionário representa um exercício.
@@ -56,32 +201,136 @@ class ExerciseManager:
         if not exercises_file_path_relative:
             logger.warning("load_exercises_from_file chamado com caminho relativo vazio.")
             return []
+        if fields is not None:
+            if set(fields).isdisjoint(EXERCISE_HEAVY_FIELDS):
+                return project_fields(self.load_exercise_summaries(exercises_file_path_relative), fields)
+            return project_fields(self.load_exercises_from_file(exercises_file_path_relative), fields)
+        if self.storage is not None:
+            return self.storage.load_exercises(exercises_file_path_relative)
 
         # Constrói o caminho completo para o arquivo de exercícios
         full_file_path = DATA_DIR / exercises_file_path_relative
         
-        logger.debug(f"Tentando carregar exercícios de: {full_file_path}")
-        
-        if full_file_path.exists() and full_file_path.is_file():
-            try:
-                with open(full_file_path, 'r', encoding='utf-8') as f:
-                    exercises_data = json.load(f)
-                    if not isinstance(exercises_data, list):
-                        logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(exercises_data)}. Retornando lista vazia.")
-                        return []
-                    logger.info(f"Sucesso ao carregar {len(exercises_data)} exercícios de {full_file_path}")
-                    return exercises_data
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro de decodificação JSON ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
-            except IOError as e: # Captura erros de I/O mais genéricos
-                logger.error(f"Erro de I/O ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
-            except Exception as e: # Captura qualquer outra exceção inesperada
-                logger.error(f"Erro inesperado ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
-        else:
-            logger.warning(f"Arquivo de exercícios não encontrado ou não é um arquivo: {full_file_path}")
+        # O arquivo só é lido e interpretado novamente se tiver sido alterado desde o último acesso;
+        # a compilação dos `test_code` acompanha cada nova leitura.
+        exercises_data = content_cache.load(full_file_path, _parse_exercises_file,
+                                            on_parse=lambda exercises: _prime_compiled_test_code(exercises, exercises_file_path_relative))
+        if exercises_data is not None:
+            return exercises_data
+        logger.warning(f"Arquivo de exercícios não encontrado ou não é um arquivo: {full_file_path}")
             
         return [] # Retorna lista vazia se o arquivo não existe ou em caso de erro
 
+    def load_exercise_summaries(self, exercises_file_path_relative: str) -> list:
+        """
+        Carrega os resumos dos exercícios de um arquivo: os exercícios sem `EXERCISE_HEAVY_FIELDS`.
+
+        Nos arquivos JSON, os resumos são montados uma vez por leitura do arquivo e guardados
+        no `content_cache`; nos backends SQLite e bundle, os campos volumosos nem chegam a
+        ser deserializados.
+
+        Args:
+            exercises_file_path_relative (str): O caminho relativo para o arquivo JSON de exercícios.
+
+        Returns:
+            list: Os resumos (lista compartilhada; não deve ser modificada), ou uma lista
+                  vazia se o arquivo não puder ser lido.
+        """
+        if not exercises_file_path_relative:
+            logger.warning("load_exercise_summaries chamado com caminho relativo vazio.")
+            return []
+        if self.storage is not None:
+            return self.storage.load_exercise_summaries(exercises_file_path_relative)
+
+        full_file_path = DATA_DIR / exercises_file_path_relative
+        _, summaries = content_cache.load_derived(full_file_path, _parse_exercises_file, summarize_exercises,
+                                                  on_parse=lambda exercises: _prime_compiled_test_code(exercises, exercises_file_path_relative))
+        if summaries is None:
+            logger.warning(f"Arquivo de exercícios não encontrado ou não é um arquivo: {full_file_path}")
+            return []
+        return summaries
+
+    def content_signature(self, exercises_file_path_relative: str) -> tuple | None:
+        """
+        Retorna uma assinatura do arquivo de exercícios, que muda sempre que o seu conteúdo muda.
+
+        Nos arquivos JSON é `(st_mtime_ns, tamanho, inode)`, obtida com um `os.stat` (ver
+        `ContentCache.signature`: se o arquivo mudou e a versão em cache ainda não foi relida
+        pelo watcher, ela é relida antes, para que a assinatura corresponda ao conteúdo servido);
+        nos backends SQLite e bundle, `(None, versão do armazenamento)`.
+
+        Args:
+            exercises_file_path_relative (str): O caminho relativo para o arquivo JSON de exercícios.
+
+        Returns:
+            tuple | None: A assinatura, ou None se o caminho for vazio ou o arquivo não existir.
+        """
+        if not exercises_file_path_relative:
+            return None
+        if self.storage is not None:
+            return (None, self.storage.version())
+        return content_cache.signature(DATA_DIR / exercises_file_path_relative)
+
+    def get_exercises_for_lesson(self, exercises_file_path_relative: str, lesson_id: str,
+                                 level: str | None = None) -> list:
+        """
+        Retorna os exercícios de uma lição, filtrados pelo nível e ordenados por `order`.
+
+        Usa o índice `index_by_lesson`, montado uma vez por leitura do arquivo e guardado
+        no `content_cache` junto dos exercícios.
+
+        Args:
+            exercises_file_path_relative (str): O caminho relativo para o arquivo JSON de exercícios.
+            lesson_id (str): O ID da lição (comparado como string).
+            level (str, optional): O nível do curso (ex: "Básico"), comparado sem diferenciar
+                maiúsculas. Defaults to None, que não filtra por nível.
+
+        Returns:
+            list: Os exercícios da lição (lista compartilhada; não deve ser modificada).
+        """
+        if not exercises_file_path_relative:
+            logger.warning("get_exercises_for_lesson chamado com caminho relativo vazio.")
+            return []
+        if self.storage is not None:
+            return self.storage.get_exercises_for_lesson(exercises_file_path_relative, lesson_id, level)
+
+        full_file_path = DATA_DIR / exercises_file_path_relative
+        exercises_data, index = content_cache.load_derived(full_file_path, _parse_exercises_file, index_by_lesson,
+                                                           on_parse=lambda exercises: _prime_compiled_test_code(exercises, exercises_file_path_relative))
+        if exercises_data is None:
+            logger.warning(f"Arquivo de exercícios não encontrado ou não é um arquivo: {full_file_path}")
+            return []
+        return index.get((str(lesson_id), level.lower() if level else None), [])
+
+    def get_exercise(self, exercises_file_path_relative: str, exercise_id: str) -> dict | None:
+        """
+        Busca um exercício pelo ID usando o índice `id -> (exercício, posição)` do arquivo.
+
+        O índice é montado uma vez por leitura do arquivo e guardado no `content_cache`
+        junto dos exercícios, de modo que a busca é O(1) e acompanha as alterações do arquivo.
+
+        Args:
+            exercises_file_path_relative (str): O caminho relativo para o arquivo JSON de exercícios.
+            exercise_id (str): O ID do exercício (comparado como string).
+
+        Returns:
+            dict | None: O exercício, ou None se não for encontrado ou o arquivo não puder ser lido.
+        """
+        if not exercises_file_path_relative:
+            logger.warning("get_exercise chamado com caminho relativo vazio.")
+            return None
+        if self.storage is not None:
+            return self.storage.get_exercise(exercises_file_path_relative, exercise_id)
+
+        full_file_path = DATA_DIR / exercises_file_path_relative
+        exercises_data, index = content_cache.load_derived(full_file_path, _parse_exercises_file, index_by_id,
+                                                           on_parse=lambda exercises: _prime_compiled_test_code(exercises, exercises_file_path_relative))
+        if exercises_data is None:
+            logger.warning(f"Arquivo de exercícios não encontrado ou não é um arquivo: {full_file_path}")
+            return None
+        exercise, _ = index.get(str(exercise_id), (None, -1))
+        return exercise
+
 # Função para ser importada pelos testes e outras partes da aplicação
 def get_exercise_by_id(exercise_id: str, course_id: str) -> dict | None:
     """
@@ -110,17 +359,11 @@ def get_exercise_by_id(exercise_id: str, course_id: str) -> dict | None:
     # Se a estrutura de arquivos for diferente, esta lógica precisará ser ajustada.
     exercises_file_relative_path = f"{course_id}/exercises.json"
 
-    mgr = ExerciseManager() # Cria uma instância para usar o método de carregamento
-    all_exercises_for_course = mgr.load_exercises_from_file(exercises_file_relative_path)
-
-    if not all_exercises_for_course: # Se a lista estiver vazia (arquivo não encontrado, erro de parse, etc.)
-        logger.warning(f"Nenhum exercício carregado para o curso '{course_id}' a partir de '{exercises_file_relative_path}'.")
-        return None
-
-    for exercise in all_exercises_for_course:
-        if isinstance(exercise, dict) and str(exercise.get("id")) == str(exercise_id):
-            logger.debug(f"Exercício ID '{exercise_id}' encontrado no curso '{course_id}'.")
-            return exercise
+    mgr = ExerciseManager() # Cria uma instância para usar o método de busca
+    exercise = mgr.get_exercise(exercises_file_relative_path, exercise_id)
+    if exercise is not None:
+        logger.debug(f"Exercício ID '{exercise_id}' encontrado no curso '{course_id}'.")
+        return exercise
             
     logger.warning(f"Exercício com ID '{exercise_id}' não encontrado no arquivo '{exercises_file_relative_path}' para o curso '{course_id}'.")
     return None
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com utilitários de gravação de arquivos compartilhados pela aplicação.
+
+Define `atomic_write_bytes` e `atomic_write_text`, usadas para gravar o catálogo
+de cursos, o bundle de conteúdo, o site estático e os snapshots de métricas sem
+que um leitor (ou uma queda no meio da escrita) veja um arquivo truncado.
+"""
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+def _current_umask():
+    """Lê a umask do processo sem alterá-la (via /proc no Linux; fora dele, troca e restaura)."""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+def _target_mode(path):
+    """Permissões do arquivo gravado: as do destino atual, ou `0o666 & ~umask` se ele não existir."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_current_umask()
+
+def atomic_write_bytes(path, data):
+    """
+    Grava `data` em `path` de forma atômica.
+
+    O conteúdo é escrito em um arquivo temporário no mesmo diretório, sincronizado
+    com `fsync` e então renomeado sobre o destino com `os.replace`. Leitores veem
+    o arquivo antigo ou o novo, completos, mesmo se o processo cair no meio.
+
+    O arquivo temporário é criado pelo `mkstemp` com permissão 0600; antes da troca,
+    ele recebe as permissões do arquivo substituído (ou as de um arquivo novo, segundo
+    a umask), para que outros usuários (ex: o nginx) continuem podendo lê-lo.
+
+    Args:
+        path (str | Path): O arquivo de destino.
+        data (bytes): O conteúdo.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.chmod(f.fileno() if os.chmod in os.supports_fd else tmp_path, _target_mode(path))
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"): # Persiste também a entrada do diretório (POSIX)
+        try:
+            dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+def atomic_write_text(path, text):
+    """
+    Grava `text` em `path` de forma atômica (ver `atomic_write_bytes`).
+
+    Args:
+        path (str | Path): O arquivo de destino.
+        text (str): O conteúdo (gravado em UTF-8).
+    """
+    atomic_write_bytes(path, text.encode('utf-8'))
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com a fila de correção assíncrona de exercícios.
+
+Define a classe `GradingQueue`, uma fila em memória (no próprio processo) atendida
+por threads de correção. Uma submissão é enfileirada e recebe imediatamente um
+`job_id`; o resultado é consultado depois por polling (`get`) ou acompanhado por
+espera bloqueante (`wait`), usada pelo endpoint de server-sent events.
+
+Como a fila vive no processo, as consultas de um job devem chegar ao mesmo
+processo que o recebeu (ex: um único processo com várias threads, ou afinidade
+de sessão no balanceador).
+"""
+import time
+import uuid
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRADING_WORKERS = 4
+DEFAULT_MAX_PENDING_JOBS = 1000
+DEFAULT_RESULT_TTL = 600 # Segundos que um resultado concluído fica disponível para consulta
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_ERROR)
+
+class QueueFullError(Exception):
+    """Levantada quando a fila de correção atingiu o número máximo de jobs pendentes."""
+
+class JobFailed(Exception):
+    """Levantada pela função de um job para encerrá-lo com erro (a mensagem é o "error" do job), sem tratá-lo como erro interno."""
+
+class _Job:
+    """Estado interno de um job de correção."""
+
+    def __init__(self, job_id, func, args):
+        self.job_id = job_id
+        self.func = func
+        self.args = args
+        self.status = STATUS_QUEUED
+        self.result = None
+        self.error = None
+        self.version = 0 # Incrementado a cada mudança de estado
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def snapshot(self):
+        """Retorna uma cópia serializável (JSON) do estado do job."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+class GradingQueue:
+    """
+    Fila de correção assíncrona atendida por um conjunto de threads.
+
+    As threads de correção apenas coordenam a execução: o código do usuário em si
+    roda no pool de processos de `code_executor`, então o número de threads
+    define quantas correções são enviadas ao pool simultaneamente.
+
+    Attributes:
+        workers (int): Número de threads de correção.
+        max_pending (int): Número máximo de jobs enfileirados ou em execução.
+        result_ttl (float): Segundos que um job concluído permanece consultável.
+    """
+
+    def __init__(self, workers=DEFAULT_GRADING_WORKERS, max_pending=DEFAULT_MAX_PENDING_JOBS,
+                 result_ttl=DEFAULT_RESULT_TTL):
+        """
+        Inicializa a fila. As threads são criadas na primeira submissão.
+
+        Args:
+            workers (int): Número de threads de correção.
+            max_pending (int): Número máximo de jobs pendentes antes de `QueueFullError`.
+            result_ttl (float): Tempo de retenção dos resultados, em segundos.
+        """
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _ensure_workers(self):
+        """Cria as threads de correção, se ainda não existirem."""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"grading-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"GradingQueue iniciada com {self.workers} threads de correção.")
+
+    def _evict_expired(self):
+        """Remove jobs concluídos há mais de `result_ttl` segundos. Requer `self._cond`."""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, func, *args):
+        """
+        Enfileira uma correção.
+
+        Args:
+            func (callable): Função executada pela thread de correção; seu retorno
+                             (serializável em JSON) é o resultado do job.
+            *args: Argumentos repassados a `func`.
+
+        Returns:
+            str: O identificador do job.
+
+        Raises:
+            QueueFullError: Se já houver `max_pending` jobs pendentes.
+        """
+        with self._cond:
+            self._evict_expired()
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"Fila de correção cheia ({self.max_pending} jobs pendentes).")
+            self._ensure_workers()
+            job = _Job(uuid.uuid4().hex, func, args)
+            self._jobs[job.job_id] = job
+            self._pending += 1
+        self._queue.put(job)
+        logger.debug(f"Job de correção '{job.job_id}' enfileirado.")
+        return job.job_id
+
+    def get(self, job_id):
+        """
+        Retorna o estado atual de um job.
+
+        Args:
+            job_id (str): O identificador do job.
+
+        Returns:
+            dict | None: O estado do job (ver `_Job.snapshot`), ou None se desconhecido/expirado.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def wait(self, job_id, last_version=-1, timeout=None):
+        """
+        Aguarda até que o job mude de estado em relação a `last_version`.
+
+        Args:
+            job_id (str): O identificador do job.
+            last_version (int): A última versão do estado já observada pelo chamador.
+            timeout (float, optional): Tempo máximo de espera em segundos.
+
+        Returns:
+            tuple[dict | None, int]: O estado do job e sua versão. Se o tempo acabar
+                                     sem mudanças, retorna o estado atual inalterado.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None, last_version
+            self._cond.wait_for(lambda: job.version != last_version, timeout=timeout)
+            return job.snapshot(), job.version
+
+    def _set_state(self, job, **changes):
+        """Atualiza o estado de um job e notifica quem estiver aguardando."""
+        with self._cond:
+            for key, value in changes.items():
+                setattr(job, key, value)
+            job.version += 1
+            if job.status in FINISHED_STATUSES:
+                self._pending -= 1
+            self._cond.notify_all()
+
+    def _worker_loop(self):
+        """Laço das threads de correção: retira jobs da fila e os executa."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._set_state(job, status=STATUS_RUNNING, started_at=time.time())
+            try:
+                result = job.func(*job.args)
+                self._set_state(job, status=STATUS_DONE, result=result, finished_at=time.time())
+            except JobFailed as e:
+                logger.warning(f"Job de correção '{job.job_id}' não concluído: {e}")
+                self._set_state(job, status=STATUS_ERROR, error=str(e), finished_at=time.time())
+            except Exception as e:
+                logger.error(f"Erro inesperado no job de correção '{job.job_id}': {e}", exc_info=True)
+                self._set_state(job, status=STATUS_ERROR, error=f"Erro interno do servidor ao verificar: {e}",
+                                finished_at=time.time())
+
+    def stats(self):
+        """
+        Retorna estatísticas da fila.
+
+        Returns:
+            dict: "pending" (enfileirados ou em execução), "queued" (aguardando uma
+                  thread), "tracked" (jobs consultáveis) e "workers".
+        """
+        with self._cond:
+            return {
+                "pending": self._pending,
+                "queued": self._queue.qsize(),
+                "tracked": len(self._jobs),
+                "workers": self.workers,
+            }
+
+    def shutdown(self):
+        """Sinaliza o encerramento das threads de correção após os jobs já enfileirados."""
+        for _ in self._threads:
+            self._queue.put(None)
+        self._threads = []
@@ -9,11 +9,55 @@ import json
 import logging
 from pathlib import Path
 
+from .content_cache import content_cache, index_by_id, project_fields, without_fields
+
 logger = logging.getLogger(__name__)
 # Assume que este manager está em Curso-Interartivo-Python/projects/
 # DATA_DIR apontará para Curso-Interartivo-Python/projects/data/
 DATA_DIR = Path(__file__).resolve().parent / 'data'
 
+# Campos volumosos das lições, omitidos dos resumos (ver `LessonManager.load_lesson_summaries`).
+LESSON_HEAVY_FIELDS = ("content", "examples", "summary", "learning_objectives", "key_concepts")
+
+def summarize_lessons(lessons):
+    """
+    Monta os resumos das lições: cópias sem os campos de `LESSON_HEAVY_FIELDS`.
+
+    Args:
+        lessons (Iterable): As lições.
+
+    Returns:
+        list: Os resumos.
+    """
+    return without_fields(lessons, LESSON_HEAVY_FIELDS)
+
+def _parse_lessons_file(full_file_path):
+    """
+    Lê e interpreta um arquivo JSON de lições.
+
+    Args:
+        full_file_path (Path): O caminho absoluto do arquivo.
+
+    Returns:
+        list: As lições, ou uma lista vazia se o conteúdo for inválido ou não puder ser lido.
+    """
+    logger.debug(f"Tentando carregar lições de: {full_file_path}")
+    try:
+        with open(full_file_path, 'r', encoding='utf-8') as f:
+            lessons_data = json.load(f)
+            if not isinstance(lessons_data, list):
+                logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(lessons_data)}. Retornando lista vazia.")
+                return []
+            logger.info(f"Sucesso ao carregar {len(lessons_data)} lições de {full_file_path}")
+            return lessons_data
+    except json.JSONDecodeError as e:
+        logger.error(f"Erro de decodificação JSON ao carregar lições de {full_file_path}: {e}", exc_info=True)
+    except IOError as e: # Captura erros de I/O mais genéricos
+        logger.error(f"Erro de I/O ao carregar lições de {full_file_path}: {e}", exc_info=True)
+    except Exception as e: # Captura qualquer outra exceção inesperada
+        logger.error(f"Erro inesperado ao carregar lições de {full_file_path}: {e}", exc_info=True)
+    return []
+
 class LessonManager:
     """
     Gerencia o carregamento de dados de lições a partir de arquivos JSON.
@@ -21,26 +65,35 @@ class LessonManager:
     As lições são carregadas sob demanda de arquivos especificados, geralmente
     referenciados nos dados de um curso.
     """
-    def __init__(self):
+    def __init__(self, storage=None):
         """
         Inicializa o LessonManager.
 
         Atualmente, nenhuma ação de carregamento de dados é realizada
         durante a inicialização. As lições são carregadas sob demanda.
+
+        Args:
+            storage (SQLiteStorage, optional): Backend SQLite (ver `storage.py`). Defaults to
+                                               None, que usa os arquivos JSON de `DATA_DIR`.
         """
-        pass # Nenhuma ação de carregamento na inicialização
+        self.storage = storage
 
-    def load_lessons_from_file(self, lessons_file_path_relative: str) -> list:
+    def load_lessons_from_file(self, lessons_file_path_relative: str, fields: list | None = None) -> list:
         """
         Carrega lições de um arquivo JSON específico, relativo à pasta 'data' do projeto.
 
         O caminho fornecido é combinado com o `DATA_DIR` do módulo para formar
-        o caminho absoluto para o arquivo de lições.
+        o caminho absoluto para o arquivo de lições. O conteúdo interpretado fica
+        em `content_cache` e só é relido quando o arquivo muda; a lista retornada
+        é compartilhada e não deve ser modificada.
 
         Args:
             lessons_file_path_relative (str): O caminho relativo para o arquivo JSON
                 de lições, a partir do diretório 'data'.
                 Exemplo: "nome_do_curso/lessons.json".
+            fields (list, optional): Os campos a retornar de cada lição (projeção). Se nenhum
+                deles estiver em `LESSON_HEAVY_FIELDS`, as lições são montadas a partir dos
+                resumos (`load_lesson_summaries`). Defaults to None, que retorna as lições completas.
 
         Returns:
             list: Uma lista de dicionários, onde cada dicionário representa uma lição.
@@ -51,31 +104,100 @@ class LessonManager:
         if not lessons_file_path_relative:
             logger.warning("load_lessons_from_file chamado com caminho relativo vazio.")
             return []
+        if fields is not None:
+            if set(fields).isdisjoint(LESSON_HEAVY_FIELDS):
+                return project_fields(self.load_lesson_summaries(lessons_file_path_relative), fields)
+            return project_fields(self.load_lessons_from_file(lessons_file_path_relative), fields)
+        if self.storage is not None:
+            return self.storage.load_lessons(lessons_file_path_relative)
 
         # Constrói o caminho completo para o arquivo de lições
         # lessons_file_path_relative é algo como "basic/lessons.json"
         full_file_path = DATA_DIR / lessons_file_path_relative
         
-        logger.debug(f"Tentando carregar lições de: {full_file_path}")
-        
-        if full_file_path.exists() and full_file_path.is_file():
-            try:
-                with open(full_file_path, 'r', encoding='utf-8') as f:
-                    lessons_data = json.load(f)
-                    if not isinstance(lessons_data, list):
-                        logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(lessons_data)}. Retornando lista vazia.")
-                        return []
-                    logger.info(f"Sucesso ao carregar {len(lessons_data)} lições de {full_file_path}")
-                    return lessons_data
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro de decodificação JSON ao carregar lições de {full_file_path}: {e}", exc_info=True)
-            except IOError as e: # Captura erros de I/O mais genéricos
-                logger.error(f"Erro de I/O ao carregar lições de {full_file_path}: {e}", exc_info=True)
-            except Exception as e: # Captura qualquer outra exceção inesperada
-                logger.error(f"Erro inesperado ao carregar lições de {full_file_path}: {e}", exc_info=True)
-        else:
-            logger.warning(f"Arquivo de lições não encontrado ou não é um arquivo: {full_file_path}")
+        # O arquivo só é lido e interpretado novamente se tiver sido alterado desde o último acesso.
+        lessons_data = content_cache.load(full_file_path, _parse_lessons_file)
+        if lessons_data is not None:
+            return lessons_data
+        logger.warning(f"Arquivo de lições não encontrado ou não é um arquivo: {full_file_path}")
             
         return [] # Retorna lista vazia se o arquivo não existe ou em caso de erro
 
-    
+    def load_lesson_summaries(self, lessons_file_path_relative: str) -> list:
+        """
+        Carrega os resumos das lições de um arquivo: as lições sem `LESSON_HEAVY_FIELDS`.
+
+        Nos arquivos JSON, os resumos são montados uma vez por leitura do arquivo e guardados
+        no `content_cache`; nos backends SQLite e bundle, os campos volumosos nem chegam a
+        ser deserializados.
+
+        Args:
+            lessons_file_path_relative (str): O caminho relativo para o arquivo JSON de lições.
+
+        Returns:
+            list: Os resumos (lista compartilhada; não deve ser modificada), ou uma lista
+                  vazia se o arquivo não puder ser lido.
+        """
+        if not lessons_file_path_relative:
+            logger.warning("load_lesson_summaries chamado com caminho relativo vazio.")
+            return []
+        if self.storage is not None:
+            return self.storage.load_lesson_summaries(lessons_file_path_relative)
+
+        full_file_path = DATA_DIR / lessons_file_path_relative
+        _, summaries = content_cache.load_derived(full_file_path, _parse_lessons_file, summarize_lessons)
+        if summaries is None:
+            logger.warning(f"Arquivo de lições não encontrado ou não é um arquivo: {full_file_path}")
+            return []
+        return summaries
+
+    def content_signature(self, lessons_file_path_relative: str) -> tuple | None:
+        """
+        Retorna uma assinatura do arquivo de lições, que muda sempre que o seu conteúdo muda.
+
+        Nos arquivos JSON é `(st_mtime_ns, tamanho, inode)`, obtida com um `os.stat` (ver
+        `ContentCache.signature`: se o arquivo mudou e a versão em cache ainda não foi relida
+        pelo watcher, ela é relida antes, para que a assinatura corresponda ao conteúdo servido);
+        nos backends SQLite e bundle, `(None, versão do armazenamento)`.
+
+        Args:
+            lessons_file_path_relative (str): O caminho relativo para o arquivo JSON de lições.
+
+        Returns:
+            tuple | None: A assinatura, ou None se o caminho for vazio ou o arquivo não existir.
+        """
+        if not lessons_file_path_relative:
+            return None
+        if self.storage is not None:
+            return (None, self.storage.version())
+        return content_cache.signature(DATA_DIR / lessons_file_path_relative)
+
+    def get_lesson_by_id(self, lessons_file_path_relative: str, lesson_id: str) -> tuple:
+        """
+        Busca uma lição pelo ID usando o índice `id -> (lição, posição)` do arquivo.
+
+        O índice é montado uma vez por leitura do arquivo e guardado no `content_cache`
+        junto das lições, de modo que a busca é O(1) e acompanha as alterações do arquivo.
+
+        Args:
+            lessons_file_path_relative (str): O caminho relativo para o arquivo JSON de lições.
+            lesson_id (str): O ID da lição (comparado como string).
+
+        Returns:
+            tuple: `(lição, posição, lições)`, onde `lições` é a lista completa do arquivo.
+                   Se a lição não for encontrada, `(None, -1, lições)`.
+        """
+        if not lessons_file_path_relative:
+            logger.warning("get_lesson_by_id chamado com caminho relativo vazio.")
+            return None, -1, []
+        if self.storage is not None:
+            return self.storage.get_lesson(lessons_file_path_relative, lesson_id)
+
+        full_file_path = DATA_DIR / lessons_file_path_relative
+        lessons_data, index = content_cache.load_derived(full_file_path, _parse_lessons_file, index_by_id)
+        if lessons_data is None:
+            logger.warning(f"Arquivo de lições não encontrado ou não é um arquivo: {full_file_path}")
+            return None, -1, []
+        lesson, position = index.get(str(lesson_id), (None, -1))
+        return lesson, position, lessons_data
+
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com as métricas da aplicação, expostas no formato texto do Prometheus.
+
+Define um registro mínimo de contadores e histogramas (sem dependências externas)
+e as métricas da aplicação: latência e contagem das requisições por rota e
+status, renderização de templates, leitura de arquivos de conteúdo, espera e
+duração das execuções de código e acertos dos caches.
+
+Registrar uma observação custa uma busca em dicionário e uma soma sob um lock.
+Com vários processos (ex: workers do gunicorn), cada processo grava
+periodicamente um retrato dos seus valores em `metrics-<pid>.json` no
+diretório compartilhado configurado com `configure` (no máximo a cada
+`flush_interval` segundos, e ao sair); o processo que responde ao `/metrics`
+soma os retratos dos demais aos seus valores atuais. Os arquivos de processos
+encerrados são mantidos, para que os contadores não diminuam; o diretório deve
+ser esvaziado a cada implantação.
+"""
+import os
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+from pathlib import Path
+
+from .file_utils import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos baldes dos histogramas de latência.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_FLUSH_INTERVAL = 5.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value):
+    """Escapa um valor de rótulo para o formato texto do Prometheus."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    """Formata os rótulos de uma amostra (ex: `{rota="home",le="0.5"}`)."""
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    """Formata o valor de uma amostra."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Counter:
+    """
+    Contador monotônico, com rótulos opcionais.
+
+    Attributes:
+        name (str): O nome da métrica (ex: `curso_http_requests_total`).
+        documentation (str): O texto do `# HELP`.
+        labelnames (tuple): Os nomes dos rótulos.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        """Incrementa o contador dos rótulos dados (na ordem de `labelnames`)."""
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def _reset(self):
+        with self._lock:
+            self._values = {}
+
+    def _snapshot(self):
+        """Valores atuais, como `[[rótulos], valor]`."""
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+class Histogram:
+    """
+    Histograma com baldes fixos, com rótulos opcionais.
+
+    Attributes:
+        name (str): O nome da métrica (ex: `curso_http_request_duration_seconds`).
+        documentation (str): O texto do `# HELP`.
+        labelnames (tuple): Os nomes dos rótulos.
+        buckets (tuple): Os limites superiores dos baldes, em ordem crescente (sem `+Inf`).
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(float(b) for b in buckets)
+        self._values = {} # rótulos -> [contagens por balde (não cumulativas; a última é +Inf), soma]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        """Registra uma observação (ex: uma duração em segundos) para os rótulos dados."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _reset(self):
+        with self._lock:
+            self._values = {}
+
+    def _snapshot(self):
+        """Valores atuais, como `[[rótulos], [contagens por balde, soma]]`."""
+        with self._lock:
+            return [[list(labels), [list(counts), total]] for labels, (counts, total) in self._values.items()]
+
+class CacheCounters:
+    """Contadores de acertos e falhas lidos de objetos com `stats()` (ex: `ContentCache`, `LRUCache`)."""
+
+    def __init__(self):
+        self._caches = {}
+
+    def register(self, name, cache):
+        """
+        Registra um cache; seus "hits" e "misses" são lidos a cada coleta.
+
+        Args:
+            name (str): O valor do rótulo `cache`.
+            cache: Objeto cujo `stats()` retorna um dicionário com "hits" e "misses".
+        """
+        self._caches[name] = cache
+
+    def _snapshot(self):
+        """Valores atuais, como `{"hits": [[[cache], valor], ...], "misses": [...]}`."""
+        values = {"hits": [], "misses": []}
+        for name, cache in list(self._caches.items()):
+            stats = cache.stats()
+            values["hits"].append([[name], stats.get("hits", 0)])
+            values["misses"].append([[name], stats.get("misses", 0)])
+        return values
+
+class Registry:
+    """
+    Conjunto das métricas de um processo, com agregação entre processos por diretório.
+
+    Attributes:
+        directory (Path | None): O diretório compartilhado dos retratos (None: só este processo).
+        flush_interval (float): Intervalo mínimo, em segundos, entre gravações do retrato.
+        caches (CacheCounters): Os caches cujos acertos são exportados.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.flush_interval = DEFAULT_FLUSH_INTERVAL
+        self.caches = CacheCounters()
+        self._metrics = []
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            # Processos filhos (ex: workers do gunicorn com preload) começam do zero.
+            os.register_at_fork(after_in_child=self._reset)
+
+    def counter(self, name, documentation, labelnames=()):
+        """Cria e registra um `Counter`."""
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Cria e registra um `Histogram`."""
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def configure(self, directory=None, flush_interval=None):
+        """
+        Ajusta a agregação entre processos.
+
+        Args:
+            directory (str | Path, optional): Diretório compartilhado pelos processos; criado
+                                              se necessário. Vazio ou None desabilita a agregação.
+            flush_interval (float, optional): Intervalo mínimo entre gravações do retrato.
+        """
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        if flush_interval is not None:
+            self.flush_interval = max(0.0, float(flush_interval))
+
+    def _reset(self):
+        for metric in self._metrics:
+            metric._reset()
+        self._last_flush = time.monotonic()
+
+    def snapshot(self):
+        """
+        Retorna os valores atuais deste processo, serializáveis em JSON.
+
+        Returns:
+            dict: `nome -> {"type", "help", "labelnames", "buckets" (histogramas), "values"}`.
+        """
+        families = {}
+        for metric in self._metrics:
+            family = {"type": metric.type, "help": metric.documentation,
+                      "labelnames": list(metric.labelnames), "values": metric._snapshot()}
+            if metric.type == "histogram":
+                family["buckets"] = list(metric.buckets)
+            families[metric.name] = family
+        cache_values = self.caches._snapshot()
+        families["curso_cache_hits_total"] = {"type": "counter", "help": "Acessos atendidos por cada cache.",
+                                              "labelnames": ["cache"], "values": cache_values["hits"]}
+        families["curso_cache_misses_total"] = {"type": "counter", "help": "Acessos que não encontraram o valor no cache.",
+                                                "labelnames": ["cache"], "values": cache_values["misses"]}
+        return families
+
+    def _path(self, pid):
+        return self.directory / f"metrics-{pid}.json"
+
+    def flush(self):
+        """Grava o retrato deste processo no diretório compartilhado (se configurado)."""
+        if self.directory is None:
+            return
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            try:
+                atomic_write_text(self._path(os.getpid()), json.dumps(self.snapshot()))
+            except OSError as e:
+                logger.error(f"Erro ao gravar as métricas em {self.directory}: {e}")
+
+    def maybe_flush(self):
+        """Grava o retrato se `flush_interval` já tiver passado desde a última gravação."""
+        if self.directory is not None and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def collect(self):
+        """
+        Retorna os valores agregados: os deste processo somados aos retratos dos demais.
+
+        Returns:
+            dict: O mesmo formato de `snapshot`.
+        """
+        families = self.snapshot()
+        if self.directory is None:
+            return families
+        own = self._path(os.getpid()).name
+        for path in sorted(self.directory.glob("metrics-*.json")):
+            if path.name == own:
+                continue
+            try:
+                other = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Retrato de métricas '{path}' ignorado: {e}")
+                continue
+            for name, family in other.items():
+                _merge_family(families, name, family)
+        return families
+
+    def render(self):
+        """
+        Formata os valores agregados no formato texto do Prometheus.
+
+        Returns:
+            str: O corpo da resposta do `/metrics`.
+        """
+        families = self.collect()
+        families["curso_cache_hit_ratio"] = _hit_ratio_family(families)
+        lines = []
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family["labelnames"]
+            for labels, value in sorted(family["values"], key=lambda item: item[0]):
+                if family["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                    continue
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip(family["buckets"] + [float("inf")], counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labelnames, labels, [('le', _format_value(bound))])} {_format_value(cumulative)}")
+                lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labelnames, labels)} {_format_value(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+def _merge_family(families, name, family):
+    """Soma os valores de uma família de outro processo aos de `families`."""
+    current = families.get(name)
+    if current is None:
+        families[name] = family
+        return
+    if current["type"] != family["type"] or current.get("buckets") != family.get("buckets"):
+        logger.warning(f"Métrica '{name}' com definição diferente em outro processo; ignorada.")
+        return
+    index = {tuple(labels): position for position, (labels, _) in enumerate(current["values"])}
+    for labels, value in family["values"]:
+        position = index.get(tuple(labels))
+        if position is None:
+            current["values"].append([labels, value])
+            index[tuple(labels)] = len(current["values"]) - 1
+        elif current["type"] == "histogram":
+            counts, total = current["values"][position][1]
+            current["values"][position][1] = [[a + b for a, b in zip(counts, value[0])], total + value[1]]
+        else:
+            current["values"][position][1] += value
+
+def _hit_ratio_family(families):
+    """Calcula a taxa de acertos de cada cache a partir dos contadores agregados."""
+    hits = {tuple(labels): value for labels, value in families["curso_cache_hits_total"]["values"]}
+    misses = {tuple(labels): value for labels, value in families["curso_cache_misses_total"]["values"]}
+    values = []
+    for labels, hit_count in hits.items():
+        total = hit_count + misses.get(labels, 0)
+        if total:
+            values.append([list(labels), hit_count / total])
+    return {"type": "gauge", "help": "Fração dos acessos atendidos por cada cache (desde o início dos processos).",
+            "labelnames": ["cache"], "values": values}
+
+# Registro e métricas compartilhados pela aplicação.
+registry = Registry()
+atexit.register(registry.flush)
+
+http_requests_total = registry.counter(
+    "curso_http_requests_total", "Requisições HTTP atendidas, por rota, método e status.", ("endpoint", "method", "status"))
+http_request_duration_seconds = registry.histogram(
+    "curso_http_request_duration_seconds", "Tempo de resposta das requisições HTTP, por rota.", ("endpoint",))
+template_render_seconds = registry.histogram(
+    "curso_template_render_seconds", "Tempo de renderização dos templates.", ("template",))
+content_load_seconds = registry.histogram(
+    "curso_content_load_seconds", "Tempo de leitura e interpretação dos arquivos de conteúdo (faltas do content_cache).", ("file",))
+executor_queue_seconds = registry.histogram(
+    "curso_executor_queue_seconds", "Espera das execuções de código: na fila de admissão ou por um processo executor livre.", ("stage",))
+executor_run_seconds = registry.histogram(
+    "curso_executor_run_seconds", "Duração das execuções de código (\"code\") e de testes (\"test\").", ("kind",))
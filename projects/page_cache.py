@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o cache de páginas HTML já renderizadas.
+
+As páginas de curso e de lição dependem apenas do conteúdo (curso, lições,
+exercícios e templates) e são idênticas para todos os usuários. A classe
+`PageCache` guarda o HTML renderizado, chaveado pela rota e pelo ETag da
+página (que já inclui os argumentos da rota e a versão do conteúdo), com
+descarte LRU e limites de número de páginas e de bytes.
+
+Uma página só é armazenada se a renderização não tiver usado dados do
+usuário: se o template (ou a view) tiver lido a sessão do Flask, ou chamado
+`bypass`, o HTML é servido normalmente e descartado.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from flask import g
+from flask.globals import _cv_request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024 # Soma dos tamanhos (UTF-8) das páginas mantidas
+
+def bypass():
+    """
+    Marca a página da requisição atual como específica do usuário (não será armazenada).
+
+    Pode ser chamada por views, context processors ou templates que usem dados do usuário
+    por outro meio que não a sessão.
+    """
+    g.page_cache_bypass = True
+
+def _session_accessed():
+    """Verifica se a sessão da requisição atual foi lida, sem usar o proxy `session` (que a marcaria como lida)."""
+    request_context = _cv_request.get(None)
+    return bool(getattr(getattr(request_context, "_session", None), "accessed", False))
+
+def is_personalized():
+    """
+    Verifica se a renderização da requisição atual usou dados do usuário.
+
+    Returns:
+        bool: True se a sessão foi lida ou `bypass` foi chamada.
+    """
+    return _session_accessed() or bool(g.get("page_cache_bypass", False))
+
+class PageCache:
+    """
+    Cache LRU de páginas HTML renderizadas, limitado por número de páginas e por bytes.
+
+    Attributes:
+        max_entries (int): Número máximo de páginas mantidas.
+        max_bytes (int): Soma máxima dos tamanhos das páginas (0 desabilita o cache).
+        hits (int): Páginas servidas do cache.
+        misses (int): Páginas que precisaram ser renderizadas.
+        bypasses (int): Páginas não armazenadas por usarem dados do usuário.
+        evictions (int): Páginas descartadas pelos limites.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries (int): Número máximo de páginas mantidas (mínimo 1).
+            max_bytes (int): Soma máxima dos tamanhos das páginas.
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Retorna a página armazenada em `key`.
+
+        Args:
+            key (hashable): A chave (ex: rota e ETag da página).
+
+        Returns:
+            bytes | None: O HTML (UTF-8), ou None se ausente.
+        """
+        with self._lock:
+            page = self._entries.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key, html):
+        """
+        Armazena uma página recém-renderizada, a menos que ela use dados do usuário.
+
+        Deve ser chamada no contexto da requisição que a renderizou.
+
+        Args:
+            key (hashable): A chave.
+            html (str): O HTML renderizado.
+
+        Returns:
+            bytes: O HTML codificado em UTF-8 (armazenado ou não).
+        """
+        page = html.encode("utf-8")
+        if is_personalized():
+            with self._lock:
+                self.bypasses += 1
+            return page
+        if len(page) > self.max_bytes:
+            return page
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = page
+            self._bytes += len(page)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return page
+
+    def clear(self):
+        """Remove todas as páginas e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.bypasses = self.evictions = 0
+
+    def stats(self):
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            dict: "entries", "bytes", "max_entries", "max_bytes", "hits", "misses",
+                  "bypasses" e "evictions".
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+            }
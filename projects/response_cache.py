@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o cache de corpos de resposta já serializados e comprimidos.
+
+As listagens de lições e exercícios mudam apenas quando o conteúdo muda, mas
+eram serializadas (e enviadas sem compressão) a cada requisição. A classe
+`ResponseCache` guarda, para cada chave (rota e ETag, que já inclui a URL e a
+versão do conteúdo), o corpo serializado e suas variantes gzip e brotli (esta
+se o pacote opcional `brotli` estiver instalado), calculadas uma única vez.
+Um acerto no cache não serializa nem comprime nada.
+"""
+import gzip
+import logging
+
+from .cache import LRUCache
+
+try:
+    import brotli # Opcional
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_CACHE_SIZE = 256
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def available_encodings():
+    """
+    Retorna as codificações de conteúdo suportadas, da preferida para a menos preferida.
+
+    Returns:
+        list: Ex: `["br", "gzip"]`, ou `["gzip"]` sem o pacote `brotli`.
+    """
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def negotiate_encoding(accept_encodings):
+    """
+    Escolhe a codificação de uma resposta a partir do cabeçalho `Accept-Encoding`.
+
+    Args:
+        accept_encodings (werkzeug.datastructures.Accept): `request.accept_encodings`.
+
+    Returns:
+        str: "br", "gzip" ou "identity" (sem compressão).
+    """
+    return accept_encodings.best_match(available_encodings() + ["identity"], default="identity")
+
+def compress(body, encoding):
+    """
+    Comprime um corpo de resposta.
+
+    Args:
+        body (bytes): O corpo.
+        encoding (str): "gzip" ou "br".
+
+    Returns:
+        bytes: O corpo comprimido (o gzip é determinístico: mtime zerado).
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+class CachedBody:
+    """
+    Corpo de resposta serializado e suas variantes comprimidas.
+
+    Attributes:
+        mimetype (str): O tipo do conteúdo.
+        headers (list): Os demais cabeçalhos da resposta original (ex: `X-Total-Count`).
+        variants (dict): `codificação -> bytes`, incluindo "identity".
+    """
+
+    __slots__ = ("mimetype", "headers", "variants")
+
+    def __init__(self, body, mimetype, headers=()):
+        """
+        Comprime as variantes de um corpo.
+
+        Args:
+            body (bytes): O corpo sem compressão.
+            mimetype (str): O tipo do conteúdo.
+            headers (Iterable): Os demais cabeçalhos, como pares `(nome, valor)`.
+        """
+        self.mimetype = mimetype
+        self.headers = list(headers)
+        self.variants = {"identity": body}
+        for encoding in available_encodings():
+            self.variants[encoding] = compress(body, encoding)
+
+    def body(self, encoding):
+        """Retorna a variante na codificação dada (ou sem compressão, se indisponível)."""
+        return self.variants.get(encoding, self.variants["identity"])
+
+class ResponseCache:
+    """
+    Cache LRU de corpos de resposta serializados e comprimidos.
+
+    Attributes:
+        maxsize (int): Número máximo de respostas mantidas.
+    """
+
+    def __init__(self, maxsize=DEFAULT_RESPONSE_CACHE_SIZE):
+        """
+        Inicializa o cache.
+
+        Args:
+            maxsize (int): Número máximo de respostas mantidas.
+        """
+        self.maxsize = maxsize
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get_or_build(self, key, build, is_current=None):
+        """
+        Retorna o corpo em cache para `key`, serializando e comprimindo-o na primeira vez.
+
+        Args:
+            key (hashable): A chave; deve mudar sempre que o conteúdo mudar (ex: rota e ETag).
+            build (callable): Função sem argumentos que retorna a resposta sem compressão
+                              (`flask.Response`, ex: de `jsonify`).
+            is_current (callable, optional): Chamada após `build`; se retornar False (o conteúdo
+                                             mudou durante a montagem), o corpo é devolvido mas
+                                             não é armazenado em `key`.
+
+        Returns:
+            CachedBody: O corpo e suas variantes.
+        """
+        cached = self._cache.get(key)
+        if cached is None:
+            response = build()
+            headers = [(name, value) for name, value in response.headers.items()
+                       if name not in ("Content-Type", "Content-Length")]
+            cached = CachedBody(response.get_data(), response.mimetype, headers)
+            if is_current is None or is_current():
+                self._cache.put(key, cached)
+        return cached
+
+    def clear(self):
+        """Remove todas as respostas e zera os contadores."""
+        self._cache.clear()
+
+    def stats(self):
+        """
+        Retorna as estatísticas de uso do cache.
+
+        Returns:
+            dict: As estatísticas do `LRUCache` e as codificações disponíveis ("encodings").
+        """
+        return {**self._cache.stats(), "encodings": available_encodings()}
@@ -1,124 +1,232 @@
+// Script da página do editor de código (templates/code_editor.html)
 document.addEventListener('DOMContentLoaded', function() {
     // Inicializar o editor CodeMirror
-    const codeEditor = CodeMirror.fromTextArea(document.getElementById('code-editor'), {
+    const editor = CodeMirror.fromTextArea(document.getElementById('code-editor'), {
         mode: 'python',
         theme: 'monokai',
         lineNumbers: true,
         indentUnit: 4,
-        indentWithTabs: false,
-        smartIndent: true,
-        tabSize: 4,
-        autoCloseBrackets: true,
         matchBrackets: true,
-        extraKeys: {
-            "Tab": function(cm) {
-                cm.replaceSelection("    ", "end");
-            }
-        }
+        autoCloseBrackets: true,
+        autofocus: true,
+        extraKeys: {"Ctrl-Space": "autocomplete"} // Exemplo de tecla extra
     });
 
-    // Botão para executar o código
-    const runButton = document.getElementById('run-code');
-    const outputDiv = document.getElementById('output');
-    const outputTab = document.getElementById('output-tab');
-
-    runButton.addEventListener('click', function() {
-        // Obter o código do editor
-        const code = codeEditor.getValue();
-        
-        // Mostrar indicador de carregamento
-        outputDiv.innerHTML = '<div class="text-center"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Executando...</span></div><p>Executando o código...</p></div>';
-        
-        // Mudar para a aba de saída
-        outputTab.click();
-        
-        // Enviar o código para o servidor para execução
-        fetch('/api/execute-code', {
+    const outputPre = document.getElementById('output'); // Elemento <pre>
+    const outputContainer = document.getElementById('output-area'); // Div que contém o <pre>
+
+    function showOutput(text, state) {
+        outputPre.textContent = text;
+        outputContainer.className = 'border rounded p-3 bg-light' + (state ? ' text-' + state : '');
+    }
+
+    // Executa o código pela API não-streaming, exibindo a saída ao final.
+    async function runCodeBuffered(code) {
+        const response = await fetch('/api/execute-code', { // Endpoint para execução genérica
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json; charset=utf-8'
+                'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ code: code })
-        })
-        .then(response => response.json())
-        .then(data => {
-            // Exibir a saída
-            if (data.returncode === 0) {
-                // Execução bem-sucedida
-                outputDiv.innerHTML = '<pre class="success">' + (data.stdout || 'Programa executado com sucesso (sem saída).') + '</pre>';
+            body: JSON.stringify({ code })
+        });
+
+        const data = await response.json();
+
+        if (response.ok) { // Checa se a resposta HTTP foi bem sucedida (status 2xx)
+            if (data.success) {
+                showOutput(data.output || 'Código executado sem erros, mas sem saída.', 'success');
             } else {
-                // Erro na execução
-                outputDiv.innerHTML = '<pre class="error">' + (data.stderr || 'Erro desconhecido.') + '</pre>';
+                // Se data.success é false, mas a requisição foi ok, pode ser um erro pego pelo executor
+                showOutput(data.details || data.output || 'Erro durante a execução do código.', 'danger');
             }
-        })
-        .catch(error => {
-            outputDiv.innerHTML = '<pre class="error">Erro ao executar o código: ' + error.message + '</pre>';
+        } else {
+            // Erros de HTTP (4xx, 5xx)
+            showOutput(`Erro do servidor: ${response.status}. ${data.error || data.details || 'Detalhes não disponíveis.'}`, 'danger');
+        }
+    }
+
+    // Executa o código pela API de streaming, acrescentando cada pedaço de saída
+    // ao <pre> assim que ele chega (eventos SSE lidos do corpo da resposta).
+    async function runCodeStreaming(code) {
+        const response = await fetch('/api/execute-code/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ code })
         });
+
+        if (!response.ok) {
+            const data = await response.json();
+            showOutput(`Erro do servidor: ${response.status}. ${data.error || data.details || 'Detalhes não disponíveis.'}`, 'danger');
+            return;
+        }
+
+        showOutput('');
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+
+        function handleEvent(block) {
+            let event = 'message';
+            const dataLines = [];
+            block.split('\n').forEach(function(line) {
+                if (line.startsWith('event: ')) {
+                    event = line.slice(7);
+                } else if (line.startsWith('data: ')) {
+                    dataLines.push(line.slice(6));
+                }
+            });
+            if (!dataLines.length) {
+                return; // Comentário/keep-alive
+            }
+            const data = JSON.parse(dataLines.join('\n'));
+            if (event === 'stdout' || event === 'stderr') {
+                outputPre.textContent += data.text;
+            } else if (event === 'result') {
+                result = data;
+            }
+        }
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            let separator;
+            while ((separator = buffer.indexOf('\n\n')) !== -1) {
+                handleEvent(buffer.slice(0, separator));
+                buffer = buffer.slice(separator + 2);
+            }
+        }
+
+        if (!result) {
+            showOutput(outputPre.textContent + '\nConexão encerrada antes do fim da execução.', 'danger');
+        } else if (result.success) {
+            showOutput(outputPre.textContent || 'Código executado sem erros, mas sem saída.', 'success');
+        } else {
+            const previous = outputPre.textContent;
+            showOutput((previous ? previous + '\n' : '') + (result.details || 'Erro durante a execução do código.'), 'danger');
+        }
+    }
+
+    // Botão para executar o código
+    document.getElementById('run-code').addEventListener('click', async function() {
+        const code = editor.getValue();
+        showOutput('Executando...'); // Feedback imediato
+
+        try {
+            // Navegadores sem leitura incremental do corpo da resposta usam a API não-streaming.
+            if (window.ReadableStream && window.TextDecoder) {
+                await runCodeStreaming(code);
+            } else {
+                await runCodeBuffered(code);
+            }
+        } catch (error) {
+            console.error('Erro ao executar o código:', error);
+            showOutput('Erro de comunicação ao tentar executar o código.', 'danger');
+        }
     });
 
-    // Botão para verificar o exercício (se estiver em um exercício)
-    const checkButton = document.getElementById('check-exercise');
-    if (checkButton && exerciseId) {
-        checkButton.addEventListener('click', function() {
-            // Obter o código do editor
-            const code = codeEditor.getValue();
-            
-            // Mostrar indicador de carregamento
-            outputDiv.innerHTML = '<div class="text-center"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Verificando...</span></div><p>Verificando a solução...</p></div>';
-            
-            // Mudar para a aba de saída
-            outputTab.click();
-            
-            // Enviar o código para o servidor para verificação
-            fetch('/api/check-exercise', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json; charset=utf-8'
-                },
-                body: JSON.stringify({ 
-                    exercise_id: exerciseId,
-                    code: code 
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                // Exibir o resultado da verificação
-                if (data.success) {
-                    outputDiv.innerHTML = '<div class="alert alert-success">' + 
-                        '<h4 class="alert-heading">Parabéns!</h4>' +
-                        '<p>' + data.message + '</p>' +
-                        (data.output ? '<pre>' + data.output + '</pre>' : '') +
-                        '</div>';
+    // Acompanha um job de correção assíncrona até sua conclusão.
+    // Usa server-sent events quando disponíveis e recorre a polling caso contrário.
+    function waitForJob(job, onStatus) {
+        return new Promise(function(resolve, reject) {
+            function poll() {
+                fetch(job.status_url)
+                    .then(response => response.json().then(data => ({ response, data })))
+                    .then(({ response, data }) => {
+                        if (!response.ok) {
+                            reject(new Error(data.error || `Erro do servidor: ${response.status}`));
+                        } else if (data.status === 'done' || data.status === 'error') {
+                            resolve(data);
+                        } else {
+                            onStatus(data.status);
+                            setTimeout(poll, 1000);
+                        }
+                    })
+                    .catch(reject);
+            }
+
+            if (!window.EventSource) {
+                poll();
+                return;
+            }
+
+            const events = new EventSource(job.events_url);
+            events.addEventListener('status', function(event) {
+                onStatus(JSON.parse(event.data).status);
+            });
+            events.addEventListener('result', function(event) {
+                events.close();
+                resolve(JSON.parse(event.data));
+            });
+            events.addEventListener('error', function(event) {
+                events.close();
+                if (event.data) {
+                    resolve(JSON.parse(event.data));
                 } else {
-                    outputDiv.innerHTML = '<div class="alert alert-danger">' +
-                        '<h4 class="alert-heading">Não passou nos testes</h4>' +
-                        '<p>' + data.message + '</p>' +
-                        (data.output ? '<pre>' + data.output + '</pre>' : '') +
-                        '</div>';
+                    poll(); // Conexão SSE falhou: continua por polling
                 }
-            })
-            .catch(error => {
-                outputDiv.innerHTML = '<pre class="error">Erro ao verificar o exercício: ' + error.message + '</pre>';
             });
         });
     }
 
-    // Função para redimensionar o editor quando a janela é redimensionada
-    function resizeEditor() {
-        const editorElement = document.querySelector('.CodeMirror');
-        if (editorElement) {
-            const windowHeight = window.innerHeight;
-            const editorTop = editorElement.getBoundingClientRect().top;
-            const footerHeight = 100; // Altura aproximada do footer
-            const newHeight = windowHeight - editorTop - footerHeight;
-            
-            if (newHeight >= 300) { // Altura mínima
-                editorElement.style.height = newHeight + 'px';
+    // Botão para verificar o exercício (se estiver em um exercício)
+    const checkExerciseButton = document.getElementById('check-exercise');
+    if (checkExerciseButton) {
+        checkExerciseButton.addEventListener('click', async function() {
+            const code = editor.getValue();
+            const courseId = checkExerciseButton.dataset.courseId;
+            const exerciseId = checkExerciseButton.dataset.exerciseId;
+
+            showOutput('Verificando...'); // Feedback imediato
+
+            if (!courseId) {
+                showOutput('Erro: ID do curso não encontrado. Não é possível verificar o exercício.', 'danger');
+                console.error("Course ID is missing from the button's data attribute.");
+                return;
             }
-        }
-    }
 
-    // Redimensionar o editor quando a página carrega e quando a janela é redimensionada
-    window.addEventListener('resize', resizeEditor);
-    setTimeout(resizeEditor, 100); // Pequeno atraso para garantir que o editor foi renderizado
-});
\ No newline at end of file
+            try {
+                // Modo assíncrono: o servidor responde com um job_id sem aguardar a correção.
+                const response = await fetch('/api/check-exercise/async', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        course_id: courseId,
+                        exercise_id: exerciseId,
+                        code: code
+                    })
+                });
+
+                const data = await response.json();
+
+                if (response.status !== 202) {
+                    showOutput(`Erro do servidor: ${response.status}. ${data.error || data.details || 'Detalhes não disponíveis.'}`, 'danger');
+                    return;
+                }
+
+                const job = await waitForJob(data, function(status) {
+                    showOutput(status === 'running' ? 'Executando os testes...' : 'Aguardando na fila de correção...');
+                });
+
+                if (job.status !== 'done') {
+                    showOutput(job.error || 'Erro interno do servidor ao verificar.', 'danger');
+                    return;
+                }
+
+                const result = job.result;
+                const text = result.output ? `Saída:\n${result.output}\n\nDetalhes: ${result.details}` : result.details;
+                showOutput(text, result.success ? 'success' : 'danger');
+            } catch (error) {
+                console.error('Erro ao verificar o exercício:', error);
+                showOutput('Erro de comunicação ao tentar verificar o exercício.', 'danger');
+            }
+        });
+    }
+});
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com a verificação estática das submissões, feita antes da execução.
+
+A verificação analisa o código com `ast`, sem executá-lo e sem ocupar um
+processo executor, e rejeita de imediato:
+
+- erros de sintaxe, informando linha e coluna;
+- importações de módulos fora da lista permitida;
+- aninhamento de blocos excessivamente profundo;
+- laços obviamente infinitos (`while True:` no nível do módulo, sem `break`,
+  `return`, `raise` ou chamada a `exit`).
+
+Como boa parte das submissões de iniciantes falha já na sintaxe, esta etapa
+responde a elas sem custo de execução. Ela não substitui os limites de
+tempo/memória do executor: importações dinâmicas (ex: via `getattr`) não são
+detectadas aqui.
+"""
+import ast
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_NESTING_DEPTH = 20
+
+# Módulos da biblioteca padrão que permitiriam escapar dos limites do executor
+# (processos, rede, sinais, limites de recursos, carregamento dinâmico).
+BLOCKED_MODULES = frozenset({
+    "subprocess", "_posixsubprocess", "socket", "_socket", "ssl", "ctypes", "_ctypes",
+    "pty", "resource", "signal", "_signal", "importlib", "faulthandler",
+})
+
+# Bibliotecas de terceiros usadas pelos cursos (ver DEFAULT_PRELOAD_MODULES em code_executor).
+THIRD_PARTY_MODULES = frozenset({
+    "numpy", "pandas", "matplotlib", "scipy", "sklearn", "sqlalchemy",
+    "flask", "flask_sqlalchemy", "django",
+})
+
+# `sys.stdlib_module_names` existe a partir do Python 3.10.
+_STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", ())) or frozenset({
+    "abc", "array", "ast", "asyncio", "bisect", "calendar", "collections", "contextlib", "copy",
+    "csv", "dataclasses", "datetime", "decimal", "enum", "fractions", "functools", "hashlib",
+    "heapq", "io", "itertools", "json", "math", "multiprocessing", "operator", "os", "pathlib",
+    "queue", "random", "re", "shutil", "sqlite3", "statistics", "string", "sys", "tempfile",
+    "textwrap", "threading", "time", "tkinter", "typing", "unittest", "uuid",
+})
+
+DEFAULT_ALLOWED_IMPORTS = (_STDLIB_MODULES | THIRD_PARTY_MODULES) - BLOCKED_MODULES
+
+# Nós que abrem um novo nível de aninhamento de blocos.
+_BLOCK_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.If, ast.For, ast.AsyncFor,
+                ast.While, ast.With, ast.AsyncWith, ast.Try) + ((ast.Match,) if hasattr(ast, "Match") else ()) \
+               + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+_EXIT_FUNCTIONS = frozenset({"exit", "quit", "_exit"})
+
+def _issue(error_type, message, node=None, line=None, col=None):
+    """Monta o dicionário que descreve um problema encontrado na verificação."""
+    if node is not None:
+        line, col = getattr(node, "lineno", None), getattr(node, "col_offset", None)
+        col = col + 1 if col is not None else None # Colunas reportadas a partir de 1
+    location = f" (linha {line}, coluna {col})" if line else ""
+    return {"error_type": error_type, "message": f"{message}{location}", "line": line, "col": col}
+
+def _nesting_depth(node, depth=0):
+    """Retorna a maior profundidade de blocos aninhados a partir de `node`."""
+    deepest = depth
+    for child in ast.iter_child_nodes(node):
+        child_depth = depth + 1 if isinstance(child, _BLOCK_NODES) else depth
+        deepest = max(deepest, _nesting_depth(child, child_depth))
+    return deepest
+
+def _loop_can_exit(loop):
+    """Indica se o corpo de um `while` contém um `break` próprio, `return`, `raise` ou `exit()`."""
+    pending = list(loop.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.Return, ast.Raise, ast.Break)):
+            return True
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            if name in _EXIT_FUNCTIONS:
+                return True
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+            # Em um laço interno, apenas `return`, `raise` e `exit()` encerram este laço.
+            pending.extend(n for n in ast.walk(node) if isinstance(n, (ast.Return, ast.Raise, ast.Call)))
+            continue
+        pending.extend(ast.iter_child_nodes(node))
+    return False
+
+class StaticChecker:
+    """
+    Verificação estática de submissões, executada antes de `code_executor`.
+
+    Attributes:
+        allowed_imports (frozenset[str]): Módulos de nível superior que podem ser importados.
+        max_nesting_depth (int): Número máximo de blocos aninhados.
+    """
+
+    def __init__(self, allowed_imports=DEFAULT_ALLOWED_IMPORTS, max_nesting_depth=DEFAULT_MAX_NESTING_DEPTH):
+        """
+        Inicializa o verificador.
+
+        Args:
+            allowed_imports (iterable[str]): Módulos de nível superior permitidos.
+            max_nesting_depth (int): Número máximo de blocos aninhados.
+        """
+        self.allowed_imports = frozenset(allowed_imports)
+        self.max_nesting_depth = max_nesting_depth
+
+    def _check_import(self, module_name, node):
+        """Retorna um problema se `module_name` não estiver na lista permitida."""
+        top_level = (module_name or "").split(".")[0]
+        if top_level and top_level not in self.allowed_imports:
+            return _issue("ImportNotAllowed", f"Importação do módulo '{top_level}' não é permitida", node)
+        return None
+
+    def check(self, code):
+        """
+        Verifica uma submissão.
+
+        Args:
+            code (str): O código enviado pelo usuário.
+
+        Returns:
+            dict | None: None se o código pode ser executado; caso contrário, um dicionário
+                         com "error_type" ("SyntaxError", "ImportNotAllowed",
+                         "NestingTooDeep" ou "InfiniteLoop"), "message", "line" e "col".
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return _issue(type(e).__name__, f"{type(e).__name__}: {e.msg}", line=e.lineno, col=e.offset)
+        except (ValueError, RecursionError, MemoryError) as e:
+            # Ex: bytes nulos no código ou expressões aninhadas demais para o parser.
+            return _issue("SyntaxError", f"SyntaxError: código não pôde ser analisado ({type(e).__name__})")
+
+        for node in ast.walk(tree):
+            issue = None
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    issue = issue or self._check_import(alias.name, node)
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                issue = self._check_import(node.module, node)
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "__import__":
+                argument = node.args[0] if node.args else None
+                if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+                    issue = self._check_import(argument.value, node)
+                else:
+                    issue = _issue("ImportNotAllowed", "Importação dinâmica com __import__ não é permitida", node)
+            if issue:
+                return issue
+
+        try:
+            depth = _nesting_depth(tree)
+        except RecursionError:
+            return _issue("NestingTooDeep", f"Aninhamento de blocos muito profundo (máximo {self.max_nesting_depth})")
+        if depth > self.max_nesting_depth:
+            return _issue("NestingTooDeep",
+                          f"Aninhamento de blocos muito profundo ({depth} níveis; máximo {self.max_nesting_depth})")
+
+        # Apenas laços no nível do módulo: dentro de funções, `while True` é comum em
+        # threads de trabalho (daemon) que terminam junto com o programa.
+        for node in tree.body:
+            if (isinstance(node, ast.While) and isinstance(node.test, ast.Constant) and node.test.value
+                    and not node.orelse and not _loop_can_exit(node)):
+                return _issue("InfiniteLoop", "Laço infinito: 'while True' sem 'break', 'return' ou 'raise'", node)
+        return None
+
+def format_issue(issue):
+    """
+    Formata um problema da verificação estática para o campo "details" das APIs.
+
+    Args:
+        issue (dict): O retorno de `StaticChecker.check`.
+
+    Returns:
+        str: A mensagem a ser exibida ao usuário.
+    """
+    return f"Verificação prévia: {issue['message']}"
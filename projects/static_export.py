@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com a exportação do conteúdo somente leitura como um site estático.
+
+`export_site` renderiza, com as próprias views da aplicação (e portanto os
+mesmos templates e managers), as páginas `/`, `/courses`, `/courses/<id>` e
+`/courses/<id>/lessons/<lesson_id>`, além das APIs
+`/api/courses/<id>/lessons` e `/api/courses/<id>/exercises`, gravando-as em
+um diretório que qualquer servidor estático (ex: nginx) pode servir:
+
+    /                                   -> index.html
+    /courses/<id>                       -> courses/<id>/index.html
+    /courses/<id>/lessons/<lesson_id>   -> courses/<id>/lessons/<lesson_id>/index.html
+    /api/courses/<id>/lessons           -> api/courses/<id>/lessons.json
+
+Cada arquivo ganha uma variante `.gz` (para o `gzip_static` do nginx) e os
+arquivos de `static/` são copiados. Apenas a execução de código e a correção
+de exercícios continuam precisando do Python.
+
+A reconstrução é incremental: o manifesto `.export-manifest.json` guarda, para
+cada arquivo, uma impressão digital dos dados usados na página (curso, lição,
+exercícios da lição, próxima lição e a assinatura dos templates). Só são
+renderizadas as páginas cujos dados mudaram; arquivos de cursos ou lições
+removidos são apagados.
+"""
+import os
+import json
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from urllib.parse import quote
+
+from .file_utils import atomic_write_bytes
+from .response_cache import compress
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".export-manifest.json"
+
+def _fingerprint(*parts):
+    """Impressão digital dos dados de uma página (JSON canônico, SHA-256)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _safe_segment(value):
+    """Verifica se um ID pode ser usado como nome de diretório no site exportado."""
+    value = str(value)
+    return bool(value) and not value.startswith(".") and "/" not in value and "\\" not in value
+
+def plan_site(course_mgr, lesson_mgr, exercise_mgr, templates_signature=""):
+    """
+    Lista os arquivos do site estático e a impressão digital dos dados de cada um.
+
+    Args:
+        course_mgr (CourseManager): O manager de cursos.
+        lesson_mgr (LessonManager): O manager de lições.
+        exercise_mgr (ExerciseManager): O manager de exercícios.
+        templates_signature (str): Assinatura dos templates; sua mudança refaz todas as páginas.
+
+    Returns:
+        list: Tuplas `(url, caminho relativo do arquivo, impressão digital)`.
+    """
+    courses = course_mgr.get_courses()
+    plan = [
+        ("/", "index.html", _fingerprint("home", templates_signature, courses[:3])),
+        ("/courses", "courses/index.html", _fingerprint("courses", templates_signature, courses)),
+    ]
+    for course in courses:
+        course_id = course.get("id")
+        if not _safe_segment(course_id):
+            logger.warning(f"Curso com ID '{course_id}' não pode ser exportado; ignorado.")
+            continue
+        lessons_file = course.get("lessons_file")
+        exercises_file = course.get("exercises_file")
+        lessons = lesson_mgr.load_lessons_from_file(lessons_file) if lessons_file else []
+        base_url = f"/courses/{quote(str(course_id), safe='')}"
+        plan.append((base_url, f"courses/{course_id}/index.html",
+                     _fingerprint("course", templates_signature, course, lessons)))
+        if lessons_file:
+            plan.append((f"/api{base_url}/lessons", f"api/courses/{course_id}/lessons.json",
+                         _fingerprint("api-lessons", lessons)))
+        if exercises_file:
+            plan.append((f"/api{base_url}/exercises", f"api/courses/{course_id}/exercises.json",
+                         _fingerprint("api-exercises", exercise_mgr.load_exercises_from_file(exercises_file))))
+        for position, lesson in enumerate(lessons):
+            lesson_id = lesson.get("id") if isinstance(lesson, dict) else None
+            if not _safe_segment(lesson_id):
+                logger.warning(f"Lição com ID '{lesson_id}' do curso '{course_id}' não pode ser exportada; ignorada.")
+                continue
+            exercises = (exercise_mgr.get_exercises_for_lesson(exercises_file, lesson_id, level=course.get("level"))
+                         if exercises_file else [])
+            next_lesson = lessons[position + 1] if position < len(lessons) - 1 else None
+            plan.append((f"{base_url}/lessons/{quote(str(lesson_id), safe='')}",
+                         f"courses/{course_id}/lessons/{lesson_id}/index.html",
+                         _fingerprint("lesson", templates_signature, course, lesson, exercises, next_lesson)))
+    return plan
+
+def _load_manifest(output_dir):
+    """Lê o manifesto da exportação anterior (vazio se ausente ou inválido)."""
+    try:
+        with open(output_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def _write_file(output_dir, relative_path, body):
+    """Grava um arquivo do site e sua variante gzip."""
+    path = output_dir / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(path, body)
+    atomic_write_bytes(f"{path}.gz", compress(body, "gzip"))
+
+def _remove_file(output_dir, relative_path):
+    """Apaga um arquivo do site que deixou de existir e sua variante gzip."""
+    for path in (output_dir / relative_path, output_dir / f"{relative_path}.gz"):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+def export_site(app, output_dir, course_mgr, lesson_mgr, exercise_mgr, templates_signature="", full=False):
+    """
+    Exporta (ou atualiza) o site estático em `output_dir`.
+
+    Args:
+        app (Flask): A aplicação, usada para renderizar as páginas com suas próprias views.
+        output_dir (str | Path): O diretório de saída (criado se necessário).
+        course_mgr (CourseManager): O manager de cursos.
+        lesson_mgr (LessonManager): O manager de lições.
+        exercise_mgr (ExerciseManager): O manager de exercícios.
+        templates_signature (str): Assinatura dos templates (ver `plan_site`).
+        full (bool): Se True, renderiza todas as páginas, ignorando o manifesto.
+
+    Returns:
+        dict: "written" (arquivos renderizados), "unchanged", "removed" e "failed"
+              (páginas que não responderam 200; o arquivo anterior é mantido).
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    previous = _load_manifest(output_dir)
+    manifest = {}
+    counts = {"written": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    client = app.test_client()
+    for url, relative_path, fingerprint in plan_site(course_mgr, lesson_mgr, exercise_mgr, templates_signature):
+        if not full and previous.get(relative_path) == fingerprint and (output_dir / relative_path).is_file():
+            manifest[relative_path] = fingerprint
+            counts["unchanged"] += 1
+            continue
+        response = client.get(url)
+        if response.status_code != 200:
+            logger.warning(f"Exportação de '{url}' respondeu {response.status_code}; arquivo não atualizado.")
+            counts["failed"] += 1
+            if relative_path in previous:
+                manifest[relative_path] = None # Mantido, mas refeito na próxima exportação
+            continue
+        _write_file(output_dir, relative_path, response.get_data())
+        manifest[relative_path] = fingerprint
+        counts["written"] += 1
+
+    for relative_path in previous.keys() - manifest.keys():
+        _remove_file(output_dir, relative_path)
+        counts["removed"] += 1
+
+    if app.static_folder and os.path.isdir(app.static_folder):
+        shutil.copytree(app.static_folder, output_dir / "static", dirs_exist_ok=True)
+    atomic_write_bytes(output_dir / MANIFEST_NAME,
+                       json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    logger.info(f"Site estático em {output_dir}: {counts['written']} arquivos gravados, {counts['unchanged']} inalterados, "
+                f"{counts['removed']} removidos, {counts['failed']} com erro.")
+    return counts
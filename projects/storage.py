@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o backend SQLite de armazenamento de cursos, lições e exercícios.
+
+Por padrão, os managers leem e gravam os arquivos JSON da pasta `data/`. Com
+`CURSO_CONTENT_BACKEND=sqlite`, eles passam a usar a classe `SQLiteStorage`
+deste módulo: um banco `sqlite3` em modo WAL (leitores não bloqueiam o
+escritor), com tabelas indexadas por curso/arquivo e ID. Assim, incluir ou
+alterar um curso grava apenas uma linha, e buscar um exercício lê apenas uma.
+
+As lições e os exercícios continuam endereçados pelo caminho relativo do
+arquivo JSON de origem (ex: "basic/lessons.json", a coluna `source`), de modo
+que as assinaturas públicas dos managers não mudam. O conteúdo é importado da
+árvore `data/` existente com `SQLiteStorage.import_data_dir` (comando
+`flask --app projects.app import-content`).
+
+Com `CURSO_CONTENT_BACKEND=bundle`, o conteúdo é servido do bundle binário
+somente leitura de `content_bundle.py` (`BundleStorage`).
+"""
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+from .cache import LRUCache
+from .content_bundle import BundleStorage, DEFAULT_BUNDLE_PATH
+from .content_cache import index_by_id
+from .exercise_manager import EXERCISE_HEAVY_FIELDS
+from .lesson_manager import LESSON_HEAVY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ("json", "sqlite", "bundle")
+DEFAULT_DB_PATH = Path(__file__).resolve().parent / 'data' / 'content.sqlite3'
+MEMO_SIZE = 256 # Listas completas de lições/exercícios mantidas em memória
+
+_TABLES = ("courses", "lessons", "exercises")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+CREATE TABLE IF NOT EXISTS courses (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lessons (
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, position)
+);
+CREATE INDEX IF NOT EXISTS lessons_by_id ON lessons (source, id, position);
+CREATE TABLE IF NOT EXISTS exercises (
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT,
+    lesson_id TEXT,
+    level TEXT,
+    sort_order REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, position)
+);
+CREATE INDEX IF NOT EXISTS exercises_by_id ON exercises (source, id, position);
+CREATE INDEX IF NOT EXISTS exercises_by_lesson ON exercises (source, lesson_id, level, sort_order, position);
+"""
+
+# Toda alteração nas tabelas de conteúdo, inclusive feita por outro processo,
+# incrementa meta.version, que invalida as listas mantidas em memória.
+_VERSION_TRIGGERS = "\n".join(
+    f"CREATE TRIGGER IF NOT EXISTS {table}_{op.lower()}_version AFTER {op} ON {table} "
+    f"BEGIN UPDATE meta SET value = value + 1 WHERE key = 'version'; END;"
+    for table in _TABLES for op in ("INSERT", "UPDATE", "DELETE")
+)
+
+def _text(value):
+    """Converte um ID para a forma usada nas colunas (string), preservando None."""
+    return None if value is None else str(value)
+
+def _sort_order(exercise):
+    """Valor da coluna `sort_order`: o campo `order` se numérico, senão NULL (ordenado por último)."""
+    order = exercise.get("order")
+    if isinstance(order, (int, float)) and not isinstance(order, bool):
+        return order
+    return None
+
+class SQLiteStorage:
+    """
+    Armazenamento de cursos, lições e exercícios em um banco SQLite (modo WAL).
+
+    Cada thread usa sua própria conexão. As listas completas de lições e
+    exercícios de um arquivo de origem (e seus índices por ID) ficam em memória
+    e são descartadas quando o conteúdo do banco muda.
+
+    Attributes:
+        db_path (Path): O caminho do arquivo do banco.
+        read_only (bool): False; o banco aceita alterações no catálogo de cursos.
+    """
+
+    read_only = False
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        """
+        Abre (criando se necessário) o banco e seu esquema.
+
+        Args:
+            db_path (str | Path): O caminho do arquivo do banco.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._memo = LRUCache(maxsize=MEMO_SIZE)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA + _VERSION_TRIGGERS)
+
+    def __repr__(self):
+        return f"SQLiteStorage('{self.db_path}')"
+
+    def _connection(self):
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def version(self):
+        """
+        Retorna a versão do conteúdo, incrementada a cada alteração nas tabelas.
+
+        Returns:
+            int: A versão atual.
+        """
+        return self._connection().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    # --- Cursos ---
+
+    def load_courses(self):
+        """
+        Retorna todos os cursos, na ordem de inclusão.
+
+        Returns:
+            list: Os dicionários dos cursos.
+        """
+        rows = self._connection().execute("SELECT data FROM courses ORDER BY position").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def save_course(self, course):
+        """
+        Inclui ou atualiza um curso, mantendo sua posição se ele já existir.
+
+        Args:
+            course (dict): O curso; deve conter "id".
+        """
+        course_id = str(course["id"])
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO courses (id, position, data) "
+                "VALUES (?, (SELECT COALESCE(MAX(position) + 1, 0) FROM courses), ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                (course_id, json.dumps(course, ensure_ascii=False)))
+
+    def delete_course(self, course_id):
+        """
+        Remove um curso.
+
+        Args:
+            course_id (str): O ID do curso.
+
+        Returns:
+            bool: True se o curso existia.
+        """
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM courses WHERE id = ?", (str(course_id),)).rowcount > 0
+
+    # --- Lições e exercícios ---
+
+    def _load_items(self, table, source):
+        """Retorna `(itens, índice por ID)` de um arquivo de origem, usando a memória se o banco não mudou."""
+        version = self.version()
+        key = (table, source)
+        memo = self._memo.get(key)
+        if memo is not None and memo[0] == version:
+            return memo[1], memo[2]
+        rows = self._connection().execute(
+            f"SELECT data FROM {table} WHERE source = ? ORDER BY position", (source,)).fetchall()
+        items = [json.loads(data) for (data,) in rows]
+        index = index_by_id(items)
+        self._memo.put(key, (version, items, index))
+        return items, index
+
+    def _load_summaries(self, table, source, heavy_fields):
+        """Retorna os itens de um arquivo de origem sem os campos volumosos, removidos pelo próprio SQLite."""
+        version = self.version()
+        key = (table, source, "summaries")
+        memo = self._memo.get(key)
+        if memo is not None and memo[0] == version:
+            return memo[1]
+        paths = [f"$.{field}" for field in heavy_fields]
+        rows = self._connection().execute(
+            f"SELECT json_remove(data, {', '.join('?' * len(paths))}) FROM {table} WHERE source = ? ORDER BY position",
+            (*paths, source)).fetchall()
+        summaries = [json.loads(data) for (data,) in rows]
+        self._memo.put(key, (version, summaries))
+        return summaries
+
+    def load_lessons(self, source):
+        """
+        Retorna as lições de um arquivo de origem.
+
+        Args:
+            source (str): O caminho relativo do arquivo de lições (ex: "basic/lessons.json").
+
+        Returns:
+            list: As lições (lista compartilhada; não deve ser modificada).
+        """
+        return self._load_items("lessons", source)[0]
+
+    def load_lesson_summaries(self, source):
+        """
+        Retorna as lições de um arquivo de origem sem os campos de `LESSON_HEAVY_FIELDS`.
+
+        Args:
+            source (str): O caminho relativo do arquivo de lições.
+
+        Returns:
+            list: Os resumos (lista compartilhada; não deve ser modificada).
+        """
+        return self._load_summaries("lessons", source, LESSON_HEAVY_FIELDS)
+
+    def get_lesson(self, source, lesson_id):
+        """
+        Busca uma lição pelo ID.
+
+        Args:
+            source (str): O caminho relativo do arquivo de lições.
+            lesson_id (str): O ID da lição.
+
+        Returns:
+            tuple: `(lição, posição, lições)`, ou `(None, -1, lições)` se não encontrada.
+        """
+        lessons, index = self._load_items("lessons", source)
+        lesson, position = index.get(str(lesson_id), (None, -1))
+        return lesson, position, lessons
+
+    def load_exercises(self, source):
+        """
+        Retorna os exercícios de um arquivo de origem.
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+
+        Returns:
+            list: Os exercícios (lista compartilhada; não deve ser modificada).
+        """
+        return self._load_items("exercises", source)[0]
+
+    def load_exercise_summaries(self, source):
+        """
+        Retorna os exercícios de um arquivo de origem sem os campos de `EXERCISE_HEAVY_FIELDS`.
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+
+        Returns:
+            list: Os resumos (lista compartilhada; não deve ser modificada).
+        """
+        return self._load_summaries("exercises", source, EXERCISE_HEAVY_FIELDS)
+
+    def get_exercise(self, source, exercise_id):
+        """
+        Busca um exercício pelo ID, lendo apenas a sua linha.
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+            exercise_id (str): O ID do exercício.
+
+        Returns:
+            dict | None: O exercício, ou None se não encontrado.
+        """
+        row = self._connection().execute(
+            "SELECT data FROM exercises WHERE source = ? AND id = ? ORDER BY position LIMIT 1",
+            (source, str(exercise_id))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_exercises_for_lesson(self, source, lesson_id, level=None):
+        """
+        Retorna os exercícios de uma lição, filtrados pelo nível e ordenados por `order`.
+
+        Args:
+            source (str): O caminho relativo do arquivo de exercícios.
+            lesson_id (str): O ID da lição.
+            level (str, optional): O nível, comparado sem diferenciar maiúsculas.
+
+        Returns:
+            list: Os exercícios da lição.
+        """
+        query = "SELECT data FROM exercises WHERE source = ? AND lesson_id = ?"
+        params = [source, str(lesson_id)]
+        if level:
+            query += " AND level = ?"
+            params.append(level.lower())
+        query += " ORDER BY sort_order IS NULL, sort_order, position"
+        return [json.loads(data) for (data,) in self._connection().execute(query, params).fetchall()]
+
+    # --- Importação ---
+
+    def _replace_items(self, conn, table, source, items):
+        """
+        Substitui todas as lições ou exercícios de um arquivo de origem (dentro de `conn`).
+
+        Args:
+            conn (sqlite3.Connection): A conexão, com a transação em andamento.
+            table (str): "lessons" ou "exercises".
+            source (str): O caminho relativo do arquivo de origem.
+            items (list): Os novos itens.
+        """
+        conn.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+        if table == "lessons":
+            conn.executemany(
+                "INSERT INTO lessons (source, position, id, data) VALUES (?, ?, ?, ?)",
+                [(source, position, _text(item.get("id")) if isinstance(item, dict) else None,
+                  json.dumps(item, ensure_ascii=False)) for position, item in enumerate(items)])
+        else:
+            conn.executemany(
+                "INSERT INTO exercises (source, position, id, lesson_id, level, sort_order, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(source, position, _text(item.get("id")), _text(item.get("lesson_id")),
+                  (item.get("level") or "").lower(), _sort_order(item), json.dumps(item, ensure_ascii=False))
+                 if isinstance(item, dict) else (source, position, None, None, None, None, json.dumps(item))
+                 for position, item in enumerate(items)])
+
+    def import_data_dir(self, data_dir):
+        """
+        Importa a árvore JSON `data/` (cursos e os arquivos de lições/exercícios que eles referenciam).
+
+        A importação acontece em uma única transação e substitui o conteúdo atual do banco.
+
+        Args:
+            data_dir (str | Path): O diretório com `courses.json`.
+
+        Returns:
+            dict: Contagens importadas: "courses", "lessons" e "exercises".
+        """
+        data_dir = Path(data_dir)
+        with open(data_dir / 'courses.json', 'r', encoding='utf-8') as f:
+            courses = json.load(f)
+        if not isinstance(courses, list):
+            raise ValueError(f"Formato inválido em {data_dir / 'courses.json'}: esperava uma lista.")
+
+        counts = {"courses": 0, "lessons": 0, "exercises": 0}
+        with self._connection() as conn:
+            for table in _TABLES:
+                conn.execute(f"DELETE FROM {table}")
+            for course in courses:
+                if not isinstance(course, dict) or course.get("id") is None:
+                    logger.warning(f"Curso sem ID ignorado na importação: {course!r:.80}")
+                    continue
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO courses (id, position, data) VALUES (?, ?, ?)",
+                    (str(course["id"]), counts["courses"], json.dumps(course, ensure_ascii=False)))
+                counts["courses"] += cursor.rowcount
+                for table, key in (("lessons", "lessons_file"), ("exercises", "exercises_file")):
+                    source = course.get(key)
+                    if not source or not (data_dir / source).is_file():
+                        continue
+                    with open(data_dir / source, 'r', encoding='utf-8') as f:
+                        items = json.load(f)
+                    if not isinstance(items, list):
+                        logger.error(f"Formato inválido em {data_dir / source}: esperava uma lista. Arquivo ignorado.")
+                        continue
+                    self._replace_items(conn, table, source, items)
+                    counts[table] += len(items)
+        logger.info(f"Importação de '{data_dir}' para '{self.db_path}' concluída: {counts}")
+        return counts
+
+def create_storage(backend, db_path=DEFAULT_DB_PATH, bundle_path=DEFAULT_BUNDLE_PATH):
+    """
+    Cria o armazenamento configurado.
+
+    Args:
+        backend (str): "json" (arquivos da pasta `data/`, tratados pelos próprios managers),
+                       "sqlite" ou "bundle".
+        db_path (str | Path): O caminho do banco, para o backend "sqlite".
+        bundle_path (str | Path): O caminho do bundle, para o backend "bundle".
+
+    Returns:
+        SQLiteStorage | BundleStorage | None: O armazenamento, ou None para o backend JSON.
+
+    Raises:
+        ValueError: Se o backend for desconhecido.
+    """
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend de armazenamento desconhecido: '{backend}'. Opções: {', '.join(STORAGE_BACKENDS)}.")
+    if backend == "json":
+        return None
+    if backend == "bundle":
+        return BundleStorage(bundle_path)
+    return SQLiteStorage(db_path)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para memoização de resultados de verificação de exercícios.
+
+Muitos alunos enviam soluções idênticas (ou que diferem apenas em espaços e
+comentários) para o mesmo exercício. Este módulo calcula uma impressão digital
+("fingerprint") da submissão a partir de sua AST normalizada e do hash do
+`test_code` do exercício, permitindo reaproveitar o veredito de uma verificação
+anterior sem executar o código novamente.
+
+Apenas submissões determinísticas são elegíveis: código que usa `input`,
+aleatoriedade, tempo, E/S ou outras fontes externas é detectado na AST e
+excluído do cache.
+"""
+import ast
+import hashlib
+import logging
+
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBMISSION_CACHE_SIZE = 4096
+# Resultados com saída maior que isto não são armazenados, limitando o uso de memória.
+DEFAULT_MAX_CACHED_OUTPUT_CHARS = 10_000
+
+# Módulos cujo uso torna o resultado dependente de fatores externos (tempo, aleatoriedade, E/S, rede, ...).
+NONDETERMINISTIC_MODULES = frozenset({
+    "random", "secrets", "uuid", "time", "datetime", "calendar", "zoneinfo",
+    "os", "sys", "io", "pathlib", "shutil", "glob", "tempfile", "fileinput",
+    "socket", "ssl", "select", "selectors", "http", "urllib", "requests",
+    "subprocess", "signal", "threading", "multiprocessing", "concurrent", "asyncio",
+    "sqlite3", "dbm", "shelve", "pickle", "csv", "logging", "importlib", "gc",
+    "pandas", "matplotlib", "tkinter", "flask", "django", "sqlalchemy",
+})
+
+# Funções embutidas que leem dados externos ou dependem do estado do processo.
+NONDETERMINISTIC_BUILTINS = frozenset({
+    "input", "open", "exec", "eval", "compile", "__import__", "breakpoint",
+    "globals", "locals", "vars", "id", "hash", "help",
+})
+
+# Tipos de erro que refletem o ambiente de execução, e não o código em si.
+NON_CACHEABLE_ERROR_TYPES = frozenset({
+    "TimeoutError", "WorkerError", "ExecutionLimitExceeded", "MemoryError",
+})
+
+def is_deterministic(tree):
+    """
+    Verifica se uma AST não usa fontes conhecidas de não-determinismo.
+
+    Args:
+        tree (ast.AST): A AST da submissão.
+
+    Returns:
+        bool: False se o código importa um módulo de `NONDETERMINISTIC_MODULES`,
+              referencia uma função de `NONDETERMINISTIC_BUILTINS` ou acessa um
+              atributo `random` (ex: `numpy.random`).
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            if any(alias.name.split(".")[0] in NONDETERMINISTIC_MODULES for alias in node.names):
+                return False
+        elif isinstance(node, ast.ImportFrom):
+            if node.level or (node.module or "").split(".")[0] in NONDETERMINISTIC_MODULES:
+                return False
+        elif isinstance(node, ast.Name) and node.id in NONDETERMINISTIC_BUILTINS:
+            return False
+        elif isinstance(node, ast.Attribute) and node.attr in ("random", "__import__", "__builtins__"):
+            # Ex: `np.random.rand()` em módulos que são determinísticos no restante.
+            return False
+    return True
+
+def fingerprint_submission(user_code, test_code):
+    """
+    Calcula a impressão digital de uma submissão determinística.
+
+    A AST é serializada sem posições de linha/coluna, de modo que diferenças
+    apenas de espaçamento, quebras de linha ou comentários geram o mesmo valor.
+
+    Args:
+        user_code (str): O código enviado pelo usuário.
+        test_code (str): O `test_code` do exercício.
+
+    Returns:
+        str | None: O fingerprint (hex SHA-256), ou None se o código não puder ser
+                    analisado ou não for determinístico.
+    """
+    try:
+        tree = ast.parse(user_code)
+    except (SyntaxError, ValueError):
+        return None
+    if not is_deterministic(tree):
+        return None
+    normalized = ast.dump(tree, annotate_fields=False, include_attributes=False)
+    test_code_hash = hashlib.sha256((test_code or "").encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{normalized}\0{test_code_hash}".encode("utf-8")).hexdigest()
+
+class SubmissionCache:
+    """
+    Cache LRU de vereditos de verificação, indexado pelo fingerprint da submissão.
+
+    Attributes:
+        max_output_chars (int): Tamanho máximo da saída de um veredito armazenável.
+    """
+
+    def __init__(self, maxsize=DEFAULT_SUBMISSION_CACHE_SIZE, max_output_chars=DEFAULT_MAX_CACHED_OUTPUT_CHARS):
+        """
+        Inicializa o cache.
+
+        Args:
+            maxsize (int): Número máximo de vereditos armazenados.
+            max_output_chars (int): Vereditos com saída maior que isto não são armazenados.
+        """
+        self._cache = LRUCache(maxsize=maxsize)
+        self.max_output_chars = max_output_chars
+
+    def fingerprint(self, user_code, test_code):
+        """Atalho para `fingerprint_submission`."""
+        return fingerprint_submission(user_code, test_code)
+
+    def get(self, fingerprint):
+        """
+        Retorna uma cópia do veredito armazenado para `fingerprint`, se houver.
+
+        Args:
+            fingerprint (str | None): O fingerprint da submissão.
+
+        Returns:
+            dict | None: O veredito (corpo da resposta JSON), ou None.
+        """
+        if not fingerprint:
+            return None
+        verdict = self._cache.get(fingerprint)
+        return dict(verdict) if verdict is not None else None
+
+    def put(self, fingerprint, verdict, error_types=()):
+        """
+        Armazena um veredito, se ele for elegível.
+
+        Args:
+            fingerprint (str | None): O fingerprint da submissão.
+            verdict (dict): O corpo da resposta JSON da verificação.
+            error_types (iterable): Os `error_type` das execuções envolvidas; vereditos
+                                    causados por limites do ambiente não são armazenados.
+
+        Returns:
+            bool: True se o veredito foi armazenado.
+        """
+        if not fingerprint:
+            return False
+        if any(error_type in NON_CACHEABLE_ERROR_TYPES for error_type in error_types):
+            return False
+        if len(verdict.get("output") or "") > self.max_output_chars:
+            return False
+        self._cache.put(fingerprint, dict(verdict))
+        return True
+
+    def clear(self):
+        """Remove todos os vereditos armazenados."""
+        self._cache.clear()
+
+    def stats(self):
+        """Retorna as estatísticas do cache LRU subjacente."""
+        return self._cache.stats()
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from projects.admission import AdmissionController, AdmissionRejected
+
+def test_admits_up_to_max_concurrency_without_waiting():
+    """Testa que execuções dentro do limite são admitidas imediatamente."""
+    controller = AdmissionController(max_concurrency=2, max_queue_depth=0)
+    first = controller.acquire("a")
+    second = controller.acquire("b")
+    assert controller.stats()["active"] == 2
+    first.release()
+    second.release()
+    first.release() # Liberação repetida é ignorada
+    assert controller.stats()["active"] == 0
+
+def test_rejects_when_queue_is_full():
+    """Testa a recusa imediata, com Retry-After, quando a fila está cheia."""
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=0)
+    slot = controller.acquire("a")
+    with pytest.raises(AdmissionRejected) as excinfo:
+        controller.acquire("b")
+    assert excinfo.value.retry_after >= 1
+    assert controller.stats()["rejected"] == 1
+    slot.release()
+
+def test_wait_timeout_removes_request_from_queue():
+    """Testa que uma requisição que espera demais é recusada e sai da fila."""
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=5, max_wait=0.05)
+    slot = controller.acquire("a")
+    with pytest.raises(AdmissionRejected):
+        controller.acquire("b")
+    stats = controller.stats()
+    assert stats["queued"] == 0
+    assert stats["timed_out"] == 1
+    slot.release()
+    assert controller.stats()["active"] == 0
+
+def test_waiting_clients_are_served_round_robin():
+    """Testa que um cliente com muitas requisições não passa à frente dos demais."""
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=10, max_wait=5)
+    holder = controller.acquire("inicial")
+    order = []
+    lock = threading.Lock()
+
+    def request(client_id):
+        with controller.admit(client_id):
+            with lock:
+                order.append(client_id)
+
+    threads = []
+    for client_id in ["aluno-1", "aluno-1", "aluno-1", "aluno-2", "aluno-3"]:
+        thread = threading.Thread(target=request, args=(client_id,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02) # Garante a ordem de chegada na fila
+    assert controller.stats()["queued"] == 5
+    holder.release()
+    for thread in threads:
+        thread.join()
+    assert order == ["aluno-1", "aluno-2", "aluno-3", "aluno-1", "aluno-1"]
+    assert controller.stats()["wait_time_max"] > 0
@@ -2,6 +2,7 @@
 import pytest
 import os
 import json
+import gzip
 import sys # Needed for test_execute_code_api
 import logging
 
@@ -67,6 +68,163 @@ def test_lesson_detail_route(client, app_test_data):
     # Check for an exercise title associated with this lesson in the test data
     assert b"Ol\xc3\xa1, Mundo!" in response.data # "Olá, Mundo!" - Assuming an exercise title exists
 
+def test_list_apis_support_fields_and_pagination(client, app_test_data):
+    """Testa a projeção de campos e a paginação das listagens de lições e exercícios."""
+    response = client.get('/api/courses/python-basico/lessons?fields=id,title')
+    assert response.status_code == 200
+    assert response.get_json() == [{"id": "introducao-python", "title": "Introdução ao Python"}]
+
+    response = client.get('/api/courses/python-basico/exercises?fields=id,order&offset=1&limit=5')
+    assert response.get_json() == [{"id": "ex-introducao-1", "order": 1}]
+    assert response.headers['X-Total-Count'] == '2'
+
+    response = client.get('/api/courses/python-basico/exercises?fields=id,test_code&limit=1')
+    assert response.get_json()[0]["test_code"].startswith("assert")
+    assert "test_code" in client.get('/api/courses/python-basico/exercises').get_json()[0]
+    assert client.get('/api/courses/python-basico/lessons?limit=-1').status_code == 400
+
+def test_content_responses_support_conditional_get(client, app_test_data):
+    """Testa ETag/Last-Modified e a resposta 304 nas APIs e páginas de conteúdo."""
+    for url in ('/api/courses/python-basico/lessons', '/courses/python-basico',
+                '/courses/python-basico/lessons/introducao-python'):
+        response = client.get(url)
+        etag = response.headers['ETag']
+        assert response.status_code == 200 and response.headers['Last-Modified']
+        not_modified = client.get(url, headers={'If-None-Match': etag})
+        assert (not_modified.status_code, not_modified.data) == (304, b"")
+        assert client.get(url, headers={'If-Modified-Since': response.headers['Last-Modified']}).status_code == 304
+
+    url = '/api/courses/python-basico/lessons'
+    etag = client.get(url).headers['ETag']
+    assert client.get(url + '?fields=id').headers['ETag'] != etag
+    lessons_file = app_test_data / 'basic' / 'lessons.json'
+    lessons = json.loads(lessons_file.read_text(encoding='utf-8'))
+    lessons[0]["title"] = "Introdução ao Python (revisada)"
+    lessons_file.write_text(json.dumps(lessons), encoding='utf-8')
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+
+def test_validators_match_content_served_from_watched_root(client, app_test_data):
+    """Testa que, sob um diretório acompanhado pelo watcher, ETag e corpo mudam juntos após uma edição."""
+    from projects.content_cache import content_cache
+    content_cache.watch(app_test_data) # Sem watcher ativo: o cache só seria relido por `refresh`
+    try:
+        urls = ('/api/courses/python-basico/lessons', '/courses/python-basico/lessons/introducao-python')
+        etags = {url: client.get(url).headers['ETag'] for url in urls}
+        lessons_file = app_test_data / 'basic' / 'lessons.json'
+        lessons = json.loads(lessons_file.read_text(encoding='utf-8'))
+        lessons[0]["title"] = "Introdução ao Python (revisada)"
+        lessons_file.write_text(json.dumps(lessons), encoding='utf-8')
+        for url in urls:
+            response = client.get(url, headers={'If-None-Match': etags[url]})
+            assert response.status_code == 200 and response.headers['ETag'] != etags[url]
+            assert "(revisada)" in response.get_data(as_text=True)
+    finally:
+        content_cache.unwatch(app_test_data)
+
+def test_content_api_serves_compressed_cached_body(client, app_test_data):
+    """Testa a resposta comprimida e o ETag por codificação das APIs de conteúdo."""
+    url = '/api/courses/python-basico/exercises'
+    plain = client.get(url)
+    compressed = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    assert compressed.headers['X-Total-Count'] == '2'
+    revalidated = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+    assert revalidated.status_code == 304
+
+def test_course_bundle_api(client, app_test_data, monkeypatch):
+    """Testa o pacote do curso: metadados, sumário das lições e exercícios sem solução."""
+    url = '/api/courses/python-basico/bundle'
+    response = client.get(url)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["course"]["name"] == "Python Básico"
+    assert [l["id"] for l in data["lessons"]] == ["introducao-python"] and "content" not in data["lessons"][0]
+    assert sorted(e["id"] for e in data["exercises"]) == ["ex-introducao-1", "ex-introducao-5"]
+    assert all("solution_code" not in e and "test_code" not in e for e in data["exercises"])
+    assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    data = client.get(url + '?fields=id&lesson_fields=id,title&exercise_fields=id,solution_code').get_json()
+    assert data["course"] == {"id": "python-basico"}
+    assert list(data["lessons"][0]) == ["id", "title"]
+    assert all(list(e) == ["id"] for e in data["exercises"])
+    assert client.get('/api/courses/nao-existe/bundle').status_code == 404
+
+    from projects.app import course_mgr
+    monkeypatch.setitem(course_mgr.get_course_by_id("python-basico"), "name", "Python Básico (revisado)")
+    updated = client.get(url, headers={'If-None-Match': response.headers['ETag']})
+    assert updated.status_code == 200 and updated.get_json()["course"]["name"] == "Python Básico (revisado)"
+
+def test_pages_are_served_from_page_cache(client, app_test_data):
+    """Testa que a página renderizada é reaproveitada até o conteúdo mudar."""
+    url = '/courses/python-basico/lessons/introducao-python'
+    before = client.get('/api/page-cache/stats').get_json()
+    first = client.get(url)
+    second = client.get(url)
+    after = client.get('/api/page-cache/stats').get_json()
+    assert second.data == first.data and second.headers['ETag'] == first.headers['ETag']
+    assert after["hits"] - before["hits"] == 1
+
+    lessons_file = app_test_data / 'basic' / 'lessons.json'
+    lessons = json.loads(lessons_file.read_text(encoding='utf-8'))
+    lessons[0]["title"] = "Introdução ao Python (revisada)"
+    lessons_file.write_text(json.dumps(lessons), encoding='utf-8')
+    assert "Introdução ao Python (revisada)" in client.get(url).get_data(as_text=True)
+
+def test_metrics_endpoint(client, app_test_data):
+    """Testa que o /metrics expõe as requisições atendidas no formato do Prometheus."""
+    client.get('/courses/python-basico')
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'curso_http_requests_total{endpoint="course_detail_page",method="GET",status="200"}' in text
+    assert 'curso_http_request_duration_seconds_bucket{endpoint="course_detail_page",le="+Inf"}' in text
+    assert 'curso_cache_misses_total{cache="page"}' in text
+
+def test_body_built_during_edit_is_not_cached(client, app_test_data, monkeypatch):
+    """Testa que um corpo montado enquanto o arquivo muda não fica no cache sob o ETag antigo."""
+    from projects.app import lesson_mgr, response_cache
+    lessons_file = app_test_data / 'basic' / 'lessons.json'
+    original_load = lesson_mgr.load_lessons_from_file
+
+    def load_then_edit(*args, **kwargs):
+        lessons = original_load(*args, **kwargs)
+        edited = json.loads(lessons_file.read_text(encoding='utf-8'))
+        edited[0]["title"] = "Editada durante a montagem"
+        lessons_file.write_text(json.dumps(edited), encoding='utf-8')
+        return lessons
+
+    monkeypatch.setattr(lesson_mgr, 'load_lessons_from_file', load_then_edit)
+    size = response_cache.stats()["size"]
+    first = client.get('/api/courses/python-basico/lessons')
+    assert first.status_code == 200 and response_cache.stats()["size"] == size
+    monkeypatch.setattr(lesson_mgr, 'load_lessons_from_file', original_load)
+    second = client.get('/api/courses/python-basico/lessons')
+    assert second.headers['ETag'] != first.headers['ETag'] and "Editada" in second.get_data(as_text=True)
+
+def test_page_rendered_during_edit_is_not_cached(client, app_test_data, monkeypatch):
+    """Testa que uma página renderizada enquanto o arquivo muda não fica em `page_cache`."""
+    from projects.app import lesson_mgr, page_cache
+    lessons_file = app_test_data / 'basic' / 'lessons.json'
+    original_get = lesson_mgr.get_lesson_by_id
+
+    def get_then_edit(*args, **kwargs):
+        result = original_get(*args, **kwargs)
+        edited = json.loads(lessons_file.read_text(encoding='utf-8'))
+        edited[0]["title"] = "Editada durante a renderização"
+        lessons_file.write_text(json.dumps(edited), encoding='utf-8')
+        return result
+
+    monkeypatch.setattr(lesson_mgr, 'get_lesson_by_id', get_then_edit)
+    entries = page_cache.stats()["entries"]
+    assert client.get('/courses/python-basico/lessons/introducao-python').status_code == 200
+    assert page_cache.stats()["entries"] == entries
+    monkeypatch.setattr(lesson_mgr, 'get_lesson_by_id', original_get)
+    assert "Editada durante a renderização" in client.get('/courses/python-basico/lessons/introducao-python').get_data(as_text=True)
+
 def test_execute_code_api(client, app_test_data):
     """Testa a API de execução de código."""
     payload = {
@@ -167,3 +325,286 @@ def test_check_exercise_api(client, app_test_data):
     assert data['success'] == False
     assert 'details' in data
     assert "Curso 'non-existent-course' não encontrado" in data['details']
+
+def test_execute_code_api_reports_usage(client, app_test_data):
+    """Testa que a API de execução retorna as medições de recursos."""
+    response = client.post('/api/execute-code', json={"code": "print('oi')"})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['output_truncated'] is False
+    assert set(data['usage']) == {"wall_time", "cpu_time", "peak_rss_kb"}
+
+def test_execute_code_stream_api(client, app_test_data):
+    """Testa que a API de streaming envia a saída em eventos e termina com o resultado."""
+    response = client.post('/api/execute-code/stream', json={"code": "print('linha 1')\nprint('linha 2')"})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert 'event: stdout\ndata: {"text": "linha 1\\n"}' in body
+    assert 'event: stdout\ndata: {"text": "linha 2\\n"}' in body
+    result = json.loads(body.split("event: result\ndata: ")[1].split("\n\n")[0])
+    assert result['success'] is True
+    assert set(result['usage']) == {"wall_time", "cpu_time", "peak_rss_kb"}
+
+    response = client.post('/api/execute-code/stream', json={})
+    assert response.status_code == 400
+
+def test_static_check_rejects_code_before_execution(client, app_test_data, monkeypatch):
+    """Testa que as APIs rejeitam código inválido sem chegar ao executor."""
+    from projects import code_executor
+
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("o executor não deveria ser chamado")
+    monkeypatch.setattr(code_executor, "execute_code", fail_if_called)
+
+    response = client.post('/api/execute-code', json={"code": "print('oi'"})
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['success'] is False
+    assert data['static_check']['error_type'] == "SyntaxError"
+    assert data['static_check']['line'] == 1
+
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-5", "code": "import subprocess"}
+    data = client.post('/api/check-exercise', json=payload).get_json()
+    assert data['success'] is False
+    assert data['static_check']['error_type'] == "ImportNotAllowed"
+
+def test_execute_code_sheds_load_with_503(client, app_test_data, monkeypatch):
+    """Testa que, com a fila de admissão cheia, a API responde 503 com Retry-After."""
+    from projects import app as app_module
+    from projects.admission import AdmissionController
+
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=0)
+    monkeypatch.setattr(app_module, "admission", controller)
+    slot = controller.acquire("outro-aluno")
+    try:
+        response = client.post('/api/execute-code', json={"code": "print('oi')"})
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+        assert client.get('/api/admission/stats').get_json()['rejected'] == 1
+    finally:
+        slot.release()
+    assert client.post('/api/execute-code', json={"code": "print('oi')"}).status_code == 200
+
+def test_check_exercise_holds_one_admission_slot(client, app_test_data, monkeypatch):
+    """Testa que a correção (código do usuário + test_code) ocupa uma única vaga de admissão."""
+    from projects import app as app_module
+    from projects.admission import AdmissionController
+
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=0)
+    monkeypatch.setattr(app_module, "admission", controller)
+    release = controller._release
+    competitor_slots = []
+
+    def release_to_competitor(slot):
+        # Outro aluno ocupa a vaga assim que ela é liberada, saturando o controlador:
+        # uma segunda admissão no meio da correção seria recusada.
+        release(slot)
+        if not competitor_slots:
+            competitor_slots.append(controller.acquire("outro-aluno"))
+
+    monkeypatch.setattr(controller, "_release", release_to_competitor)
+    app_module.submission_cache.clear() # Garante a execução, sem veredito reaproveitado
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-5", "code": "print('Olá, Python!')"}
+    response = client.post('/api/check-exercise', json=payload)
+    assert response.status_code == 200
+    assert response.get_json()['success'] == True
+    stats = controller.stats()
+    assert stats['admitted'] == 2 # A submissão (uma vez) e o outro aluno, só após o fim da correção
+    assert stats['rejected'] == 0
+
+def test_check_exercise_uses_compiled_test_code_cache(client, app_test_data):
+    """Testa que o test_code compilado é reaproveitado entre submissões."""
+    from projects.exercise_manager import compiled_test_code_cache
+
+    compiled_test_code_cache.clear()
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-5", "code": "print('Olá, Python!')"}
+    for _ in range(3):
+        response = client.post('/api/check-exercise', json=payload)
+        assert response.get_json()['success'] == True
+    stats = compiled_test_code_cache.stats()
+    # O carregamento do arquivo preenche o cache; as verificações só fazem buscas com acerto.
+    assert stats['size'] == 2
+    assert stats['hits'] >= 3
+
+def test_compiled_test_code_primed_on_load_is_hit_when_grading(client, app_test_data):
+    """Testa que a pré-compilação feita ao ler o arquivo (por qualquer rota) é a usada na correção."""
+    from projects.app import course_mgr, exercise_mgr
+    from projects.exercise_manager import compiled_test_code_cache
+
+    compiled_test_code_cache.clear()
+    # Primeira leitura do arquivo pelo caminho das páginas de lição, que não conhece o exercício corrigido.
+    exercise_mgr.load_exercise_summaries(course_mgr.get_course_by_id("python-basico")["exercises_file"])
+    primed = compiled_test_code_cache.stats()
+    assert primed['size'] == 2
+
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-5", "code": "print('Olá, Python!')"}
+    assert client.post('/api/check-exercise', json=payload).get_json()['success'] == True
+    response = client.post('/submit_exercise/python-basico/ex-introducao-1', json={"code": "output = 'Olá, Mundo!'"})
+    assert response.get_json()['success'] == True
+
+    stats = compiled_test_code_cache.stats()
+    assert stats['size'] == primed['size']
+    assert stats['misses'] == primed['misses']
+    assert stats['hits'] == primed['hits'] + 2
+
+def test_submit_exercise_legacy_route(client, app_test_data):
+    """Testa a rota legada de submissão, que executa código do usuário e test_code em sequência."""
+    response = client.post('/submit_exercise/python-basico/ex-introducao-1', json={"code": "output = 'Olá, Mundo!'"})
+    assert response.status_code == 200
+    assert response.get_json()['success'] == True
+
+    response = client.post('/submit_exercise/python-basico/ex-introducao-1', json={"code": "output = 'Tchau'"})
+    data = response.get_json()
+    assert data['success'] == False
+    assert 'AssertionError' in data['details']
+
+def test_check_exercise_reuses_cached_verdict(client, app_test_data):
+    """Testa que submissões determinísticas equivalentes reaproveitam o veredito."""
+    from projects.app import submission_cache
+
+    submission_cache.clear()
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-1", "code": "print('Olá, Mundo!')"}
+    first = client.post('/api/check-exercise', json=payload).get_json()
+    assert first['success'] == True
+    assert first['cached'] == False
+
+    payload["code"] = "# mesma solução\nprint( 'Olá, Mundo!' )\n"
+    second = client.post('/api/check-exercise', json=payload).get_json()
+    assert second['success'] == True
+    assert second['cached'] == True
+    assert second['output'] == first['output']
+
+def test_check_exercise_does_not_cache_input_submissions(client, app_test_data):
+    """Testa que submissões que usam input() são sempre executadas."""
+    from projects.app import submission_cache
+
+    submission_cache.clear()
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-1",
+               "code": "if False:\n    input()\nprint('Olá, Mundo!')"}
+    for _ in range(2):
+        data = client.post('/api/check-exercise', json=payload).get_json()
+        assert data['success'] == True
+        assert data['cached'] == False
+
+def _wait_for_job(client, status_url, timeout=10):
+    """Consulta um job de correção até que ele termine."""
+    import time
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(status_url).get_json()
+        if job['status'] in ('done', 'error'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job não terminou em {timeout}s")
+
+def test_check_exercise_async_polling(client, app_test_data):
+    """Testa a verificação assíncrona com consulta do resultado por polling."""
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-5", "code": "print('Olá, Python!')"}
+    response = client.post('/api/check-exercise/async', json=payload)
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data['status'] == 'queued'
+    assert response.headers['Location'] == data['status_url']
+
+    job = _wait_for_job(client, data['status_url'])
+    assert job['status'] == 'done'
+    assert job['result']['success'] == True
+    assert 'SUCCESS' in job['result']['output']
+
+def test_check_exercise_async_jobs_share_admission_round_robin(client, app_test_data, monkeypatch):
+    """Testa que os jobs assíncronos passam pela admissão e que os de dois clientes são intercalados."""
+    import time
+    from projects import app as app_module, code_executor
+    from projects.admission import AdmissionController
+    from projects.grading_queue import GradingQueue
+
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=10)
+    queue_ = GradingQueue(workers=4)
+    monkeypatch.setattr(app_module, "admission", controller)
+    monkeypatch.setattr(app_module, "grading_queue", queue_)
+    app_module.submission_cache.clear()
+    execute_code = code_executor.execute_code
+    order = []
+
+    def record_user_code(code, *args, **kwargs):
+        if isinstance(code, str):
+            order.append(code.split("#")[-1].strip()) # O cliente, anotado no fim do código
+        return execute_code(code, *args, **kwargs)
+
+    monkeypatch.setattr(code_executor, "execute_code", record_user_code)
+
+    def submit(client_ip, n):
+        payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-5",
+                   "code": f"x = {n}\nprint('Olá, Python!') # {client_ip}"}
+        response = client.post('/api/check-exercise/async', json=payload, environ_base={'REMOTE_ADDR': client_ip})
+        assert response.status_code == 202
+        return response.get_json()['status_url']
+
+    def wait_queued(count):
+        deadline = time.monotonic() + 5
+        while controller.stats()['queued'] < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert controller.stats()['queued'] == count
+
+    slot = controller.acquire("outro-aluno") # Ocupa a única vaga até todos os jobs estarem na fila
+    try:
+        status_urls = [submit("10.0.0.1", n) for n in range(3)]
+        wait_queued(3)
+        status_urls.append(submit("10.0.0.2", 3))
+        wait_queued(4)
+    finally:
+        slot.release()
+    try:
+        for status_url in status_urls:
+            assert _wait_for_job(client, status_url)['result']['success'] == True
+    finally:
+        queue_.shutdown()
+    # O segundo cliente não espera todos os jobs do primeiro.
+    assert order == ["10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.1"]
+    assert controller.stats()['admitted'] == 5
+
+def test_check_exercise_async_events_stream(client, app_test_data):
+    """Testa o acompanhamento de um job de correção via server-sent events."""
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-5", "code": "print('errado')"}
+    data = client.post('/api/check-exercise/async', json=payload).get_json()
+
+    response = client.get(data['events_url'])
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert 'event: result' in body
+    result_line = [line for line in body.splitlines() if line.startswith('data: ')][-1]
+    job = json.loads(result_line[len('data: '):])
+    assert job['status'] == 'done'
+    assert job['result']['success'] == False
+
+def test_check_exercise_async_events_stream_is_time_limited(client, app_test_data, monkeypatch):
+    """Testa que o stream de eventos de um job demorado é encerrado com `retry:` após o tempo máximo."""
+    import threading
+    from projects import app as app_module
+    from projects.grading_queue import GradingQueue
+
+    queue_ = GradingQueue(workers=1)
+    monkeypatch.setattr(app_module, "grading_queue", queue_)
+    monkeypatch.setitem(app_module.app.config, 'GRADING_EVENTS_MAX_SECONDS', 0.2)
+    release = threading.Event()
+    job_id = queue_.submit(lambda: release.wait(5) and {"success": True})
+    try:
+        body = client.get(f'/api/jobs/{job_id}/events').get_data(as_text=True)
+        assert body.endswith('retry: 1000\n\n')
+        assert 'event: result' not in body
+        assert client.get(f'/api/jobs/{job_id}').get_json()['status'] in ('queued', 'running')
+    finally:
+        release.set()
+        queue_.shutdown()
+
+def test_check_exercise_async_errors(client, app_test_data):
+    """Testa que erros de validação são retornados de imediato e jobs desconhecidos dão 404."""
+    response = client.post('/api/check-exercise/async', json={"course_id": "python-basico"})
+    assert response.status_code == 400
+    response = client.post('/api/check-exercise/async',
+                           json={"course_id": "python-basico", "exercise_id": "non-existent-exercise", "code": ""})
+    assert response.status_code == 404
+    assert client.get('/api/jobs/inexistente').status_code == 404
+    assert client.get('/api/jobs/inexistente/events').status_code == 404
@@ -0,0 +1,305 @@
+import time
+import pytest
+import logging
+
+from projects import code_executor
+from projects.code_executor import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def pool():
+    """Fornece um pool pequeno, com timeout curto, encerrado ao final do teste."""
+    worker_pool = WorkerPool(size=1, timeout=1.0)
+    yield worker_pool
+    worker_pool.shutdown()
+
+def test_pool_executes_code_and_captures_output(pool):
+    """Testa a execução de código simples em um processo executor."""
+    result = pool.run("code", "print('Olá, Python!')")
+    assert result["returncode"] == 0
+    assert result["stdout"] == "Olá, Python!\n"
+    assert result["error_type"] is None
+
+def test_pool_receives_execution_globals(pool):
+    """Testa que o escopo global enviado está disponível no processo executor."""
+    result = pool.run("code", "assert output.strip() == 'ok'\nprint('SUCCESS')", {"output": "ok\n"})
+    assert result["returncode"] == 0
+    assert "SUCCESS" in result["stdout"]
+
+def test_pool_reports_exceptions(pool):
+    """Testa que exceções do código do usuário são reportadas no resultado."""
+    result = pool.run("code", "1/0")
+    assert result["returncode"] == 1
+    assert result["error_type"] == "ZeroDivisionError"
+
+def test_pool_timeout_kills_and_respawns_worker(pool):
+    """Testa que um laço infinito é interrompido e o pool continua funcionando."""
+    result = pool.run("code", "while True:\n    pass", timeout=0.5)
+    assert result["returncode"] == 1
+    assert result["error_type"] == "TimeoutError"
+
+    # O processo substituto deve atender a próxima execução normalmente.
+    result = pool.run("code", "print('de volta')")
+    assert result["returncode"] == 0
+    assert result["stdout"] == "de volta\n"
+
+def _wait_for_idle_workers(worker_pool, count, timeout=5.0):
+    """Aguarda até que o pool tenha `count` processos livres (ou o tempo acabe)."""
+    deadline = time.monotonic() + timeout
+    while worker_pool._idle.qsize() < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return worker_pool._idle.qsize()
+
+def test_pool_keeps_its_size_when_spawn_fails(monkeypatch):
+    """Testa que falhas ao criar substitutos são repetidas, sem encolher o pool."""
+    monkeypatch.setattr(code_executor, "SPAWN_RETRY_DELAY", 0.01)
+    worker_pool = WorkerPool(size=1, timeout=1.0, max_tasks_per_worker=1)
+    spawn = worker_pool._spawn
+    failures = []
+
+    def flaky_spawn(ctx=None):
+        if len(failures) < 2:
+            failures.append(ctx)
+            raise OSError("Resource temporarily unavailable")
+        return spawn(ctx)
+
+    monkeypatch.setattr(worker_pool, "_spawn", flaky_spawn)
+    try:
+        # Reciclagem após a execução (em segundo plano).
+        assert worker_pool.run("code", "print('um')")["stdout"] == "um\n"
+        assert _wait_for_idle_workers(worker_pool, 1) == 1
+        assert len(failures) == 2
+
+        # Substituição após o tempo limite (na thread da requisição, depois em segundo plano).
+        failures.clear()
+        assert worker_pool.run("code", "while True:\n    pass", timeout=0.5)["error_type"] == "TimeoutError"
+        assert _wait_for_idle_workers(worker_pool, 1) == 1
+        assert worker_pool.run("code", "print('dois')")["stdout"] == "dois\n"
+    finally:
+        worker_pool.shutdown()
+
+def test_pool_runs_test_code(pool):
+    """Testa a execução de código de teste com falha de asserção."""
+    result = pool.run("test", "assert output == 'esperado', 'saída incorreta'", {"output": "outra"})
+    assert result["returncode"] == 1
+    assert "Teste falhou: saída incorreta" in result["stderr"]
+
+def test_execute_code_inline_when_pool_disabled(monkeypatch):
+    """Testa que pool_size=0 executa o código no próprio processo (com um aviso de que não há limites)."""
+    warnings = []
+    monkeypatch.setattr(code_executor.logger, "warning", warnings.append)
+    code_executor.configure_executor(pool_size=0)
+    assert any("sem tempo limite" in message for message in warnings)
+    try:
+        assert code_executor.get_executor() is None
+        execution_globals = {}
+        result = code_executor.execute_code("x = 21 * 2\nprint(x)", execution_globals)
+        assert result["stdout"] == "42\n"
+        assert execution_globals["x"] == 42
+    finally:
+        code_executor.configure_executor(pool_size=code_executor.DEFAULT_POOL_SIZE)
+
+def test_pool_reports_resource_usage(pool):
+    """Testa que o resultado inclui tempo de parede, tempo de CPU e pico de RSS."""
+    result = pool.run("code", "sum(range(100000))")
+    usage = result["usage"]
+    assert usage["wall_time"] >= 0
+    assert usage["cpu_time"] >= 0
+    assert usage["peak_rss_kb"] > 0
+    assert result["output_truncated"] is False
+
+def test_output_is_truncated_at_limit():
+    """Testa que a saída acima do limite é truncada e sinalizada."""
+    limited_pool = WorkerPool(size=1, timeout=5.0, max_output_chars=100)
+    try:
+        result = limited_pool.run("code", "print('x' * 10000)")
+    finally:
+        limited_pool.shutdown()
+    assert result["returncode"] == 0
+    assert result["output_truncated"] is True
+    assert result["stdout"].startswith("x" * 100)
+    assert "saída truncada" in result["stdout"]
+    assert len(result["stdout"]) < 200
+
+def test_test_code_stderr_truncation_is_reported():
+    """Testa que `output_truncated` também sinaliza a saída de erro truncada do test_code."""
+    limited_pool = WorkerPool(size=1, timeout=5.0, max_output_chars=100)
+    try:
+        result = limited_pool.run("test", "import sys\nsys.stderr.write('x' * 10000)")
+    finally:
+        limited_pool.shutdown()
+    assert result["returncode"] == 0
+    assert result["stdout"] == ""
+    assert result["output_truncated"] is True
+
+def test_memory_limit_raises_memory_error():
+    """Testa que alocações acima do limite de memória falham sem derrubar o pool."""
+    limited_pool = WorkerPool(size=1, timeout=5.0, memory_limit_mb=64)
+    try:
+        result = limited_pool.run("code", "data = 'x' * (512 * 1024 * 1024)")
+        assert result["returncode"] == 1
+        assert result["error_type"] == "MemoryError"
+        assert limited_pool.run("code", "print('ok')")["stdout"] == "ok\n"
+    finally:
+        limited_pool.shutdown()
+
+def test_cpu_time_limit_interrupts_execution():
+    """Testa que o limite de tempo de CPU interrompe o código antes do timeout de parede."""
+    limited_pool = WorkerPool(size=1, timeout=10.0, cpu_time_limit=1)
+    try:
+        code = "try:\n    while True:\n        pass\nexcept Exception:\n    pass"
+        result = limited_pool.run("code", code)
+    finally:
+        limited_pool.shutdown()
+    assert result["returncode"] == 1
+    assert result["error_type"] == "ExecutionLimitExceeded"
+    assert result["usage"]["wall_time"] < 10.0
+
+def test_merge_usage_combines_measurements():
+    """Testa a combinação das medições de duas execuções."""
+    merged = code_executor.merge_usage(
+        {"wall_time": 0.5, "cpu_time": 0.25, "peak_rss_kb": 100},
+        {"wall_time": 0.25, "cpu_time": 0.25, "peak_rss_kb": 300},
+        None,
+    )
+    assert merged == {"wall_time": 0.75, "cpu_time": 0.5, "peak_rss_kb": 300}
+
+def test_thread_capture_isolates_concurrent_executions():
+    """Testa que execuções concorrentes no mesmo processo não misturam suas saídas."""
+    import threading
+
+    code_executor.configure_executor(pool_size=0, capture_mode="thread")
+    results = {}
+
+    def run(n):
+        code = f"import time\nfor _ in range(20):\n    print('thread-{n}')\n    time.sleep(0.001)"
+        results[n] = code_executor.execute_code(code)
+
+    try:
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        code_executor.configure_executor(pool_size=code_executor.DEFAULT_POOL_SIZE)
+
+    for n, result in results.items():
+        assert result["returncode"] == 0
+        assert result["stdout"] == f"thread-{n}\n" * 20
+
+def test_thread_capture_leaves_other_threads_untouched():
+    """Testa que escritas de outras threads continuam indo para o stream original."""
+    import io
+    import sys
+    import threading
+
+    original_stdout = sys.stdout
+    sink = io.StringIO()
+    sys.stdout = sink
+    try:
+        stdout_buffer, stderr_buffer = io.StringIO(), io.StringIO()
+        with code_executor._capture_thread_output(stdout_buffer, stderr_buffer):
+            print("capturado")
+            other = threading.Thread(target=lambda: print("fora"))
+            other.start()
+            other.join()
+    finally:
+        sys.stdout = original_stdout
+    assert stdout_buffer.getvalue() == "capturado\n"
+    assert sink.getvalue() == "fora\n"
+
+def test_pool_executes_compiled_code_objects(pool):
+    """Testa a execução de code objects pré-compilados e de sequências de código."""
+    compiled = compile("assert output == 'ok'\nprint('SUCCESS')", "<test_code>", "exec")
+    result = pool.run("code", compiled, {"output": "ok"})
+    assert result["returncode"] == 0
+    assert result["stdout"] == "SUCCESS\n"
+
+    result = pool.run("code", ["x = 2", compile("print(x * 21)", "<test_code>", "exec")])
+    assert result["stdout"] == "42\n"
+
+def test_pool_streams_output_in_chunks(pool):
+    """Testa que a saída é entregue em pedaços, antes do resultado final."""
+    events = list(pool.stream("code", "import time\nfor i in range(3):\n    print(i)\n    time.sleep(0.01)"))
+    assert events[:3] == [("stdout", "0\n"), ("stdout", "1\n"), ("stdout", "2\n")]
+    event, result = events[-1]
+    assert event == "result"
+    assert result["returncode"] == 0
+    assert result["stdout"] == ""
+
+def test_stream_respects_byte_limit():
+    """Testa que a saída em streaming é truncada no limite de bytes."""
+    limited_pool = WorkerPool(size=1, timeout=5.0, max_stream_bytes=50)
+    try:
+        events = list(limited_pool.stream("code", "for _ in range(1000):\n    print('ç' * 10)"))
+    finally:
+        limited_pool.shutdown()
+    text = "".join(data for event, data in events if event == "stdout")
+    assert "saída truncada" in text
+    assert len(text.split("\n... [")[0].encode("utf-8")) <= 50
+    assert events[-1][1]["output_truncated"] is True
+
+def test_stream_timeout_and_abandoned_stream(pool):
+    """Testa o timeout em streaming e que abandonar o gerador libera o executor."""
+    events = list(pool.stream("code", "print('início')\nwhile True:\n    pass", timeout=0.5))
+    assert events[0] == ("stdout", "início\n")
+    assert events[-1][1]["error_type"] == "TimeoutError"
+
+    stream = pool.stream("code", "print('a')\nwhile True:\n    pass")
+    assert next(stream) == ("stdout", "a\n")
+    stream.close()
+    assert pool.run("code", "print('ok')")["stdout"] == "ok\n"
+
+def test_stream_code_inline_when_pool_disabled():
+    """Testa `stream_code` sem pool, executando em uma thread do próprio processo."""
+    code_executor.configure_executor(pool_size=0)
+    try:
+        events = list(code_executor.stream_code("print('um')\nprint('dois')\n1/0"))
+    finally:
+        code_executor.configure_executor(pool_size=code_executor.DEFAULT_POOL_SIZE)
+    assert events[:2] == [("stdout", "um\n"), ("stdout", "dois\n")]
+    assert events[-1][1]["error_type"] == "ZeroDivisionError"
+
+def test_forkserver_pool_preloads_modules_and_isolates_executions():
+    """Testa o pool 'forkserver': módulos pré-carregados e um processo novo por execução."""
+    forkserver_pool = WorkerPool(size=1, timeout=10.0, start_method="forkserver", preload_modules=("colorsys",))
+    try:
+        assert forkserver_pool.max_tasks_per_worker == 1
+        result = forkserver_pool.run("code", "import sys\nprint('colorsys' in sys.modules)\nimport builtins\nbuiltins.vazou = True")
+        assert result["stdout"] == "True\n"
+        result = forkserver_pool.run("code", "import builtins\nprint(hasattr(builtins, 'vazou'))")
+        assert result["stdout"] == "False\n"
+    finally:
+        forkserver_pool.shutdown()
+
+def test_forkserver_pool_falls_back_when_zygote_fails(monkeypatch):
+    """Testa que, se o zygote do forkserver falha repetidamente, os substitutos são criados sem ele."""
+    monkeypatch.setattr(code_executor, "SPAWN_RETRY_DELAY", 0.01)
+    forkserver_pool = WorkerPool(size=1, timeout=10.0, start_method="forkserver")
+    spawn = forkserver_pool._spawn
+    contexts = []
+
+    def spawn_without_zygote(ctx=None):
+        ctx = ctx or forkserver_pool._ctx
+        contexts.append(ctx.get_start_method())
+        if ctx.get_start_method() == "forkserver":
+            raise EOFError("zygote indisponível")
+        return spawn(ctx)
+
+    monkeypatch.setattr(forkserver_pool, "_spawn", spawn_without_zygote)
+    try:
+        assert forkserver_pool.run("code", "print('antes')")["stdout"] == "antes\n"
+        assert forkserver_pool.run("code", "print('depois')")["stdout"] == "depois\n"
+        assert contexts[:code_executor.SPAWN_FALLBACK_AFTER] == ["forkserver"] * code_executor.SPAWN_FALLBACK_AFTER
+        assert contexts[code_executor.SPAWN_FALLBACK_AFTER] != "forkserver"
+    finally:
+        forkserver_pool.shutdown()
+
+def test_preload_ignores_missing_modules():
+    """Testa que módulos ausentes na lista de pré-carga não impedem a execução."""
+    code_executor._preload_modules(["modulo_que_nao_existe", "colorsys"])
+    import sys
+    assert "colorsys" in sys.modules
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from projects.content_bundle import BundleStorage, BundleValidationError, LazyItems, build_bundle
+from projects.course_manager import CourseManager
+from projects.exercise_manager import ExerciseManager
+from projects.lesson_manager import LessonManager
+from projects.storage import create_storage
+
+def _write_tree(data_dir, courses, lessons, exercises):
+    """Grava uma árvore `data/` com um único curso em `basic/`."""
+    (data_dir / "basic").mkdir(parents=True, exist_ok=True)
+    (data_dir / "courses.json").write_text(json.dumps(courses), encoding="utf-8")
+    (data_dir / "basic" / "lessons.json").write_text(json.dumps(lessons), encoding="utf-8")
+    (data_dir / "basic" / "exercises.json").write_text(json.dumps(exercises), encoding="utf-8")
+
+@pytest.fixture
+def bundle(tmp_path):
+    """Bundle montado a partir de uma árvore `data/` mínima."""
+    courses = [{"id": "python-basico", "name": "Básico", "level": "Básico",
+                "lessons_file": "basic/lessons.json", "exercises_file": "basic/exercises.json"}]
+    lessons = [{"id": "l1", "title": "Um"}, {"id": "l2", "title": "Dois"}]
+    exercises = [
+        {"id": "e2", "lesson_id": "l1", "title": "E2", "level": "básico", "order": 2, "test_code": "assert True"},
+        {"id": "e1", "lesson_id": "l1", "title": "E1", "level": "Básico", "order": 1},
+        {"id": "e3", "lesson_id": "l1", "title": "E3", "level": "avançado", "order": 1},
+    ]
+    _write_tree(tmp_path / "json_data", courses, lessons, exercises)
+    counts = build_bundle(tmp_path / "json_data", tmp_path / "content.bundle")
+    assert (counts["courses"], counts["lessons"], counts["exercises"]) == (1, 2, 3)
+    return BundleStorage(tmp_path / "content.bundle")
+
+def test_managers_read_from_bundle(bundle):
+    """Testa que os managers mantêm suas assinaturas com o bundle."""
+    lesson_mgr = LessonManager(storage=bundle)
+    exercise_mgr = ExerciseManager(storage=bundle)
+    assert [l["id"] for l in lesson_mgr.load_lessons_from_file("basic/lessons.json")] == ["l1", "l2"]
+    lesson, position, lessons = lesson_mgr.get_lesson_by_id("basic/lessons.json", "l2")
+    assert (lesson["title"], position, len(lessons)) == ("Dois", 1, 2)
+    assert lessons[0]["id"] == "l1"
+    assert lesson_mgr.get_lesson_by_id("basic/lessons.json", "x")[:2] == (None, -1)
+    assert exercise_mgr.get_exercise("basic/exercises.json", "e3")["level"] == "avançado"
+    assert exercise_mgr.get_exercise("basic/exercises.json", "x") is None
+    assert [e["id"] for e in exercise_mgr.get_exercises_for_lesson("basic/exercises.json", "l1", level="BÁSICO")] == ["e1", "e2"]
+    assert len(exercise_mgr.load_exercises_from_file("basic/exercises.json")) == 3
+    assert lesson_mgr.load_lessons_from_file("outro/lessons.json") == []
+
+def test_lessons_are_deserialized_on_demand(bundle):
+    """Testa que buscar uma lição deserializa apenas o seu registro."""
+    lesson, _, lessons = bundle.get_lesson("basic/lessons.json", "l2")
+    assert isinstance(lessons, LazyItems)
+    assert lesson["title"] == "Dois"
+    assert len(bundle._memo) == 1
+    assert bundle.get_lesson("basic/lessons.json", "l2")[0] is lesson # Registro já deserializado
+    with pytest.raises(IndexError):
+        lessons[2]
+
+def test_summaries_skip_heavy_fields(bundle):
+    """Testa que os resumos vêm de registros próprios, sem os campos volumosos."""
+    exercise_mgr = ExerciseManager(storage=bundle)
+    assert exercise_mgr.load_exercises_from_file("basic/exercises.json", fields=["id", "order"])[0] == {"id": "e2", "order": 2}
+    assert len(bundle._memo) == 3 # Apenas os três resumos foram deserializados
+    assert "test_code" not in exercise_mgr.load_exercise_summaries("basic/exercises.json")[0]
+
+def test_bundle_is_read_only(bundle, tmp_path):
+    """Testa que alterações no catálogo são recusadas com o bundle."""
+    mgr = CourseManager(data_dir_path_str=str(tmp_path / "unused"), storage=bundle)
+    assert mgr.get_course_by_id("python-basico")["name"] == "Básico"
+    assert mgr.add_course({"id": "novo", "name": "Novo"}) is None
+    assert mgr.update_course("python-basico", {"name": "Outro"}) is None
+    assert [c["name"] for c in mgr.get_courses()] == ["Básico"]
+    assert isinstance(create_storage("bundle", bundle_path=bundle.path), BundleStorage)
+
+def test_build_rejects_invalid_content(tmp_path):
+    """Testa que erros de esquema impedem a gravação e que IDs repetidos são apenas avisos."""
+    data_dir = tmp_path / "json_data"
+    courses = [{"id": "c", "name": "C", "lessons_file": "basic/lessons.json", "exercises_file": "basic/exercises.json"}]
+    _write_tree(data_dir, courses, [{"id": "l1", "title": 1}], [{"id": "e1", "title": "E1"}])
+    with pytest.raises(BundleValidationError) as excinfo:
+        build_bundle(data_dir, tmp_path / "content.bundle")
+    assert sorted(excinfo.value.errors) == ["basic/exercises.json[0].lesson_id: campo obrigatório ausente",
+                                            "basic/lessons.json[0].title: esperava str, obteve int"]
+    assert not (tmp_path / "content.bundle").exists()
+
+    _write_tree(data_dir, courses, [{"id": "l1", "title": "Um"}, {"id": "l1", "title": "Dois"}], [])
+    counts = build_bundle(data_dir, tmp_path / "content.bundle")
+    assert counts["warnings"] == ["basic/lessons.json[1].id: ID 'l1' repetido; vale a primeira ocorrência"]
+    assert BundleStorage(tmp_path / "content.bundle").get_lesson("basic/lessons.json", "l1")[0]["title"] == "Um"
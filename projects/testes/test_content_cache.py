@@ -0,0 +1,93 @@
+import json
+import os
+
+from projects.content_cache import ContentCache, index_by_id
+
+def _parse_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _write(path, data, mtime_ns=None):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_unchanged_file_is_served_from_cache(tmp_path):
+    """Testa que um arquivo inalterado é interpretado uma única vez."""
+    cache = ContentCache()
+    path = tmp_path / "lessons.json"
+    _write(path, [{"id": "l1"}])
+    calls = []
+    parser = lambda p: calls.append(p) or _parse_json(p)
+
+    first = cache.load(path, parser)
+    second = cache.load(path, parser)
+    assert first == [{"id": "l1"}]
+    assert second is first
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+def test_modified_file_is_parsed_again(tmp_path):
+    """Testa que uma alteração no arquivo (mtime/tamanho) invalida a entrada."""
+    cache = ContentCache()
+    path = tmp_path / "exercises.json"
+    _write(path, [{"id": "e1"}], mtime_ns=1_000_000_000)
+    primed = []
+    assert cache.load(path, _parse_json, on_parse=primed.append) == [{"id": "e1"}]
+
+    _write(path, [{"id": "e2"}], mtime_ns=2_000_000_000) # Mesmo tamanho, mtime diferente
+    assert cache.load(path, _parse_json, on_parse=primed.append) == [{"id": "e2"}]
+    assert primed == [[{"id": "e1"}], [{"id": "e2"}]]
+    assert cache.stats()["invalidations"] == 1
+
+def test_missing_file_returns_none(tmp_path):
+    """Testa que um arquivo inexistente (ou removido) não fica em cache."""
+    cache = ContentCache()
+    path = tmp_path / "lessons.json"
+    assert cache.load(path, _parse_json) is None
+    _write(path, [])
+    assert cache.load(path, _parse_json) == []
+    path.unlink()
+    assert cache.load(path, _parse_json) is None
+
+def test_bounds_evict_least_recently_used(tmp_path):
+    """Testa o descarte por número de entradas e por bytes."""
+    cache = ContentCache(max_entries=2)
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.json"
+        _write(path, [name])
+        paths.append(path)
+    cache.load(paths[0], _parse_json)
+    cache.load(paths[1], _parse_json)
+    cache.load(paths[0], _parse_json) # "a" passa a ser o mais recente
+    cache.load(paths[2], _parse_json)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    cache.load(paths[0], _parse_json)
+    assert cache.stats()["hits"] == 2 # "a" continuou em cache; "b" foi descartado
+
+    cache.configure(max_bytes=paths[0].stat().st_size)
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] <= paths[0].stat().st_size
+
+def test_derived_index_is_built_once_per_parse(tmp_path):
+    """Testa que a estrutura derivada é reaproveitada e reconstruída quando o arquivo muda."""
+    cache = ContentCache()
+    path = tmp_path / "lessons.json"
+    _write(path, [{"id": "a"}, {"id": 2}, {"id": "a"}], mtime_ns=1_000_000_000)
+    builds = []
+    builder = lambda items: builds.append(items) or index_by_id(items)
+
+    lessons, index = cache.load_derived(path, _parse_json, builder)
+    assert index["a"] == (lessons[0], 0) # Primeira ocorrência prevalece
+    assert index["2"] == (lessons[1], 1)
+    assert cache.load_derived(path, _parse_json, builder)[1] is index
+    assert len(builds) == 1
+
+    _write(path, [{"id": "b"}], mtime_ns=2_000_000_000)
+    _, index = cache.load_derived(path, _parse_json, builder)
+    assert list(index) == ["b"]
+    assert len(builds) == 2
+    assert cache.load_derived(tmp_path / "missing.json", _parse_json, builder) == (None, None)
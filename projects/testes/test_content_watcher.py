@@ -0,0 +1,54 @@
+import json
+import os
+
+from projects.content_cache import ContentCache, index_by_id
+from projects.content_watcher import ContentWatcher
+
+def _parse_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _write(path, data, mtime_ns):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_check_reports_created_modified_and_removed_files(tmp_path):
+    """Testa a detecção de arquivos JSON criados, alterados e removidos."""
+    (tmp_path / "basic").mkdir()
+    lessons = tmp_path / "basic" / "lessons.json"
+    _write(lessons, [], 1_000_000_000)
+    notified = []
+    watcher = ContentWatcher(tmp_path, notified.append, use_inotify=False)
+    assert watcher.check() == []
+
+    _write(lessons, [{"id": "a"}], 2_000_000_000)
+    exercises = tmp_path / "basic" / "exercises.json"
+    _write(exercises, [], 1_000_000_000)
+    (tmp_path / "notas.txt").write_text("ignorado")
+    assert watcher.check() == sorted([str(lessons), str(exercises)])
+
+    lessons.unlink()
+    assert watcher.check() == [str(lessons)]
+    assert len(notified) == 2
+
+def test_watched_files_are_refreshed_without_stat(tmp_path):
+    """Testa que arquivos sob um diretório acompanhado só mudam no cache via `refresh`."""
+    cache = ContentCache()
+    cache.watch(tmp_path)
+    path = tmp_path / "lessons.json"
+    _write(path, [{"id": "a"}], 1_000_000_000)
+    lessons, index = cache.load_derived(path, _parse_json, index_by_id)
+
+    _write(path, [{"id": "b"}], 2_000_000_000)
+    assert cache.load(path, _parse_json) is lessons # Sem stat: versão anterior até o refresh
+
+    watcher = ContentWatcher(tmp_path, lambda paths: [cache.refresh(p) for p in paths], use_inotify=False)
+    watcher._snapshot = {str(path): None} # Força a detecção da alteração
+    watcher.check()
+    lessons, index = cache.load_derived(path, _parse_json, index_by_id)
+    assert lessons == [{"id": "b"}]
+    assert list(index) == ["b"] # Estrutura derivada reconstruída junto
+
+    path.unlink()
+    assert cache.refresh(path) == 0
+    assert cache.load(path, _parse_json) is None
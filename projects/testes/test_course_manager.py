@@ -0,0 +1,137 @@
+import os
+import json
+import stat
+import threading
+
+from projects.course_manager import CourseManager
+
+def _make_manager(tmp_path, courses):
+    data_dir = tmp_path / "course_data"
+    data_dir.mkdir()
+    (data_dir / "courses.json").write_text(json.dumps(courses), encoding="utf-8")
+    # Um caminho absoluto substitui a pasta 'projects' como base (Path / absoluto).
+    return CourseManager(data_dir_path_str=str(data_dir))
+
+def test_index_follows_add_update_and_delete(tmp_path):
+    """Testa que o índice por ID acompanha inclusão, atualização e remoção de cursos."""
+    mgr = _make_manager(tmp_path, [{"id": "a", "name": "A"}, {"id": 2, "name": "B"}])
+    assert mgr.get_course_by_id("a")["name"] == "A"
+    assert mgr.get_course_by_id("2")["name"] == "B" # IDs comparados como strings
+
+    added = mgr.add_course({"id": "c", "name": "C"})
+    assert mgr.get_course_by_id("c") is added
+    assert mgr.add_course({"id": "c", "name": "Duplicado"}) is None
+
+    mgr.update_course("c", {"name": "C2"})
+    assert mgr.get_course_by_id("c")["name"] == "C2"
+    assert mgr.get_course_by_id("c")["lessons_file"] == "c/lessons.json"
+
+    assert mgr.delete_course("a")
+    assert mgr.get_course_by_id("a") is None
+    assert [c["id"] for c in mgr.get_courses()] == [2, "c"]
+
+def test_assigning_courses_rebuilds_index(tmp_path):
+    """Testa que atribuir uma nova lista a `courses` reconstrói o índice."""
+    mgr = _make_manager(tmp_path, [{"id": "a"}])
+    mgr.courses = [{"id": "b"}]
+    assert mgr.get_course_by_id("a") is None
+    assert mgr.get_course_by_id("b") == {"id": "b"}
+
+def test_reload_swaps_courses_and_keeps_them_on_invalid_file(tmp_path):
+    """Testa a recarga de `courses.json` e que um arquivo inválido não apaga o catálogo."""
+    mgr = _make_manager(tmp_path, [{"id": "a"}])
+    mgr.courses_file.write_text(json.dumps([{"id": "b"}]), encoding="utf-8")
+    assert mgr.reload()
+    assert mgr.get_course_by_id("b") == {"id": "b"}
+
+    mgr.courses_file.write_text('[{"id": "c"', encoding="utf-8") # Salvo pela metade
+    assert not mgr.reload()
+    assert mgr.get_course_by_id("b") == {"id": "b"}
+
+def test_save_keeps_file_permissions(tmp_path):
+    """Testa que a gravação atômica mantém as permissões de courses.json e cria courses.version legível."""
+    mgr = _make_manager(tmp_path, [{"id": "a"}])
+    os.chmod(mgr.courses_file, 0o640)
+    previous_umask = os.umask(0o022)
+    try:
+        mgr.add_course({"id": "b"})
+    finally:
+        os.umask(previous_umask)
+    assert stat.S_IMODE(os.stat(mgr.courses_file).st_mode) == 0o640
+    assert stat.S_IMODE(os.stat(mgr.version_file).st_mode) == 0o644
+
+def test_reload_waits_for_writers_and_resets_version(tmp_path):
+    """Testa que a recarga espera as alterações em andamento e atualiza a versão junto com os cursos."""
+    mgr = _make_manager(tmp_path, [{"id": "a"}])
+    other = CourseManager(data_dir_path_str=str(mgr.courses_file.parent))
+    other.add_course({"id": "b"}) # Grava courses.json e incrementa courses.version
+    results = []
+    with mgr._write_lock:
+        reloader = threading.Thread(target=lambda: results.append(mgr.reload()))
+        reloader.start()
+        reloader.join(0.2)
+        assert reloader.is_alive() # Bloqueada enquanto outra thread altera o catálogo
+    reloader.join(5)
+    assert results == [True]
+    assert [c["id"] for c in mgr.get_courses()] == ["a", "b"]
+    assert mgr.version == other.version == 1
+    assert mgr._version_signature == mgr._version_file_signature()
+
+def test_bulk_writes_courses_file_once(tmp_path, monkeypatch):
+    """Testa que `bulk()` agrupa as alterações em uma única gravação atômica."""
+    from projects import course_manager
+    mgr = _make_manager(tmp_path, [])
+    writes = []
+    original = course_manager.atomic_write_text
+    monkeypatch.setattr(course_manager, "atomic_write_text", lambda path, text: writes.append(path) or original(path, text))
+
+    with mgr.bulk():
+        for i in range(5):
+            mgr.add_course({"id": f"c{i}"})
+        assert json.loads(mgr.courses_file.read_text(encoding="utf-8")) == [] # Ainda não gravado
+    assert writes.count(mgr.courses_file) == 1
+    assert [c["id"] for c in json.loads(mgr.courses_file.read_text(encoding="utf-8"))] == [f"c{i}" for i in range(5)]
+    assert not [p for p in mgr.data_dir.iterdir() if p.name.endswith(".tmp")] # Sem temporários esquecidos
+
+def test_write_behind_coalesces_until_flush(tmp_path):
+    """Testa que o modo write-behind adia a gravação e `flush` a conclui."""
+    data_dir = tmp_path / "course_data"
+    data_dir.mkdir()
+    (data_dir / "courses.json").write_text("[]", encoding="utf-8")
+    mgr = CourseManager(data_dir_path_str=str(data_dir), write_behind_delay=60)
+    mgr.add_course({"id": "a"})
+    mgr.update_course("a", {"name": "A"})
+    assert mgr.reload() is False # Alterações pendentes não são descartadas pela recarga
+    assert json.loads(mgr.courses_file.read_text(encoding="utf-8")) == []
+    assert mgr.flush()
+    assert json.loads(mgr.courses_file.read_text(encoding="utf-8"))[0]["name"] == "A"
+
+def test_concurrent_managers_do_not_lose_each_others_changes(tmp_path):
+    """Testa que dois processos (aqui, duas instâncias) não sobrescrevem as alterações um do outro."""
+    first = _make_manager(tmp_path, [{"id": "a"}])
+    second = CourseManager(data_dir_path_str=str(first.data_dir))
+
+    first.add_course({"id": "b"})
+    assert first.version == 1
+    second.add_course({"id": "c"}) # Cópia desatualizada: recarrega antes de gravar
+    assert second.version == 2
+    assert [c["id"] for c in json.loads(first.courses_file.read_text(encoding="utf-8"))] == ["a", "b", "c"]
+
+    # A cópia do primeiro é atualizada na próxima leitura, sem recarga a cada requisição.
+    assert first.get_course_by_id("c") == {"id": "c", "lessons_file": "c/lessons.json", "exercises_file": "c/exercises.json"}
+    assert first.version == 2
+    assert first.add_course({"id": "c"}) is None
+
+def test_pending_changes_are_replayed_over_newer_version(tmp_path):
+    """Testa que alterações pendentes (write-behind) são reaplicadas sobre a versão mais nova."""
+    first = _make_manager(tmp_path, [{"id": "a", "name": "A"}])
+    second = CourseManager(data_dir_path_str=str(first.data_dir), write_behind_delay=60)
+    second.update_course("a", {"name": "A2"})
+    second.add_course({"id": "dup"})
+    first.add_course({"id": "dup"}) # Grava antes do flush do segundo
+    first.add_course({"id": "x"})
+
+    assert second.flush()
+    saved = json.loads(first.courses_file.read_text(encoding="utf-8"))
+    assert [(c["id"], c.get("name")) for c in saved] == [("a", "A2"), ("dup", None), ("x", None)]
+    assert second.version == 3
@@ -1,3 +1,4 @@
+import json
 from flask import Flask
 import pytest
 import logging # Para logs de teste
@@ -113,3 +114,21 @@ def test_get_exercise_by_id_non_existent(exercise_manager_test_data):
     assert exercise is None
 
 # O teste test_add_duplicate_exercise_id foi removido pois add_exercise não existe mais.
+
+def test_get_exercises_for_lesson_filters_by_level_and_sorts_by_order(tmp_path, monkeypatch):
+    """Testa o índice lição -> exercícios, filtrado por nível e ordenado por `order`."""
+    from projects import exercise_manager
+    (tmp_path / 'curso').mkdir()
+    exercises = [
+        {"id": "e3", "lesson_id": "l1", "level": "Básico", "order": 3},
+        {"id": "e1", "lesson_id": "l1", "level": "básico", "order": 1},
+        {"id": "e2", "lesson_id": "l1", "level": "Avançado", "order": 2},
+        {"id": "e4", "lesson_id": "l2", "level": "Básico", "order": 1},
+    ]
+    (tmp_path / 'curso' / 'exercises.json').write_text(json.dumps(exercises), encoding='utf-8')
+    monkeypatch.setattr(exercise_manager, 'DATA_DIR', tmp_path)
+    mgr = exercise_manager.ExerciseManager()
+
+    assert [ex["id"] for ex in mgr.get_exercises_for_lesson('curso/exercises.json', 'l1', level='BÁSICO')] == ["e1", "e3"]
+    assert [ex["id"] for ex in mgr.get_exercises_for_lesson('curso/exercises.json', 'l1')] == ["e1", "e2", "e3"]
+    assert mgr.get_exercises_for_lesson('curso/exercises.json', 'l9', level='Básico') == []
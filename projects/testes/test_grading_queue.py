@@ -0,0 +1,57 @@
+import threading
+import pytest
+
+from projects.grading_queue import GradingQueue, JobFailed, QueueFullError
+
+def test_job_result_and_wait():
+    """Testa que um job concluído tem seu resultado disponível para consulta."""
+    grading_queue = GradingQueue(workers=1)
+    job_id = grading_queue.submit(lambda a, b: {"soma": a + b}, 2, 3)
+    job, version = grading_queue.wait(job_id)
+    while job["status"] not in ("done", "error"):
+        job, version = grading_queue.wait(job_id, version, timeout=5)
+    assert job["status"] == "done"
+    assert job["result"] == {"soma": 5}
+    grading_queue.shutdown()
+
+def test_job_error_is_reported():
+    """Testa que uma exceção na correção resulta em status 'error'."""
+    grading_queue = GradingQueue(workers=1)
+    job_id = grading_queue.submit(lambda: 1 / 0)
+    job, version = grading_queue.wait(job_id)
+    while job["status"] not in ("done", "error"):
+        job, version = grading_queue.wait(job_id, version, timeout=5)
+    assert job["status"] == "error"
+    assert "division by zero" in job["error"]
+    grading_queue.shutdown()
+
+def test_job_failed_reports_its_message():
+    """Testa que `JobFailed` encerra o job com status 'error' e a própria mensagem."""
+    def reject():
+        raise JobFailed("Servidor ocupado.")
+
+    grading_queue = GradingQueue(workers=1)
+    job_id = grading_queue.submit(reject)
+    job, version = grading_queue.wait(job_id)
+    while job["status"] not in ("done", "error"):
+        job, version = grading_queue.wait(job_id, version, timeout=5)
+    assert job["status"] == "error"
+    assert job["error"] == "Servidor ocupado."
+    grading_queue.shutdown()
+
+def test_queue_full_rejects_new_jobs():
+    """Testa que a fila recusa jobs além de max_pending."""
+    release = threading.Event()
+    grading_queue = GradingQueue(workers=1, max_pending=2)
+    grading_queue.submit(release.wait)
+    grading_queue.submit(release.wait)
+    with pytest.raises(QueueFullError):
+        grading_queue.submit(release.wait)
+    release.set()
+    grading_queue.shutdown()
+
+def test_unknown_job_returns_none():
+    """Testa a consulta de um job inexistente."""
+    grading_queue = GradingQueue(workers=1)
+    assert grading_queue.get("nao-existe") is None
+    assert grading_queue.wait("nao-existe", timeout=0.01) == (None, -1)
@@ -0,0 +1,55 @@
+import os
+import json
+
+from projects.metrics import Registry
+
+def _sample(text, line_start):
+    """Retorna o valor da primeira amostra cuja linha começa com `line_start`."""
+    return next(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(line_start))
+
+def test_histogram_and_counter_exposition():
+    """Testa o formato texto dos contadores, histogramas e da taxa de acertos dos caches."""
+    registry = Registry()
+    requests = registry.counter("t_requests_total", "Requisições.", ("endpoint", "status"))
+    latency = registry.histogram("t_latency_seconds", "Latência.", ("endpoint",), buckets=(0.1, 1.0))
+    requests.inc("home", "200")
+    requests.inc("home", "200")
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "home")
+
+    class FakeCache:
+        def stats(self):
+            return {"hits": 3, "misses": 1}
+    registry.caches.register("content", FakeCache())
+
+    text = registry.render()
+    assert "# TYPE t_latency_seconds histogram" in text
+    assert _sample(text, 't_requests_total{endpoint="home",status="200"}') == 2
+    assert _sample(text, 't_latency_seconds_bucket{endpoint="home",le="0.1"}') == 1
+    assert _sample(text, 't_latency_seconds_bucket{endpoint="home",le="1.0"}') == 2
+    assert _sample(text, 't_latency_seconds_bucket{endpoint="home",le="+Inf"}') == 3
+    assert _sample(text, 't_latency_seconds_sum{endpoint="home"}') == 5.55
+    assert _sample(text, 'curso_cache_hit_ratio{cache="content"}') == 0.75
+
+def test_values_are_summed_across_processes(tmp_path):
+    """Testa a soma dos retratos gravados por outros processos no diretório compartilhado."""
+    registry = Registry()
+    registry.configure(directory=tmp_path / "metrics")
+    requests = registry.counter("t_requests_total", "Requisições.", ("endpoint",))
+    latency = registry.histogram("t_latency_seconds", "Latência.", ("endpoint",), buckets=(0.1,))
+    requests.inc("home")
+    latency.observe(0.05, "home")
+    # Retrato de outro processo, com uma rota que este processo não atendeu.
+    other = registry.snapshot()
+    other["t_requests_total"]["values"] = [[["home"], 4], [["courses"], 1]]
+    (tmp_path / "metrics" / "metrics-1.json").write_text(json.dumps(other), encoding="utf-8")
+    (tmp_path / "metrics" / "metrics-2.json").write_text("{", encoding="utf-8") # Ignorado
+
+    text = registry.render()
+    assert _sample(text, 't_requests_total{endpoint="home"}') == 5
+    assert _sample(text, 't_requests_total{endpoint="courses"}') == 1
+    assert _sample(text, 't_latency_seconds_count{endpoint="home"}') == 2
+
+    registry.flush()
+    own = json.loads((tmp_path / "metrics" / f"metrics-{os.getpid()}.json").read_text(encoding="utf-8"))
+    assert own["t_requests_total"]["values"] == [[["home"], 1]]
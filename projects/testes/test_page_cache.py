@@ -0,0 +1,39 @@
+from flask import Flask, render_template_string, session
+
+from projects.page_cache import PageCache, bypass
+
+def test_pages_are_evicted_by_count_and_bytes():
+    """Testa o descarte LRU pelos limites de páginas e de bytes."""
+    app = Flask(__name__)
+    cache = PageCache(max_entries=2, max_bytes=10)
+    with app.test_request_context("/"):
+        assert cache.put("a", "aaaa") == b"aaaa"
+        cache.put("b", "bbbb")
+        assert cache.get("a") == b"aaaa" # "a" passa a ser a mais recente
+        cache.put("c", "cccc")
+        assert cache.get("b") is None
+        cache.put("d", "dddddd") # 4 + 4 + 6 bytes excede o limite
+        assert cache.get("a") is None and cache.get("c") == b"cccc"
+        assert cache.put("e", "x" * 11) == b"x" * 11 # Maior que o limite: não armazenada
+        assert cache.get("e") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 10, 2)
+
+def test_personalized_pages_are_not_stored():
+    """Testa que páginas que leem a sessão ou chamam `bypass` não são armazenadas."""
+    app = Flask(__name__)
+    app.secret_key = "teste"
+    cache = PageCache()
+    with app.test_request_context("/"):
+        cache.put("anonima", render_template_string("<p>Olá</p>"))
+    with app.test_request_context("/"):
+        cache.put("usuario", render_template_string("<p>Olá {{ session.get('nome', '') }}</p>"))
+    with app.test_request_context("/"):
+        session.get("nome") # Lida pela view
+        cache.put("view", "<p>Olá</p>")
+    with app.test_request_context("/"):
+        bypass()
+        cache.put("marcada", "<p>Olá</p>")
+    assert cache.get("anonima") == "<p>Olá</p>".encode("utf-8")
+    assert cache.get("usuario") is None and cache.get("view") is None and cache.get("marcada") is None
+    assert cache.stats()["bypasses"] == 3
@@ -0,0 +1,50 @@
+import gzip
+
+from flask import Flask, jsonify
+from werkzeug.datastructures import Accept
+
+from projects.response_cache import CachedBody, ResponseCache, negotiate_encoding
+
+def test_negotiate_encoding_follows_accept_encoding():
+    """Testa a escolha da codificação pelo cabeçalho Accept-Encoding."""
+    assert negotiate_encoding(Accept()) == "identity"
+    assert negotiate_encoding(Accept([("gzip", 1), ("deflate", 1)])) == "gzip"
+    assert negotiate_encoding(Accept([("gzip", 0), ("identity", 1)])) == "identity"
+
+def test_cached_body_keeps_compressed_variants():
+    """Testa que as variantes comprimidas correspondem ao corpo original."""
+    body = b'[{"id": "l1"}]' * 100
+    cached = CachedBody(body, "application/json")
+    assert gzip.decompress(cached.body("gzip")) == body
+    assert cached.body("identity") == body
+    assert cached.body("zstd") == body # Codificação indisponível: sem compressão
+
+def test_response_is_built_once_per_key():
+    """Testa que a resposta é serializada apenas na primeira vez para cada chave."""
+    app = Flask(__name__)
+    cache = ResponseCache(maxsize=4)
+    calls = []
+
+    def build():
+        calls.append(1)
+        response = jsonify([1, 2, 3])
+        response.headers["X-Total-Count"] = "3"
+        return response
+
+    with app.app_context():
+        first = cache.get_or_build(("lessons", "etag-1"), build)
+        assert cache.get_or_build(("lessons", "etag-1"), build) is first
+        cache.get_or_build(("lessons", "etag-2"), build)
+    assert len(calls) == 2
+    assert ("X-Total-Count", "3") in first.headers
+    assert cache.stats()["hits"] == 1
+
+def test_body_is_not_stored_if_content_changed_while_building():
+    """Testa que o corpo montado durante uma mudança do conteúdo é servido, mas não armazenado."""
+    app = Flask(__name__)
+    cache = ResponseCache(maxsize=4)
+    with app.app_context():
+        stale = cache.get_or_build(("lessons", "etag-1"), lambda: jsonify([1]), is_current=lambda: False)
+        fresh = cache.get_or_build(("lessons", "etag-1"), lambda: jsonify([2]), is_current=lambda: True)
+    assert stale.body("identity") != fresh.body("identity")
+    assert cache.stats()["size"] == 1
@@ -0,0 +1,47 @@
+import pytest
+
+from projects.static_checker import StaticChecker, format_issue
+
+@pytest.fixture
+def checker():
+    return StaticChecker(max_nesting_depth=5)
+
+def test_valid_code_passes(checker):
+    """Testa que código válido, com importações permitidas, passa pela verificação."""
+    assert checker.check("import math\nfrom collections import Counter\nprint(math.pi)") is None
+
+def test_syntax_error_reports_line_and_column(checker):
+    """Testa que erros de sintaxe são reportados com linha e coluna."""
+    issue = checker.check("x = 1\nprint('oi'")
+    assert issue["error_type"] == "SyntaxError"
+    assert issue["line"] == 2
+    assert issue["col"] == 6
+    assert "linha 2" in format_issue(issue)
+
+@pytest.mark.parametrize("code", [
+    "import subprocess",
+    "from socket import socket",
+    "import os, ctypes",
+    "__import__('signal')",
+    "mod = 'os'\n__import__(mod)",
+])
+def test_disallowed_imports_are_rejected(checker, code):
+    """Testa a rejeição de importações fora da lista permitida."""
+    assert checker.check(code)["error_type"] == "ImportNotAllowed"
+
+def test_deep_nesting_is_rejected(checker):
+    """Testa a rejeição de blocos aninhados além do limite."""
+    code = "\n".join("    " * level + "if True:" for level in range(6)) + "\n" + "    " * 6 + "pass"
+    assert checker.check(code)["error_type"] == "NestingTooDeep"
+
+@pytest.mark.parametrize("code, rejected", [
+    ("while True:\n    pass", True),
+    ("while 1:\n    for i in range(3):\n        break", True),
+    ("while True:\n    if input() == 'q':\n        break", False),
+    ("while True:\n    raise SystemExit", False),
+    ("def worker():\n    while True:\n        pass", False),
+])
+def test_obvious_infinite_loops_are_flagged(checker, code, rejected):
+    """Testa a detecção de laços infinitos no nível do módulo."""
+    issue = checker.check(code)
+    assert (issue is not None and issue["error_type"] == "InfiniteLoop") == rejected
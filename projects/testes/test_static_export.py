@@ -0,0 +1,59 @@
+import os
+import stat
+import gzip
+import json
+
+from projects.app import TEMPLATES_SIGNATURE, course_mgr, exercise_mgr, lesson_mgr
+from projects.static_export import MANIFEST_NAME, export_site
+
+def _export(app, output_dir, full=False):
+    return export_site(app, output_dir, course_mgr, lesson_mgr, exercise_mgr,
+                       templates_signature=TEMPLATES_SIGNATURE, full=full)
+
+def test_export_writes_pages_and_apis(app, client, tmp_path):
+    """Testa que as páginas e APIs exportadas são iguais às servidas pela aplicação."""
+    site = tmp_path / "site"
+    counts = _export(app, site)
+    assert counts["failed"] == 0 and counts["written"] > 0
+    lesson_page = site / "courses" / "python-basico" / "lessons" / "introducao-python" / "index.html"
+    assert lesson_page.read_bytes() == client.get('/courses/python-basico/lessons/introducao-python').data
+    assert gzip.decompress((site / "index.html.gz").read_bytes()) == (site / "index.html").read_bytes()
+    exercises = json.loads((site / "api" / "courses" / "python-basico" / "exercises.json").read_text(encoding="utf-8"))
+    assert sorted(e["id"] for e in exercises) == ["ex-introducao-1", "ex-introducao-5"]
+    assert (site / "courses" / "index.html").is_file() and (site / "static").is_dir()
+    assert json.loads((site / MANIFEST_NAME).read_text(encoding="utf-8"))
+
+def test_export_rebuilds_only_changed_lessons(app, app_test_data, tmp_path):
+    """Testa a reconstrução incremental e a remoção de lições apagadas."""
+    site = tmp_path / "site"
+    first = _export(app, site)
+    assert _export(app, site)["written"] == 0
+
+    lessons_file = app_test_data / "basic" / "lessons.json"
+    lessons = json.loads(lessons_file.read_text(encoding="utf-8"))
+    lessons.append({"id": "variaveis", "title": "Variáveis", "content": "x = 1"})
+    lessons_file.write_text(json.dumps(lessons), encoding="utf-8")
+    counts = _export(app, site)
+    # A nova lição, a lição anterior (ganhou "próxima lição"), a página do curso e a API de lições.
+    assert (counts["written"], counts["removed"]) == (4, 0)
+    assert "Variáveis" in (site / "courses" / "python-basico" / "lessons" / "variaveis" / "index.html").read_text(encoding="utf-8")
+
+    lessons_file.write_text(json.dumps(lessons[:1]), encoding="utf-8")
+    counts = _export(app, site)
+    assert counts["removed"] == 1
+    assert not (site / "courses" / "python-basico" / "lessons" / "variaveis" / "index.html").exists()
+    assert _export(app, site, full=True)["written"] == first["written"]
+
+def test_exported_files_are_readable_by_other_users(app, tmp_path):
+    """Testa que os arquivos exportados podem ser lidos pelo servidor web (grupo e outros)."""
+    site = tmp_path / "site"
+    previous_umask = os.umask(0o022)
+    try:
+        _export(app, site)
+        _export(app, site, full=True) # Regravação sobre os arquivos existentes
+    finally:
+        os.umask(previous_umask)
+    exported = [path for path in site.rglob("*") if path.is_file() and "static" not in path.relative_to(site).parts]
+    assert any(path.suffix == ".gz" for path in exported) and any(path.name == MANIFEST_NAME for path in exported)
+    for path in exported:
+        assert stat.S_IMODE(path.stat().st_mode) & 0o044 == 0o044, path
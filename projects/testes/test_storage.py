@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from projects.course_manager import CourseManager
+from projects.exercise_manager import ExerciseManager
+from projects.lesson_manager import LessonManager
+from projects.storage import SQLiteStorage, create_storage
+
+@pytest.fixture
+def storage(tmp_path):
+    """Banco SQLite importado de uma árvore `data/` mínima."""
+    data_dir = tmp_path / "json_data"
+    (data_dir / "basic").mkdir(parents=True)
+    courses = [{"id": "python-basico", "name": "Básico", "level": "Básico",
+                "lessons_file": "basic/lessons.json", "exercises_file": "basic/exercises.json"}]
+    lessons = [{"id": "l1", "title": "Um"}, {"id": "l2", "title": "Dois"}]
+    exercises = [
+        {"id": "e2", "lesson_id": "l1", "level": "básico", "order": 2},
+        {"id": "e1", "lesson_id": "l1", "level": "Básico", "order": 1},
+        {"id": "e3", "lesson_id": "l1", "level": "avançado", "order": 1},
+    ]
+    (data_dir / "courses.json").write_text(json.dumps(courses), encoding="utf-8")
+    (data_dir / "basic" / "lessons.json").write_text(json.dumps(lessons), encoding="utf-8")
+    (data_dir / "basic" / "exercises.json").write_text(json.dumps(exercises), encoding="utf-8")
+    storage = SQLiteStorage(tmp_path / "content.sqlite3")
+    assert storage.import_data_dir(data_dir) == {"courses": 1, "lessons": 2, "exercises": 3}
+    return storage
+
+def test_managers_read_from_sqlite(storage):
+    """Testa que os managers mantêm suas assinaturas com o backend SQLite."""
+    lesson_mgr = LessonManager(storage=storage)
+    exercise_mgr = ExerciseManager(storage=storage)
+    assert [l["id"] for l in lesson_mgr.load_lessons_from_file("basic/lessons.json")] == ["l1", "l2"]
+    lesson, position, lessons = lesson_mgr.get_lesson_by_id("basic/lessons.json", "l2")
+    assert (lesson["title"], position, len(lessons)) == ("Dois", 1, 2)
+    assert lesson_mgr.get_lesson_by_id("basic/lessons.json", "x")[:2] == (None, -1)
+    assert exercise_mgr.get_exercise("basic/exercises.json", "e3")["level"] == "avançado"
+    assert exercise_mgr.get_exercise("basic/exercises.json", "x") is None
+    assert [e["id"] for e in exercise_mgr.get_exercises_for_lesson("basic/exercises.json", "l1", level="BÁSICO")] == ["e1", "e2"]
+    assert len(exercise_mgr.load_exercises_from_file("basic/exercises.json")) == 3
+    assert lesson_mgr.load_lessons_from_file("basic/lessons.json", fields=["title"]) == [{"title": "Um"}, {"title": "Dois"}]
+
+def test_course_changes_write_single_rows(storage, tmp_path):
+    """Testa inclusão, alteração e remoção de cursos persistidas no banco."""
+    mgr = CourseManager(data_dir_path_str=str(tmp_path / "unused"), storage=storage)
+    assert mgr.get_course_by_id("python-basico")["name"] == "Básico"
+    mgr.add_course({"id": "novo", "name": "Novo"})
+    mgr.update_course("python-basico", {"name": "Básico 2"})
+    assert not (tmp_path / "unused" / "novo").exists() # Nenhum arquivo JSON criado
+
+    reopened = CourseManager(data_dir_path_str=str(tmp_path / "unused"), storage=SQLiteStorage(storage.db_path))
+    assert [(c["id"], c["name"]) for c in reopened.get_courses()] == [("python-basico", "Básico 2"), ("novo", "Novo")]
+    assert reopened.delete_course("novo")
+    assert [c["id"] for c in storage.load_courses()] == ["python-basico"]
+
+def test_memoized_lists_follow_database_changes(storage):
+    """Testa que as listas em memória são descartadas quando o banco muda."""
+    first = storage.load_lessons("basic/lessons.json")
+    assert storage.load_lessons("basic/lessons.json") is first
+    with storage._connection() as conn:
+        conn.execute("DELETE FROM lessons WHERE id = 'l2'")
+    assert [l["id"] for l in storage.load_lessons("basic/lessons.json")] == ["l1"]
+
+def test_create_storage_rejects_unknown_backend(tmp_path):
+    """Testa a seleção do backend pela configuração."""
+    assert create_storage("json") is None
+    assert isinstance(create_storage("sqlite", tmp_path / "db.sqlite3"), SQLiteStorage)
+    with pytest.raises(ValueError):
+        create_storage("mongo")
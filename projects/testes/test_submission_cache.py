@@ -0,0 +1,44 @@
+import ast
+import pytest
+
+from projects.submission_cache import SubmissionCache, fingerprint_submission, is_deterministic
+
+TEST_CODE = "assert output.strip() == 'Olá, Mundo!'"
+
+def test_fingerprint_ignores_whitespace_and_comments():
+    """Testa que diferenças de espaçamento e comentários geram o mesmo fingerprint."""
+    first = fingerprint_submission("print('Olá, Mundo!')", TEST_CODE)
+    second = fingerprint_submission("# minha solução\nprint( 'Olá, Mundo!' )\n\n", TEST_CODE)
+    assert first is not None
+    assert first == second
+
+def test_fingerprint_depends_on_test_code():
+    """Testa que o mesmo código com outro test_code gera outro fingerprint."""
+    assert fingerprint_submission("print(1)", "assert True") != fingerprint_submission("print(1)", "assert False")
+
+@pytest.mark.parametrize("code", [
+    "nome = input('Nome: ')\nprint(nome)",
+    "import random\nprint(random.randint(1, 6))",
+    "from datetime import datetime\nprint(datetime.now())",
+    "import time\nprint(time.time())",
+    "with open('dados.txt') as f:\n    print(f.read())",
+    "import numpy as np\nprint(np.random.rand())",
+])
+def test_nondeterministic_code_is_not_fingerprinted(code):
+    """Testa que código com input, aleatoriedade, tempo ou E/S é excluído do cache."""
+    assert not is_deterministic(ast.parse(code))
+    assert fingerprint_submission(code, TEST_CODE) is None
+
+def test_syntax_error_is_not_fingerprinted():
+    """Testa que código com erro de sintaxe não gera fingerprint."""
+    assert fingerprint_submission("print('a'", TEST_CODE) is None
+
+def test_cache_skips_environment_errors_and_large_outputs():
+    """Testa que vereditos causados por limites do ambiente ou muito grandes não são armazenados."""
+    cache = SubmissionCache(maxsize=10, max_output_chars=10)
+    verdict = {"success": False, "output": "", "details": "TimeoutError"}
+    assert cache.put("fp-1", verdict, ["TimeoutError"]) is False
+    assert cache.put("fp-2", {"success": True, "output": "x" * 11, "details": ""}) is False
+    assert cache.put("fp-3", {"success": True, "output": "ok", "details": ""}, [None]) is True
+    assert cache.get("fp-3")["output"] == "ok"
+    assert cache.get("fp-1") is None